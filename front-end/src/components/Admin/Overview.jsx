@@ -17,36 +17,23 @@ const Overview = () => {
       try {
         setLoading(true);
 
-        // Nous pourrions créer un endpoint dédié aux statistiques ou appeler plusieurs endpoints
-        // Pour l'instant, nous allons simuler avec des appels individuels
-        const [users, classes, subjects, labs] = await Promise.all([
-          apiServices.admin.getUsers(),
-          apiServices.admin.getClasses(),
-          apiServices.admin.getSubjects(),
-          apiServices.admin.getLabs()
-        ]);
-
-        // Traiter les données pour obtenir les statistiques
-        const studentCount = users.users.filter(user => user.role === 'student').length;
-        const teacherCount = users.users.filter(user => user.role === 'teacher').length;
-
-        const pendingLabs = labs.labs.filter(lab => lab.status === 'pending').length;
-        const approvedLabs = labs.labs.filter(lab => lab.status === 'approved').length;
-        const rejectedLabs = labs.labs.filter(lab => lab.status === 'rejected').length;
+        // Compteurs calculés par le serveur, en une seule requête
+        const { counts } = await apiServices.admin.getDashboard();
+        const labs = counts.labs;
 
         setStats({
           users: {
-            total: users.users.length,
-            students: studentCount,
-            teachers: teacherCount
+            total: Object.values(counts.users).reduce((sum, n) => sum + n, 0),
+            students: counts.users.student,
+            teachers: counts.users.teacher
           },
-          classes: classes.classes.length,
-          subjects: subjects.subjects.length,
+          classes: counts.classes,
+          subjects: counts.subjects,
           labs: {
-            total: labs.labs.length,
-            pending: pendingLabs,
-            approved: approvedLabs,
-            rejected: rejectedLabs
+            total: Object.values(labs).reduce((sum, n) => sum + n, 0),
+            pending: labs.pending,
+            approved: labs.approved,
+            rejected: labs.rejected
           }
         });
 
@@ -1,21 +1,36 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { FaUserPlus, FaEdit, FaTrash, FaSearch } from 'react-icons/fa';
 import apiServices from '../../services/api';
 import UserForm from './forms/UserForm';
 
+// Utilisateurs chargés par requête ; les suivants avec « Charger plus »
+const PAGE_SIZE = 100;
+// Délai avant d'envoyer la recherche au serveur (ms)
+const SEARCH_DELAY = 300;
+
 const UsersPanel = () => {
   const [users, setUsers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
   const [showForm, setShowForm] = useState(false);
   const [currentUser, setCurrentUser] = useState(null);
+  // Dernière recherche envoyée : les réponses plus anciennes sont ignorées
+  const latestSearch = useRef('');
   
-  const fetchUsers = async () => {
+  // Première page filtrée par le serveur ; le chargement initial seul
+  // remplace le panneau, pour garder le focus dans la barre de recherche
+  const fetchUsers = async (search) => {
+    latestSearch.current = search;
     try {
-      setLoading(true);
-      const response = await apiServices.admin.getUsers();
+      const response = await apiServices.admin.getUsersPage({ limit: PAGE_SIZE, search });
+      if (latestSearch.current !== search) {
+        return;
+      }
       setUsers(response.users);
+      setNextCursor(response.next_cursor);
     } catch (err) {
       console.error('Erreur lors de la récupération des utilisateurs:', err);
       setError('Échec du chargement des utilisateurs. Veuillez réessayer.');
@@ -24,23 +39,41 @@ const UsersPanel = () => {
     }
   };
   
+  // Page suivante, à partir du curseur renvoyé par la précédente
+  const loadMoreUsers = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await apiServices.admin.getUsersPage({
+        limit: PAGE_SIZE, after: nextCursor, search: latestSearch.current
+      });
+      setUsers(previous => [...previous, ...response.users]);
+      setNextCursor(response.next_cursor);
+    } catch (err) {
+      console.error('Erreur lors de la récupération des utilisateurs:', err);
+      setError('Échec du chargement des utilisateurs. Veuillez réessayer.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+  
   useEffect(() => {
-    fetchUsers();
+    fetchUsers('');
   }, []);
   
+  // La recherche porte sur tous les utilisateurs, pas seulement les pages chargées
+  useEffect(() => {
+    const search = searchTerm.trim();
+    if (search === latestSearch.current) {
+      return undefined;
+    }
+    const timer = setTimeout(() => fetchUsers(search), SEARCH_DELAY);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+  
   const handleSearchChange = (e) => {
     setSearchTerm(e.target.value);
   };
   
-  const filteredUsers = users.filter(user => {
-    return (
-      user.first_name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      user.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      user.username.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      user.role.toLowerCase().includes(searchTerm.toLowerCase())
-    );
-  });
-  
   const handleAddUser = () => {
     setCurrentUser(null);
     setShowForm(true);
@@ -55,7 +88,7 @@ const UsersPanel = () => {
     if (window.confirm('Êtes-vous sûr de vouloir supprimer cet utilisateur? Cette action est irréversible.')) {
       try {
         await apiServices.admin.deleteUser(userId);
-        fetchUsers();
+        fetchUsers(latestSearch.current);
       } catch (err) {
         console.error('Erreur lors de la suppression de l\'utilisateur:', err);
         setError('Échec de la suppression de l\'utilisateur. Veuillez réessayer.');
@@ -69,7 +102,7 @@ const UsersPanel = () => {
       try {
         apiServices.admin.updateUser(currentUser.id, userData);
         setShowForm(false);
-        fetchUsers();
+        fetchUsers(latestSearch.current);
       } catch (err) {
         console.error('Erreur lors de la mise à jour de l\'utilisateur:', err);
         setError('Échec de la mise à jour de l\'utilisateur. Veuillez réessayer.');
@@ -79,7 +112,7 @@ const UsersPanel = () => {
       try {
         apiServices.admin.createUser(userData);
         setShowForm(false);
-        fetchUsers();
+        fetchUsers(latestSearch.current);
       } catch (err) {
         console.error('Erreur lors de la création de l\'utilisateur:', err);
         setError('Échec de la création de l\'utilisateur. Veuillez réessayer.');
@@ -132,7 +165,7 @@ const UsersPanel = () => {
             </tr>
           </thead>
           <tbody>
-            {filteredUsers.map(user => (
+            {users.map(user => (
               <tr key={user.id}>
                 <td>{user.id}</td>
                 <td>{user.first_name} {user.name}</td>
@@ -160,6 +193,11 @@ const UsersPanel = () => {
             ))}
           </tbody>
         </table>
+        {nextCursor != null && (
+          <button className="action-btn load-more-btn" onClick={loadMoreUsers} disabled={loadingMore}>
+            {loadingMore ? 'Chargement...' : 'Charger plus'}
+          </button>
+        )}
       </div>
     </div>
   );
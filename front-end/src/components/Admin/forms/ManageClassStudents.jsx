@@ -17,7 +17,7 @@ const ManageClassStudents = ({ classData, onClose }) => {
         setError(null);
 
         // Fetch all students
-        const studentsResponse = await apiServices.admin.getUsers();
+        const studentsResponse = await apiServices.admin.getUsers({ role: 'student' });
         console.log("API Response for users:", studentsResponse);
 
         // Filter only students from all users - check the actual structure of your response
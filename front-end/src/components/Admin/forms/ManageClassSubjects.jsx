@@ -33,7 +33,7 @@ const ManageClassSubjects = ({ classData, onClose }) => {
         const assignedSubjects = classSubjectsResponse.subjects || [];
 
         // Fetch all teachers for assigning
-        const teachersResponse = await apiServices.admin.getUsers();
+        const teachersResponse = await apiServices.admin.getUsers({ role: 'teacher' });
         console.log("API Response for teachers:", teachersResponse);
 
         // Extract teachers from response
@@ -13,7 +13,7 @@ const StudentDashboard = () => {
   const [userData, setUserData] = useState(null);
   const [subjects, setSubjects] = useState([]);
   const [selectedSubject, setSelectedSubject] = useState(null);
-  const [labs, setLabs] = useState([]);
+  const [classLabs, setClassLabs] = useState([]);
   const [selectedLab, setSelectedLab] = useState(null);
   const [progressData, setProgressData] = useState(null);
   const [loading, setLoading] = useState(true);
@@ -22,12 +22,15 @@ const StudentDashboard = () => {
   const navigate = useNavigate();
 
   useEffect(() => {
-    const fetchUserData = async () => {
+    // Profil, matières et labs de la classe en une seule requête
+    const fetchDashboard = async () => {
       try {
         setLoading(true);
-        const response = await studentService.getProfile();
+        const response = await studentService.getDashboard();
         if (response.user) {
           setUserData(response.user);
+          setSubjects(response.subjects);
+          setClassLabs(response.labs);
         } else {
           setError('Failed to load user data');
         }
@@ -39,44 +42,12 @@ const StudentDashboard = () => {
       }
     };
 
-    fetchUserData();
+    fetchDashboard();
   }, []);
 
-  useEffect(() => {
-    const fetchSubjects = async () => {
-      try {
-        const response = await studentService.getSubjects();
-        if (response.subjects) {
-          setSubjects(response.subjects);
-        }
-      } catch (err) {
-        console.error('Error fetching subjects:', err);
-      }
-    };
-
-    if (activePanel === 'subjects' || activePanel === 'labs') {
-      fetchSubjects();
-    }
-  }, [activePanel]);
-
-  useEffect(() => {
-    const fetchLabs = async () => {
-      if (selectedSubject) {
-        try {
-          const response = await studentService.getLabs(selectedSubject.id);
-          if (response.labs) {
-            setLabs(response.labs);
-          }
-        } catch (err) {
-          console.error('Error fetching labs:', err);
-        }
-      }
-    };
-
-    if (selectedSubject) {
-      fetchLabs();
-    }
-  }, [selectedSubject]);
+  const labs = selectedSubject
+    ? classLabs.filter(lab => lab.subject_id === selectedSubject.id)
+    : [];
 
   useEffect(() => {
     const fetchProgress = async () => {
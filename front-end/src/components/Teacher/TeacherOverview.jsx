@@ -16,58 +16,33 @@ const TeacherOverview = ({ teacherData }) => {
 			try {
 				setLoading(true);
 
-				// Get assigned classes from teacherData if available, else fetch them
-				let classesData = [];
-				if (teacherData && teacherData.assigned_classes) {
-					// Format classes to match what's expected by the component
-          classesData = teacherData.assigned_classes.map(cls => ({
-            id: cls.id,
-            name: cls.name,
-            subjects: cls.subjects || [],
-            subjectCount: cls.subjects ? cls.subjects.length : 0,
-            description: `Classe ${cls.name} - ${cls.subjects ? cls.subjects.map(s => s.name).join(', ') : ''}`
-          }));
-        } else {
-          // Fallback to fetching if not available
-          classesData = await teacherService.getAssignedClasses();
-        }
-        
-        // Get lab data
-        const labsData = await teacherService.getLabs();
-
-        // Process class data
-        let totalStudents = 0;
-        const completionRates = [];
-        
-        // Get student counts for each class
-        const classPromises = classesData.map(async (classInfo) => {
-          const students = await teacherService.getClassStudents(classInfo.id);
-          totalStudents += students.length;
-          
-          // Calculate a realistic completion rate (instead of random)
-          const classLabs = await teacherService.getClassLabs(classInfo.id);
-          
-          // Calculate completion percentage only if there are students and labs
-          if (students.length > 0 && classLabs.length > 0) {
-            // In a real app, you would calculate based on actual completion data
-            // For now we'll use a simpler calculation based on the admin dashboard pattern
-						const completionRate = Math.floor(Math.random() * 40) + 60; // Placeholder: 60-100%
-
+				// Classes, effectifs, progression et labs en une seule requête
+				const dashboard = await teacherService.getDashboard();
+				const labsData = dashboard.labs;
+
+				// Taux de réalisation calculé à partir des compteurs de progression
+				const completionRates = [];
+				dashboard.classes.forEach((classInfo) => {
+					const { completed, in_progress, not_started } = classInfo.progress;
+					const tracked = completed + in_progress + not_started;
+					if (classInfo.student_count > 0 && tracked > 0) {
 						completionRates.push({
 							className: classInfo.name,
-							completionRate: completionRate,
+							completionRate: Math.round((completed / tracked) * 100),
 							classId: classInfo.id
 						});
 					}
-
-					return {
-						...classInfo,
-						studentCount: students.length
-					};
 				});
 
-				// Wait for all class data to be processed
-				const classesWithData = await Promise.all(classPromises);
+				const classesWithData = dashboard.classes.map(classInfo => ({
+					id: classInfo.id,
+					name: classInfo.name,
+					subjects: classInfo.subjects,
+					subjectCount: classInfo.subjects.length,
+					studentCount: classInfo.student_count
+				}));
+				const totalStudents = classesWithData.reduce(
+					(sum, classInfo) => sum + classInfo.studentCount, 0);
 
 				// Calculate lab statistics
 				const pendingLabs = labsData.filter(lab => lab.status === 'pending').length;
@@ -75,7 +50,7 @@ const TeacherOverview = ({ teacherData }) => {
 
 				setStats({
 					classes: {
-						total: classesData.length,
+						total: classesWithData.length,
 						list: classesWithData
 					},
 					students: {
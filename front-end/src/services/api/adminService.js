@@ -1,10 +1,10 @@
-import { API_BASE_URL, handleResponse } from './config';
+import { API_BASE_URL, handleResponse, fetchPage, fetchAllPages } from './config';
 
 const adminService = {
-  // Users
-  getUsers: async () => {
+  // Dashboard: totals and pending labs in one request
+  getDashboard: async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/users`, {
+      const response = await fetch(`${API_BASE_URL}/me/dashboard`, {
         method: 'GET',
         headers: {
           'Content-Type': 'application/json',
@@ -18,6 +18,27 @@ const adminService = {
     }
   },
 
+  // Users
+  // All users, page by page; params may filter by role
+  getUsers: async (params = {}) => {
+    try {
+      return await fetchAllPages('/users', 'users', params);
+    } catch (error) {
+      console.error('API Error:', error);
+      throw error;
+    }
+  },
+
+  // One page of users: { users, next_cursor }; pass next_cursor back as after
+  getUsersPage: async (params = {}) => {
+    try {
+      return await fetchPage('/users', params);
+    } catch (error) {
+      console.error('API Error:', error);
+      throw error;
+    }
+  },
+
   getUser: async (userId) => {
     try {
       const response = await fetch(`${API_BASE_URL}/users/${userId}`, {
@@ -87,14 +108,7 @@ const adminService = {
   // Classes
   getClasses: async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/classes`, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${localStorage.getItem('token')}`
-        }
-      });
-      return handleResponse(response);
+      return await fetchAllPages('/classes', 'classes');
     } catch (error) {
       console.error('API Error:', error);
       throw error;
@@ -288,14 +302,7 @@ const adminService = {
   // Subjects
   getSubjects: async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/subjects`, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${localStorage.getItem('token')}`
-        }
-      });
-      return handleResponse(response);
+      return await fetchAllPages('/subjects', 'subjects');
     } catch (error) {
       console.error('API Error:', error);
       throw error;
@@ -387,14 +394,7 @@ const adminService = {
   // Labs
   getLabs: async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/labs`, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${localStorage.getItem('token')}`
-        }
-      });
-      return handleResponse(response);
+      return await fetchAllPages('/labs', 'labs');
     } catch (error) {
       console.error('API Error:', error);
       throw error;
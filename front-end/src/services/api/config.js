@@ -14,3 +14,33 @@ export const handleResponse = async (response) => {
 
   return data;
 };
+
+// Largest page the list endpoints serve (see api/utils/pagination.py)
+export const MAX_PAGE_SIZE = 500;
+
+// Fetch one page of a keyset-paginated list; the result carries next_cursor
+export const fetchPage = async (path, params = {}) => {
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, value]) => value !== undefined && value !== null && value !== '')
+  ).toString();
+  const response = await fetch(`${API_BASE_URL}${path}${query ? `?${query}` : ''}`, {
+    method: 'GET',
+    headers: {
+      'Content-Type': 'application/json',
+      'Authorization': `Bearer ${localStorage.getItem('token')}`
+    }
+  });
+  return handleResponse(response);
+};
+
+// Fetch every page of a list by following next_cursor, returning { [key]: items }
+export const fetchAllPages = async (path, key, params = {}) => {
+  const items = [];
+  let after = null;
+  do {
+    const data = await fetchPage(path, { ...params, limit: MAX_PAGE_SIZE, after });
+    items.push(...(data[key] || []));
+    after = data.next_cursor;
+  } while (after !== null && after !== undefined);
+  return { [key]: items };
+};
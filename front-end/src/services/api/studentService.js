@@ -1,6 +1,6 @@
 // src/services/api/studentService.js
 
-import { API_BASE_URL, handleResponse } from './config';
+import { API_BASE_URL, handleResponse, fetchAllPages } from './config';
 
 const studentService = {
   // Récupérer le profil de l'étudiant
@@ -20,6 +20,23 @@ const studentService = {
     }
   },
   
+  // Profil, classe, matières, labs et progression en une seule requête
+  getDashboard: async () => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/me/dashboard`, {
+        method: 'GET',
+        headers: {
+          'Content-Type': 'application/json',
+          'Authorization': `Bearer ${localStorage.getItem('token')}`
+        }
+      });
+      return handleResponse(response);
+    } catch (error) {
+      console.error('API Error:', error);
+      throw error;
+    }
+  },
+
   // Mettre à jour le profil de l'étudiant
   updateProfile: async (userData) => {
     try {
@@ -70,14 +87,7 @@ const studentService = {
   // Récupérer toutes les matières disponibles
   getSubjects: async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/subjects`, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${localStorage.getItem('token')}`
-        },
-      });
-      return handleResponse(response);
+      return await fetchAllPages('/subjects', 'subjects');
     } catch (error) {
       console.error('API Error:', error);
       throw error;
@@ -87,14 +97,7 @@ const studentService = {
   // Récupérer les laboratoires par matière
   getLabs: async (subjectId) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/labs?subject_id=${subjectId}`, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${localStorage.getItem('token')}`
-        },
-      });
-      return handleResponse(response);
+      return await fetchAllPages('/labs', 'labs', { subject_id: subjectId });
     } catch (error) {
       console.error('API Error:', error);
       throw error;
@@ -1,6 +1,6 @@
 // src/services/api/teacherService.js
 
-import { API_BASE_URL, handleResponse } from './config';
+import { API_BASE_URL, handleResponse, fetchAllPages } from './config';
 
 const teacherService = {  // Récupérer le profil de l'enseignant (uses the general profile endpoint)
   getProfile: async () => {
@@ -29,6 +29,23 @@ const teacherService = {  // Récupérer le profil de l'enseignant (uses the gen
     }
   },
   
+  // Profil, classes assignées, progression et labs en une seule requête
+  getDashboard: async () => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/me/dashboard`, {
+        method: 'GET',
+        headers: {
+          'Content-Type': 'application/json',
+          'Authorization': `Bearer ${localStorage.getItem('token')}`
+        }
+      });
+      return handleResponse(response);
+    } catch (error) {
+      console.error('API Error:', error);
+      throw error;
+    }
+  },
+
   // Mettre à jour le profil de l'enseignant
   updateProfile: async (userData) => {
     try {
@@ -162,14 +179,7 @@ const teacherService = {  // Récupérer le profil de l'enseignant (uses the gen
   // Get all labs
   getLabs: async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/labs`, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${localStorage.getItem('token')}`
-        },
-      });
-      const allLabsData = await handleResponse(response);
+      const allLabsData = await fetchAllPages('/labs', 'labs');
       
       if (!allLabsData || !Array.isArray(allLabsData.labs)) {
         console.error('Invalid labs response format:', allLabsData);
@@ -231,14 +241,7 @@ const teacherService = {  // Récupérer le profil de l'enseignant (uses the gen
       }
       
       // Get all labs
-      const labsResponse = await fetch(`${API_BASE_URL}/labs`, {
-        method: 'GET',
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': `Bearer ${localStorage.getItem('token')}`
-        },
-      });
-      const allLabsData = await handleResponse(labsResponse);
+      const allLabsData = await fetchAllPages('/labs', 'labs');
       
       if (!allLabsData || !Array.isArray(allLabsData.labs)) {
         console.error('Invalid labs response format:', allLabsData);
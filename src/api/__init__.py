@@ -9,6 +9,9 @@ from api.courses.labs_routes import labs_routes
 from api.courses.class_routes import class_routes
 from api.courses.progress_routes import progress_routes
 from api.courses import courses_routes
+from api.metrics import metrics_routes
+from api.me import dashboard_routes
+from api.batch import batch_routes
 
 # Authentication blueprints
 register_bp = Blueprint('register', __name__, url_prefix='/api/register')
@@ -33,3 +36,15 @@ subjects_routes(subjects_bp)
 labs_routes(labs_bp)
 class_routes(class_bp)
 progress_routes(progress_bp)
+
+# Current user blueprint
+me_bp = Blueprint('me', __name__, url_prefix='/api/me')
+dashboard_routes(me_bp)
+
+# Batch blueprint
+batch_bp = Blueprint('batch', __name__, url_prefix='/api/batch')
+batch_routes(batch_bp)
+
+# Metrics blueprint
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+metrics_routes(metrics_bp)
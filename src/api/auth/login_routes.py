@@ -1,6 +1,7 @@
 from flask import request, jsonify
-from werkzeug.security import check_password_hash
-from models.user import User
+from models.user import User, Role
+from config import JWT_TOKEN_LIFETIME_HOURS
+from api.utils.passwords import verify_password
 from datetime import datetime, timedelta
 import jwt
 import os
@@ -19,13 +20,20 @@ def login_routes(bp):
         if not user:
             return jsonify({'error': 'Invalid email or password'}), 401
 
-        if check_password_hash(user.password, auth.get('password')):
+        if verify_password(user.password, auth.get('password')):
             # Generate token
-            token = jwt.encode({
+            now = datetime.utcnow()
+            claims = {
                 'user_id': user.id,
                 'role': user.role.name,
-                'exp': datetime.utcnow() + timedelta(hours=24)
-            }, os.getenv('JWT_SECRET_KEY', 'default_secret'), algorithm="HS256")
+                'iat': now,
+                'exp': now + timedelta(hours=JWT_TOKEN_LIFETIME_HOURS)
+            }
+            if user.role == Role.student and user.student:
+                claims['class_id'] = user.student.class_id
+
+            token = jwt.encode(claims, os.getenv(
+                'JWT_SECRET_KEY', 'default_secret'), algorithm="HS256")
 
             return jsonify({
                 'token': token,
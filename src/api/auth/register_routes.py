@@ -1,7 +1,7 @@
 from flask import request, jsonify
 from models.user import User, Role
 from config import Base
-from werkzeug.security import generate_password_hash
+from api.utils.passwords import hash_password
 import re
 
 
@@ -33,7 +33,7 @@ def register_routes(bp):
         # Create new user with student role by default
         new_user = User(
             email=data['email'],
-            password=generate_password_hash(data['password']),
+            password=hash_password(data['password']),
             role=data.get('role', Role.student),
             name=data['last_name'],
             first_name=data['first_name']
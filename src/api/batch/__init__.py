@@ -0,0 +1 @@
+from .batch_routes import batch_routes
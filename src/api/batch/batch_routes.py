@@ -0,0 +1,129 @@
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from flask import request, jsonify, current_app
+from werkzeug.test import EnvironBuilder
+from api.utils.auth_helpers import token_required, IDENTITY_ENVIRON_KEY
+from config import BATCH_MAX_REQUESTS, BATCH_WORKERS
+
+logger = logging.getLogger(__name__)
+
+METHODS = {'GET', 'POST', 'PUT', 'DELETE'}
+# Sub-request headers a client may set, and response headers passed back
+REQUEST_HEADERS = ('If-Match', 'If-None-Match')
+RESPONSE_HEADERS = ('ETag', 'Cache-Control', 'Retry-After')
+
+_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS,
+                               thread_name_prefix='batch')
+
+
+def _validate(sub_request):
+    if not isinstance(sub_request, dict):
+        return "Each request must be an object"
+    if str(sub_request.get('method', 'GET')).upper() not in METHODS:
+        return f"Method must be one of {', '.join(sorted(METHODS))}"
+    path = sub_request.get('path')
+    if not isinstance(path, str) or not path.startswith('/api/'):
+        return "Path must start with /api/"
+    if path.split('?')[0].rstrip('/') == '/api/batch':
+        return "Batch requests cannot be nested"
+    headers = sub_request.get('headers', {})
+    if not isinstance(headers, dict):
+        return "Headers must be an object"
+    return None
+
+
+def _environ(sub_request, identity):
+    path, _, query = sub_request['path'].partition('?')
+    headers = {name: value for name, value in sub_request.get('headers', {}).items()
+               if name in REQUEST_HEADERS}
+    builder = EnvironBuilder(
+        path=path,
+        query_string=query,
+        method=str(sub_request.get('method', 'GET')).upper(),
+        headers=headers,
+        json=sub_request.get('body'),
+        base_url=request.host_url
+    )
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+    environ[IDENTITY_ENVIRON_KEY] = identity
+    return environ
+
+
+def _dispatch(app, environ):
+    # Runs the full Flask pipeline (hooks, error handlers) for one sub-request
+    with app.request_context(environ):
+        try:
+            response = app.full_dispatch_request()
+        except Exception:
+            logger.exception('Batch sub-request failed')
+            return {"status": 500, "headers": {},
+                    "body": {"error": "Internal server error"}}
+
+        data = response.get_data(as_text=True)
+        try:
+            body = json.loads(data) if data else None
+        except ValueError:
+            body = data
+        return {
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in RESPONSE_HEADERS
+                        if name in response.headers},
+            "body": body
+        }
+
+
+def _dispatch_isolated(app, environ):
+    # Worker threads need their own app context, hence their own session
+    with app.app_context():
+        return _dispatch(app, environ)
+
+
+def batch_routes(bp):
+    # Run several API requests in one round trip
+    @bp.route('', methods=['POST'])
+    @token_required
+    def run_batch(current_user):
+        sub_requests = request.get_json(silent=True)
+        if isinstance(sub_requests, dict):
+            sub_requests = sub_requests.get('requests')
+        if not isinstance(sub_requests, list) or not sub_requests:
+            return jsonify({"error": "A non-empty list of requests is required"}), 400
+        if len(sub_requests) > BATCH_MAX_REQUESTS:
+            return jsonify({
+                "error": f"At most {BATCH_MAX_REQUESTS} requests per batch"
+            }), 400
+        for index, sub_request in enumerate(sub_requests):
+            error = _validate(sub_request)
+            if error:
+                return jsonify({"error": f"Request {index}: {error}"}), 400
+
+        app = current_app._get_current_object()
+        identity = request.environ[IDENTITY_ENVIRON_KEY]
+        environs = [_environ(sub_request, identity) for sub_request in sub_requests]
+
+        # Consecutive GETs run concurrently; any other method runs alone,
+        # in order, on this request's session
+        responses = [None] * len(environs)
+        index = 0
+        while index < len(environs):
+            if environs[index]['REQUEST_METHOD'] != 'GET':
+                responses[index] = _dispatch(app, environs[index])
+                index += 1
+                continue
+            end = index
+            while end < len(environs) and environs[end]['REQUEST_METHOD'] == 'GET':
+                end += 1
+            if end - index == 1:
+                responses[index] = _dispatch(app, environs[index])
+            else:
+                futures = [_executor.submit(_dispatch_isolated, app, environ)
+                           for environ in environs[index:end]]
+                for offset, future in enumerate(futures):
+                    responses[index + offset] = future.result()
+            index = end
+
+        return jsonify({"responses": responses}), 200
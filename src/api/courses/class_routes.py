@@ -1,4 +1,7 @@
 from flask import request, jsonify
+from sqlalchemy import select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import selectinload
 from models.class_group import ClassGroup
 from models.student import Student
 from models.user import User, Role
@@ -6,82 +9,142 @@ from models.class_subject import ClassSubject
 from models.teacher_assignment import TeacherAssignment
 from models.subject import Subject
 from config import Base
-from api.utils.auth_helpers import token_required, admin_required
+from api.utils.auth_helpers import token_required, admin_required, class_changed
+from api.utils.pagination import keyset_page
+from api.utils import cascade
+from api.utils.progress_rollups import refresh_class_rollups
+from api.utils.response_cache import cached_response
+from api.utils.resources import CLASS
+from api.utils.conditional import collection_etag, etag_header, not_modified
+
+# Everything a class page is built from
+CLASS_PAGE_TABLES = ('class_group', 'student', 'user', 'class_subject',
+                     'subject', 'teacher_assignment')
+
+
+def _load_class(class_id, students=False, subjects=False):
+    # Eager-load the requested relationships so a class page costs a fixed
+    # number of queries regardless of how many students or subjects it has
+    options = []
+    if students:
+        options.append(selectinload(ClassGroup.students)
+                       .joinedload(Student.user))
+    if subjects:
+        options.append(selectinload(ClassGroup.class_subjects)
+                       .joinedload(ClassSubject.subject))
+        options.append(selectinload(ClassGroup.teacher_assignments)
+                       .joinedload(TeacherAssignment.teacher))
+    return ClassGroup.query.options(*options).filter_by(id=class_id).first()
+
+
+def _students_list(class_group):
+    students_list = []
+    for student in class_group.students:
+        user = student.user
+        if user:
+            students_list.append({
+                "user_id": student.user_id,
+                "name": user.name,
+                "first_name": user.first_name,
+                "email": user.email
+            })
+    return students_list
+
+
+def _subjects_list(class_group):
+    # Map each subject of the class to its assigned teacher
+    teachers = {}
+    for assignment in class_group.teacher_assignments:
+        teachers.setdefault(assignment.subject_id, assignment.teacher)
+
+    subjects_list = []
+    for cs in class_group.class_subjects:
+        subject = cs.subject
+        if subject:
+            teacher = teachers.get(subject.id)
+            teacher_data = None
+            if teacher:
+                teacher_data = {
+                    "id": teacher.id,
+                    "name": teacher.name,
+                    "first_name": teacher.first_name
+                }
+
+            subjects_list.append({
+                "id": subject.id,
+                "name": subject.name,
+                "teacher": teacher_data
+            })
+    return subjects_list
+
+
+def _upsert_students(user_ids, class_id):
+    # Insert or move every student in a single statement
+    rows = [{"user_id": user_id, "class_id": class_id} for user_id in user_ids]
+    dialect = Base.session.get_bind().dialect.name
+    if dialect == 'mysql':
+        statement = mysql.insert(Student).values(rows)
+        statement = statement.on_duplicate_key_update(
+            class_id=statement.inserted.class_id)
+    elif dialect == 'sqlite':
+        statement = sqlite.insert(Student).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Student.user_id],
+            set_={"class_id": statement.excluded.class_id})
+    else:
+        # No upsert on this dialect: update the existing rows, insert the rest
+        existing = set(Base.session.scalars(
+            select(Student.user_id).where(Student.user_id.in_(user_ids))))
+        if existing:
+            Base.session.execute(update(Student)
+                                 .where(Student.user_id.in_(existing))
+                                 .values(class_id=class_id))
+        Base.session.add_all(Student(user_id=user_id, class_id=class_id)
+                             for user_id in user_ids if user_id not in existing)
+        Base.session.flush()
+        return
+    Base.session.execute(statement)
 
 
 def class_routes(bp):
     # Get all classes
     @bp.route('', methods=['GET'])
     @token_required
+    @cached_response('class_group')
     def get_all_classes(current_user):
-        classes = ClassGroup.query.all()
-        classes_list = []
+        try:
+            fields, includes = CLASS.parse()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        for class_group in classes:
-            classes_list.append({
-                "id": class_group.id,
-                "name": class_group.name
-            })
+        classes, next_cursor = keyset_page(
+            CLASS.query(fields, includes), ClassGroup.id)
+        classes_list = CLASS.serialize(classes, fields, includes)
 
-        return jsonify({"classes": classes_list}), 200
+        return jsonify({"classes": classes_list, "next_cursor": next_cursor}), 200
 
     # Get class by ID with students and subjects
     @bp.route('/<int:class_id>', methods=['GET'])
     @token_required
     def get_class(current_user, class_id):
-        class_group = ClassGroup.query.get(class_id)
+        etag = collection_etag(*CLASS_PAGE_TABLES)
+        if not_modified(etag):
+            return '', 304, etag_header(etag)
+
+        class_group = _load_class(class_id, students=True, subjects=True)
         if not class_group:
             return jsonify({"error": "Class not found"}), 404
 
-        # Get students in this class
-        students = Student.query.filter_by(class_id=class_id).all()
-        students_list = []
-
-        for student in students:
-            user = User.query.get(student.user_id)
-            if user:
-                students_list.append({
-                    "id": student.id,
-                    "user_id": student.user_id,
-                    "name": user.name,
-                    "first_name": user.first_name,
-                    "email": user.username
-                })
-
-        # Get subjects for this class
-        class_subjects = ClassSubject.query.filter_by(class_id=class_id).all()
-        subjects_list = []
-
-        for cs in class_subjects:
-            subject = Subject.query.get(cs.subject_id)
-            if subject:
-                # Get teacher assignment for this class subject
-                teacher_assignment = TeacherAssignment.query.filter_by(
-                    class_subject_id=cs.id
-                ).first()
-
-                teacher_data = None
-                if teacher_assignment:
-                    teacher = User.query.get(teacher_assignment.teacher_id)
-                    if teacher:
-                        teacher_data = {
-                            "id": teacher.id,
-                            "name": teacher.name,
-                            "first_name": teacher.first_name
-                        }
-
-                subjects_list.append({
-                    "id": subject.id,
-                    "name": subject.name,
-                    "teacher": teacher_data
-                })
+        # Keep the historical "id" key on each student entry
+        students_list = [{"id": student["user_id"], **student}
+                         for student in _students_list(class_group)]
 
         return jsonify({
             "id": class_group.id,
             "name": class_group.name,
             "students": students_list,
-            "subjects": subjects_list
-        }), 200
+            "subjects": _subjects_list(class_group)
+        }), 200, etag_header(etag)
 
     # Create a new class (admin only)
     @bp.route('', methods=['POST'])
@@ -150,36 +213,27 @@ def class_routes(bp):
     @token_required
     @admin_required
     def delete_class(current_user, class_id):
-        data = request.get_json()
-
-        if 'class_id' not in data:
-            return jsonify({"error": "Class ID is required"}), 400
-
-        class_group = ClassGroup.query.get(data['id'])
+        class_group = ClassGroup.query.get(class_id)
         if not class_group:
             return jsonify({"error": "Class not found"}), 404
 
+        # Pass ?dry_run=true to get the row counts without deleting
+        if request.args.get('dry_run', 'false').lower() == 'true':
+            return jsonify({
+                "dry_run": True,
+                "counts": cascade.delete_class(class_id, dry_run=True)
+            }), 200
+
+        student_ids = [user_id for (user_id,) in Base.session.query(
+            Student.user_id).filter(Student.class_id == class_id)]
         try:
-            # Remove all students from this class
-            students = Student.query.filter_by(class_id=class_group.id).all()
-            for student in students:
-                Base.session.delete(student)
-            # Remove all class-subject links
-            class_subjects = ClassSubject.query.filter_by(
-                class_id=class_group.id).all()
-            for cs in class_subjects:
-                # Remove all teacher assignments for this class-subject
-                teacher_assignments = TeacherAssignment.query.filter_by(
-                    class_subject_id=cs.id).all()
-                for ta in teacher_assignments:
-                    Base.session.delete(ta)
-                Base.session.delete(cs)
-            # Finally, delete the class group itself
-            Base.session.delete(class_group)
+            counts = cascade.delete_class(class_id)
             Base.session.commit()
+            class_changed(student_ids)
             return jsonify({
                 "success": True,
-                "message": "Class deleted successfully"
+                "message": "Class deleted successfully",
+                "counts": counts
             }), 200
         except Exception as e:
             Base.session.rollback()
@@ -189,25 +243,11 @@ def class_routes(bp):
     @bp.route('/<int:class_id>/students', methods=['GET'])
     @token_required
     def get_class_students(current_user, class_id):
-        class_group = ClassGroup.query.get(class_id)
+        class_group = _load_class(class_id, students=True)
         if not class_group:
             return jsonify({"error": "Class not found"}), 404
 
-        # Get students in this class
-        students = Student.query.filter_by(class_id=class_id).all()
-        students_list = []
-
-        for student in students:
-            user = User.query.get(student.user_id)
-            if user:
-                students_list.append({
-                    "user_id": student.user_id,
-                    "name": user.name,
-                    "first_name": user.first_name,
-                    "email": user.email
-                })
-
-        return jsonify({"students": students_list}), 200
+        return jsonify({"students": _students_list(class_group)}), 200
 
     # Add a student to a class
 
@@ -235,9 +275,11 @@ def class_routes(bp):
         # Check if student record already exists
         existing_student = Student.query.filter_by(
             user_id=data['user_id']).first()
+        previous_class_id = None
         if existing_student:
             if existing_student.class_id == class_id:
                 return jsonify({"error": "Student already in this class"}), 409
+            previous_class_id = existing_student.class_id
             existing_student.class_id = class_id
         else:
             # Create student record
@@ -247,9 +289,15 @@ def class_routes(bp):
             )
             Base.session.add(student)
 
-        # Save changes
+        # Save changes, moving the student's progress between class rollups.
+        # A student without a class may still have progress (for example
+        # after delete_class), so the target class is always refreshed.
         try:
+            Base.session.flush()
+            refresh_class_rollups([class_id] if previous_class_id is None
+                                  else [previous_class_id, class_id])
             Base.session.commit()
+            class_changed([data['user_id']])
             return jsonify({
                 "success": True,
                 "message": "Student added to class successfully"
@@ -258,6 +306,74 @@ def class_routes(bp):
             Base.session.rollback()
             return jsonify({"error": f"Database error: {str(e)}"}), 500
 
+    # Enroll or transfer many students at once (admin only)
+    @bp.route('/<int:class_id>/students/bulk', methods=['POST'])
+    @token_required
+    @admin_required
+    def bulk_enroll_students(current_user, class_id):
+        class_group = ClassGroup.query.get(class_id)
+        if not class_group:
+            return jsonify({"error": "Class not found"}), 404
+
+        data = request.get_json()
+
+        if 'user_ids' in data:
+            if not isinstance(data['user_ids'], list):
+                return jsonify({"error": "user_ids must be a list"}), 400
+            try:
+                user_ids = list(dict.fromkeys(int(i) for i in data['user_ids']))
+            except (TypeError, ValueError):
+                return jsonify({"error": "user_ids must be integers"}), 400
+            candidates = User.id.in_(user_ids)
+        elif 'source_class_id' in data:
+            user_ids = None
+            candidates = User.id.in_(select(Student.user_id).where(
+                Student.class_id == data['source_class_id']))
+        else:
+            return jsonify({"error": "user_ids or source_class_id is required"}), 400
+
+        # Roles and current classes of every candidate in one query
+        rows = Base.session.execute(
+            select(User.id, User.role, Student.class_id)
+            .outerjoin(Student, Student.user_id == User.id)
+            .where(candidates)
+        ).all()
+        found = {row.id: row for row in rows}
+        if user_ids is None:
+            user_ids = sorted(found)
+
+        added, moved, skipped = [], [], []
+        for user_id in user_ids:
+            row = found.get(user_id)
+            if row is None:
+                skipped.append({"user_id": user_id, "reason": "User not found"})
+            elif row.role != Role.student:
+                skipped.append({"user_id": user_id, "reason": "User is not a student"})
+            elif row.class_id == class_id:
+                skipped.append({"user_id": user_id, "reason": "Student already in this class"})
+            elif row.class_id is None:
+                added.append(user_id)
+            else:
+                moved.append(user_id)
+
+        try:
+            if added or moved:
+                _upsert_students(added + moved, class_id)
+                # Added students may carry progress from a deleted class
+                refresh_class_rollups(
+                    {found[user_id].class_id for user_id in moved} | {class_id})
+            Base.session.commit()
+            class_changed(added + moved)
+            return jsonify({
+                "success": True,
+                "added": added,
+                "moved": moved,
+                "skipped": skipped
+            }), 200
+        except Exception as e:
+            Base.session.rollback()
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
+
     # Remove a student from a class
     @bp.route('/<int:class_id>/students/<int:student_id>', methods=['DELETE'])
     @token_required
@@ -269,7 +385,10 @@ def class_routes(bp):
 
         try:
             Base.session.delete(student)
+            Base.session.flush()
+            refresh_class_rollups([class_id])
             Base.session.commit()
+            class_changed([student_id])
             return jsonify({
                 "success": True,
                 "message": "Student removed from class successfully"
@@ -283,42 +402,11 @@ def class_routes(bp):
     @bp.route('/<int:class_id>/subjects', methods=['GET'])
     @token_required
     def get_class_subjects(current_user, class_id):
-        class_group = ClassGroup.query.get(class_id)
+        class_group = _load_class(class_id, subjects=True)
         if not class_group:
             return jsonify({"error": "Class not found"}), 404
 
-        # Get subjects for this class
-        class_subjects = ClassSubject.query.filter_by(class_id=class_id).all()
-        subjects_list = []
-
-        for cs in class_subjects:
-            subject = Subject.query.get(cs.subject_id)
-            if subject:
-                # Get teacher assignment for this class subject
-                # Use the actual primary key of ClassSubject for filtering
-                # This depends on your database schema - check what columns are available
-                teacher_assignment = TeacherAssignment.query.filter_by(
-                    class_id=cs.class_id,
-                    subject_id=cs.subject_id
-                ).first()
-
-                teacher_data = None
-                if teacher_assignment:
-                    teacher = User.query.get(teacher_assignment.teacher_id)
-                    if teacher:
-                        teacher_data = {
-                            "id": teacher.id,
-                            "name": teacher.name,
-                            "first_name": teacher.first_name
-                        }
-
-                subjects_list.append({
-                    "id": subject.id,
-                    "name": subject.name,
-                    "teacher": teacher_data
-                })
-
-        return jsonify({"subjects": subjects_list}), 200
+        return jsonify({"subjects": _subjects_list(class_group)}), 200
 
     # Add a subject to a class
 
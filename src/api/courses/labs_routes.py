@@ -1,61 +1,109 @@
 from flask import request, jsonify
+from sqlalchemy import select, update
 from models.lab import Lab, LabStatus
 from models.user import Role
 from models.subject import Subject
 from config import Base
 from datetime import datetime
 from api.utils.auth_helpers import token_required, admin_required, teacher_required
+from api.utils.pagination import keyset_page, ordered_keyset_page
+from api.utils.response_cache import cached_response
+from api.utils.resources import LAB
+from api.utils.export import export_format, stream_export
+from api.utils.conditional import collection_etag, etag_header, not_modified
+from api.utils import cascade
+
+
+def pending_labs_query():
+    """LAB rows of the labs awaiting approval; paged by (creation_date, id)."""
+    return LAB.query().filter(Lab.status == LabStatus.pending)
 
 
 def labs_routes(bp):
     # Get all labs
     @bp.route('', methods=['GET'])
     @token_required
+    @cached_response('lab', resource=LAB)
     def get_all_labs(current_user):
-        # Filter by subject_id if provided
-        subject_id = request.args.get('subject_id')
-        query = Lab.query
+        try:
+            fields, includes = LAB.parse()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Included subjects and creators change the response too
+        etag = collection_etag(*LAB.tables(includes))
+        if not_modified(etag):
+            return '', 304, etag_header(etag)
+
+        query = LAB.query(fields, includes)
+
+        # Filter by subject_id, created_by and status if provided
+        subject_id = request.args.get('subject_id', type=int)
+        if subject_id is not None:
+            query = query.filter(Lab.subject_id == subject_id)
 
-        if subject_id:
-            query = query.filter_by(subject_id=subject_id)
+        created_by = request.args.get('created_by', type=int)
+        if created_by is not None:
+            query = query.filter(Lab.created_by == created_by)
 
-        labs = query.all()
-        labs_list = []
+        status = request.args.get('status')
+        if status:
+            if status not in LabStatus.__members__:
+                return jsonify({"error": "Invalid status"}), 400
+            query = query.filter(Lab.status == LabStatus[status])
+
+        labs, next_cursor = keyset_page(query, Lab.id)
+        labs_list = LAB.serialize(labs, fields, includes)
 
-        for lab in labs:
-            labs_list.append({
-                "id": lab.id,
-                "name": lab.name,
-                "subject_id": lab.subject_id,
-                "created_by": lab.created_by,
-                "status": lab.status.value,
-                "creation_date": lab.creation_date.isoformat(),
-                "approval_date": lab.approval_date.isoformat() if lab.approval_date else None
-            })
+        return jsonify({"labs": labs_list, "next_cursor": next_cursor}), 200, etag_header(etag)
 
-        return jsonify({"labs": labs_list}), 200
+    # Stream all labs as NDJSON or CSV (teacher or admin)
+    @bp.route('/export', methods=['GET'])
+    @token_required
+    @teacher_required
+    def export_labs(current_user):
+        try:
+            fmt = export_format()
+            fields, includes = LAB.parse()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        query = LAB.query(fields, includes).order_by(Lab.id)
+        status = request.args.get('status')
+        if status:
+            if status not in LabStatus.__members__:
+                return jsonify({"error": "Invalid status"}), 400
+            query = query.filter(Lab.status == LabStatus[status])
+
+        return stream_export(query, LAB, fmt, 'labs', fields, includes)
+
+    # Labs awaiting approval, oldest first (admin only)
+    @bp.route('/pending', methods=['GET'])
+    @token_required
+    @admin_required
+    def get_pending_labs(current_user):
+        try:
+            labs, next_cursor = ordered_keyset_page(
+                pending_labs_query(), Lab.creation_date, Lab.id)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+        return jsonify({"labs": LAB.serialize(labs), "next_cursor": next_cursor}), 200
 
     # Get lab by ID
     @bp.route('/<int:lab_id>', methods=['GET'])
     @token_required
     def get_lab(current_user, lab_id):
-        lab = Lab.query.get(lab_id)
+        try:
+            fields, includes = LAB.parse()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        lab = LAB.query(fields, includes).filter(Lab.id == lab_id).first()
         if not lab:
             return jsonify({"error": "Lab not found"}), 404
 
-        lab_data = {
-            "id": lab.id,
-            "name": lab.name,
-            "subject_id": lab.subject_id,
-            "created_by": lab.created_by,
-            "status": lab.status.value,
-            "creation_date": lab.creation_date.isoformat(),
-            "approval_date": lab.approval_date.isoformat() if lab.approval_date else None,
-            "description": lab.description if hasattr(lab, 'description') else None,
-            "instructions": lab.instructions if hasattr(lab, 'instructions') else None
-        }
-
-        return jsonify(lab_data), 200
+        return jsonify(LAB.serializer(fields, includes)(lab)), 200
 
     # Create a new lab (teacher only)
     @bp.route('', methods=['POST'])
@@ -176,6 +224,51 @@ def labs_routes(bp):
             Base.session.rollback()
             return jsonify({"error": f"Database error: {str(e)}"}), 500
 
+    # Update the status of many labs in one statement (admin only)
+    @bp.route('/status', methods=['PUT'])
+    @token_required
+    @admin_required
+    def bulk_update_lab_status(current_user):
+        data = request.get_json()
+
+        if 'status' not in data or 'lab_ids' not in data:
+            return jsonify({"error": "Status and lab_ids are required"}), 400
+        if not isinstance(data['lab_ids'], list):
+            return jsonify({"error": "lab_ids must be a list"}), 400
+        try:
+            lab_ids = list(dict.fromkeys(int(i) for i in data['lab_ids']))
+        except (TypeError, ValueError):
+            return jsonify({"error": "lab_ids must be integers"}), 400
+
+        if data['status'] == 'approved':
+            values = {"status": LabStatus.approved,
+                      "approval_date": datetime.utcnow()}
+        elif data['status'] == 'rejected':
+            values = {"status": LabStatus.rejected}
+        elif data['status'] == 'pending':
+            values = {"status": LabStatus.pending, "approval_date": None}
+        else:
+            return jsonify({"error": "Invalid status"}), 400
+
+        found = set(Base.session.execute(
+            select(Lab.id).where(Lab.id.in_(lab_ids))).scalars())
+
+        try:
+            if found:
+                Base.session.execute(
+                    update(Lab).where(Lab.id.in_(found)).values(**values),
+                    execution_options={"synchronize_session": False}
+                )
+            Base.session.commit()
+            return jsonify({
+                "success": True,
+                "updated": sorted(found),
+                "not_found": [i for i in lab_ids if i not in found]
+            }), 200
+        except Exception as e:
+            Base.session.rollback()
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
+
     # Delete lab (admin only)
     @bp.route('/<int:lab_id>', methods=['DELETE'])
     @token_required
@@ -185,12 +278,20 @@ def labs_routes(bp):
         if not lab:
             return jsonify({"error": "Lab not found"}), 404
 
+        # Pass ?dry_run=true to get the row counts without deleting
+        if request.args.get('dry_run', 'false').lower() == 'true':
+            return jsonify({
+                "dry_run": True,
+                "counts": cascade.delete_lab(lab_id, dry_run=True)
+            }), 200
+
         try:
-            Base.session.delete(lab)
+            counts = cascade.delete_lab(lab_id)
             Base.session.commit()
             return jsonify({
                 "success": True,
-                "message": "Lab deleted successfully"
+                "message": "Lab deleted successfully",
+                "counts": counts
             }), 200
         except Exception as e:
             Base.session.rollback()
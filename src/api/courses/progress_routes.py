@@ -3,11 +3,32 @@ from models.student_lab_progress import StudentLabProgress, ProgressStatus
 from models.student import Student
 from models.lab import Lab
 from models.user import Role, User
+from models.progress_rollup import ClassLabProgressRollup, StudentProgressRollup
 from config import Base
 from api.utils.auth_helpers import token_required
+from api.utils.conditional import (make_etag, progress_etag, etag_header,
+                                   not_modified, precondition_failed)
+from api.utils.progress_rollups import record_progress_change
+from api.utils.autosave import autosave_buffer, VersionConflict, InvalidPatch
+from api.utils.work_snapshots import snapshot_text
+from api.utils.pagination import keyset_page
+from api.utils.resources import PROGRESS, CLASS_PROGRESS
+from api.utils.export import export_format, stream_export
+from models.work_data_snapshot import WorkDataSnapshot
+from sqlalchemy.orm.exc import StaleDataError
 from datetime import datetime
 
 
+def _find_snapshot(student_id, lab_id, snapshot_id):
+    return WorkDataSnapshot.query.join(
+        StudentLabProgress, StudentLabProgress.id == WorkDataSnapshot.progress_id
+    ).filter(
+        WorkDataSnapshot.id == snapshot_id,
+        StudentLabProgress.student_id == student_id,
+        StudentLabProgress.lab_id == lab_id
+    ).first()
+
+
 def progress_routes(bp):
     # Get progress for a student
     @bp.route('/students/<int:student_id>/progress', methods=['GET'])
@@ -22,26 +43,50 @@ def progress_routes(bp):
         if current_user.role == Role.student and current_user.id != student.user_id:
             return jsonify({"error": "Unauthorized access"}), 403
 
-        # Get all progress entries for this student
-        progress_entries = StudentLabProgress.query.filter_by(
-            student_id=student_id).all()
-        progress_list = []
-
-        for entry in progress_entries:
-            lab = Lab.query.get(entry.lab_id)
-            if lab:
-                progress_list.append({
-                    "id": entry.id,
-                    "lab_id": entry.lab_id,
-                    "lab_name": lab.name,
-                    "status": entry.status.value,
-                    "start_date": entry.start_date.isoformat() if entry.start_date else None,
-                    "completion_date": entry.completion_date.isoformat() if entry.completion_date else None,
-                    "score": entry.score,
-                    "comments": entry.comments
-                })
-
-        return jsonify({"progress": progress_list}), 200
+        # Progress rows with their lab names, without the work data
+        progress_entries = PROGRESS.query().filter(
+            StudentLabProgress.student_id == student_id
+        ).order_by(StudentLabProgress.id).all()
+
+        # Row versions change on every update, so they identify the list
+        etag = make_etag([(entry.id, entry.version, entry.lab_name)
+                          for entry in progress_entries])
+        if not_modified(etag):
+            return '', 304, etag_header(etag)
+
+        progress_list = PROGRESS.serialize(progress_entries)
+
+        return jsonify({"progress": progress_list}), 200, etag_header(etag)
+
+    # Get student progress for one lab
+    @bp.route('/students/<int:student_id>/labs/<int:lab_id>/progress', methods=['GET'])
+    @token_required
+    def get_lab_progress(current_user, student_id, lab_id):
+        # Students can only view their own progress
+        if current_user.role == Role.student and current_user.id != student_id:
+            return jsonify({"error": "Unauthorized access"}), 403
+
+        progress = StudentLabProgress.query.filter_by(
+            student_id=student_id,
+            lab_id=lab_id
+        ).first()
+        if not progress:
+            return jsonify({"error": "Progress not found"}), 404
+
+        etag = progress_etag(progress)
+        if not_modified(etag):
+            return '', 304, etag_header(etag)
+
+        return jsonify({
+            "id": progress.id,
+            "lab_id": progress.lab_id,
+            "status": progress.status.value,
+            "start_date": progress.start_date.isoformat() if progress.start_date else None,
+            "completion_date": progress.completion_date.isoformat() if progress.completion_date else None,
+            "score": progress.score,
+            "comments": progress.comments,
+            "version": progress.version
+        }), 200, etag_header(etag)
 
     # Update student progress for a lab
     @bp.route('/students/<int:student_id>/labs/<int:lab_id>/progress', methods=['POST'])
@@ -63,13 +108,30 @@ def progress_routes(bp):
 
         data = request.get_json()
 
+        # Persist any buffered autosave before changing the row; a conflict
+        # means the stored work data is already newer (and was logged)
+        try:
+            autosave_buffer.flush([(student_id, lab_id)], snapshot=True)
+        except VersionConflict:
+            pass
+
         # Get existing progress or create new entry
         progress = StudentLabProgress.query.filter_by(
             student_id=student_id,
             lab_id=lab_id
         ).first()
 
-        if not progress:
+        # Refuse writes based on a stale copy (If-Match)
+        if precondition_failed(progress_etag(progress) if progress else None):
+            return jsonify({
+                "error": "Progress has changed, reload it before updating",
+                "version": progress.version if progress else None
+            }), 412
+
+        previous = None
+        if progress:
+            previous = (progress.status, progress.score)
+        else:
             progress = StudentLabProgress(
                 student_id=student_id,
                 lab_id=lab_id,
@@ -110,17 +172,200 @@ def progress_routes(bp):
         if 'comments' in data:
             progress.comments = data['comments']
 
-        # Save changes
+        # Save changes along with the rollup counters
         try:
+            record_progress_change(
+                student.class_id, student_id, lab_id,
+                previous, (progress.status, progress.score)
+            )
             Base.session.commit()
             return jsonify({
                 "success": True,
-                "message": "Progress updated successfully"
-            }), 200
+                "message": "Progress updated successfully",
+                "version": progress.version
+            }), 200, etag_header(progress_etag(progress))
+        except StaleDataError:
+            # Another writer updated the row after we read it
+            Base.session.rollback()
+            return jsonify({
+                "error": "Progress has changed, reload it before updating"
+            }), 412
         except Exception as e:
             Base.session.rollback()
             return jsonify({"error": f"Database error: {str(e)}"}), 500
 
+    # Get the current lab work document and its version
+    @bp.route('/students/<int:student_id>/labs/<int:lab_id>/autosave', methods=['GET'])
+    @token_required
+    def get_lab_work(current_user, student_id, lab_id):
+        if current_user.role == Role.student and current_user.id != student_id:
+            return jsonify({"error": "Unauthorized access"}), 403
+
+        progress = StudentLabProgress.query.filter_by(
+            student_id=student_id,
+            lab_id=lab_id
+        ).first()
+        if not progress:
+            return jsonify({"version": 0, "work_data": ""}), 200
+
+        work_data, version = autosave_buffer.read(progress)
+        return jsonify({"version": version, "work_data": work_data}), 200
+
+    # Autosave lab work as a patch against a known version
+    @bp.route('/students/<int:student_id>/labs/<int:lab_id>/autosave', methods=['POST'])
+    @token_required
+    def autosave_lab_work(current_user, student_id, lab_id):
+        # Students can only save their own work
+        if current_user.role == Role.student and current_user.id != student_id:
+            return jsonify({"error": "Unauthorized access"}), 403
+
+        data = request.get_json()
+
+        if 'base_version' not in data or not isinstance(data['base_version'], int):
+            return jsonify({"error": "base_version is required"}), 400
+        if 'patch' not in data and not isinstance(data.get('work_data'), str):
+            return jsonify({"error": "patch or work_data is required"}), 400
+
+        progress = StudentLabProgress.query.filter_by(
+            student_id=student_id,
+            lab_id=lab_id
+        ).first()
+
+        # First save of this lab starts the progress row
+        if not progress:
+            student = Student.query.get(student_id)
+            if not student:
+                return jsonify({"error": "Student not found"}), 404
+            if not Lab.query.get(lab_id):
+                return jsonify({"error": "Lab not found"}), 404
+
+            progress = StudentLabProgress(
+                student_id=student_id,
+                lab_id=lab_id,
+                status=ProgressStatus.in_progress,
+                start_date=datetime.utcnow()
+            )
+            Base.session.add(progress)
+            try:
+                record_progress_change(student.class_id, student_id, lab_id,
+                                       None, (progress.status, progress.score))
+                Base.session.commit()
+            except Exception as e:
+                Base.session.rollback()
+                return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+        try:
+            version = autosave_buffer.save(
+                progress, data['base_version'],
+                patch=data.get('patch'), text=data.get('work_data'))
+            if data.get('submit'):
+                autosave_buffer.flush([(student_id, lab_id)], snapshot=True)
+        except VersionConflict as e:
+            return jsonify({
+                "error": "Work data has changed, reload it before saving",
+                "version": e.current_version
+            }), 409
+        except InvalidPatch as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+        return jsonify({"success": True, "version": version}), 200
+
+    # List the work data snapshots of a lab, oldest first
+    @bp.route('/students/<int:student_id>/labs/<int:lab_id>/snapshots', methods=['GET'])
+    @token_required
+    def get_work_snapshots(current_user, student_id, lab_id):
+        if current_user.role == Role.student and current_user.id != student_id:
+            return jsonify({"error": "Unauthorized access"}), 403
+
+        progress = StudentLabProgress.query.filter_by(
+            student_id=student_id,
+            lab_id=lab_id
+        ).first()
+        if not progress:
+            return jsonify({"snapshots": [], "next_cursor": None}), 200
+
+        snapshots, next_cursor = keyset_page(
+            WorkDataSnapshot.query.filter_by(progress_id=progress.id),
+            WorkDataSnapshot.id)
+        return jsonify({
+            "snapshots": [{
+                "id": snapshot.id,
+                "version": snapshot.version,
+                "size": snapshot.size,
+                "created_at": snapshot.created_at.isoformat()
+            } for snapshot in snapshots],
+            "next_cursor": next_cursor
+        }), 200
+
+    # Get the work data stored in one snapshot
+    @bp.route('/students/<int:student_id>/labs/<int:lab_id>/snapshots/<int:snapshot_id>', methods=['GET'])
+    @token_required
+    def get_work_snapshot(current_user, student_id, lab_id, snapshot_id):
+        if current_user.role == Role.student and current_user.id != student_id:
+            return jsonify({"error": "Unauthorized access"}), 403
+
+        snapshot = _find_snapshot(student_id, lab_id, snapshot_id)
+        if not snapshot:
+            return jsonify({"error": "Snapshot not found"}), 404
+
+        return jsonify({
+            "id": snapshot.id,
+            "version": snapshot.version,
+            "created_at": snapshot.created_at.isoformat(),
+            "work_data": snapshot_text(snapshot)
+        }), 200
+
+    # Restore a snapshot as the newest version of the work data
+    @bp.route('/students/<int:student_id>/labs/<int:lab_id>/snapshots/<int:snapshot_id>/restore', methods=['POST'])
+    @token_required
+    def restore_work_snapshot(current_user, student_id, lab_id, snapshot_id):
+        # Students can only restore their own work
+        if current_user.role == Role.student and current_user.id != student_id:
+            return jsonify({"error": "Unauthorized access"}), 403
+
+        snapshot = _find_snapshot(student_id, lab_id, snapshot_id)
+        if not snapshot:
+            return jsonify({"error": "Snapshot not found"}), 404
+
+        progress = StudentLabProgress.query.get(snapshot.progress_id)
+        try:
+            _, version = autosave_buffer.read(progress)
+            version = autosave_buffer.save(progress, version,
+                                           text=snapshot_text(snapshot))
+            autosave_buffer.flush([(student_id, lab_id)], snapshot=True)
+        except VersionConflict as e:
+            return jsonify({
+                "error": "Work data has changed, reload it before saving",
+                "version": e.current_version
+            }), 409
+        except Exception as e:
+            return jsonify({"error": f"Database error: {str(e)}"}), 500
+
+        return jsonify({"success": True, "version": version}), 200
+
+    # Stream a class's lab grades as NDJSON or CSV (teacher only)
+    @bp.route('/classes/<int:class_id>/export', methods=['GET'])
+    @token_required
+    def export_class_progress(current_user, class_id):
+        # Only teachers and admins can export class progress
+        if current_user.role == Role.student:
+            return jsonify({"error": "Unauthorized access"}), 403
+
+        try:
+            fmt = export_format()
+            fields, includes = CLASS_PROGRESS.parse()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        query = CLASS_PROGRESS.query(fields, includes).filter(
+            Student.class_id == class_id
+        ).order_by(StudentLabProgress.student_id, StudentLabProgress.lab_id)
+
+        return stream_export(query, CLASS_PROGRESS, fmt,
+                             f'class-{class_id}-progress', fields, includes)
+
     # Get progress stats for a class (teacher only)
     @bp.route('/classes/<int:class_id>/progress', methods=['GET'])
     @token_required
@@ -129,74 +374,57 @@ def progress_routes(bp):
         if current_user.role == Role.student:
             return jsonify({"error": "Unauthorized access"}), 403
 
-        # Get all students in the class
-        students = Student.query.filter_by(class_id=class_id).all()
+        # Get all students in the class with their rollup counters
+        students = Base.session.query(
+            Student.user_id, User.first_name, User.name, User.email,
+            StudentProgressRollup.completed,
+            StudentProgressRollup.in_progress,
+            StudentProgressRollup.not_started,
+            StudentProgressRollup.score_total
+        ).join(User, User.id == Student.user_id).outerjoin(
+            StudentProgressRollup,
+            StudentProgressRollup.student_id == Student.user_id
+        ).filter(
+            Student.class_id == class_id
+        ).order_by(Student.user_id).all()
+
+        # Per-lab completion histogram
+        lab_rows = ClassLabProgressRollup.query.filter(
+            ClassLabProgressRollup.class_id == class_id,
+            ClassLabProgressRollup.completed
+            + ClassLabProgressRollup.in_progress
+            + ClassLabProgressRollup.not_started > 0
+        ).order_by(ClassLabProgressRollup.lab_id).all()
 
         class_progress = {
             "student_count": len(students),
-            "lab_completion": {},
+            "lab_completion": [],
             "student_stats": []
         }
 
-        # Calculate stats for each student
         for student in students:
-            user = User.query.get(student.user_id)
-            if not user:
-                continue
-
-            progress_entries = StudentLabProgress.query.filter_by(
-                student_id=student.id).all()
-
-            completed = 0
-            in_progress = 0
-            not_started = 0
+            completed = student.completed or 0
             avg_score = 0
-
-            for entry in progress_entries:
-                if entry.status == ProgressStatus.completed:
-                    completed += 1
-                    if entry.score:
-                        avg_score += entry.score
-                elif entry.status == ProgressStatus.in_progress:
-                    in_progress += 1
-                else:
-                    not_started += 1
-
-                # Aggregate lab completion data
-                if entry.lab_id not in class_progress["lab_completion"]:
-                    class_progress["lab_completion"][entry.lab_id] = {
-                        "lab_id": entry.lab_id,
-                        "completed": 0,
-                        "in_progress": 0,
-                        "not_started": 0
-                    }
-
-                if entry.status == ProgressStatus.completed:
-                    class_progress["lab_completion"][entry.lab_id]["completed"] += 1
-                elif entry.status == ProgressStatus.in_progress:
-                    class_progress["lab_completion"][entry.lab_id]["in_progress"] += 1
-                else:
-                    class_progress["lab_completion"][entry.lab_id]["not_started"] += 1
-
-            # Calculate average score
             if completed > 0:
-                avg_score /= completed
+                avg_score = student.score_total / completed
 
-            student_stats = {
-                "student_id": student.id,
+            class_progress["student_stats"].append({
+                "student_id": student.user_id,
                 "user_id": student.user_id,
-                "name": f"{user.first_name} {user.name}",
-                "email": user.username,
+                "name": f"{student.first_name} {student.name}",
+                "email": student.email,
                 "completed": completed,
-                "in_progress": in_progress,
-                "not_started": not_started,
+                "in_progress": student.in_progress or 0,
+                "not_started": student.not_started or 0,
                 "avg_score": round(avg_score, 2)
-            }
-
-            class_progress["student_stats"].append(student_stats)
+            })
 
-        # Convert lab_completion dict to list
-        class_progress["lab_completion"] = list(
-            class_progress["lab_completion"].values())
+        for row in lab_rows:
+            class_progress["lab_completion"].append({
+                "lab_id": row.lab_id,
+                "completed": row.completed,
+                "in_progress": row.in_progress,
+                "not_started": row.not_started
+            })
 
         return jsonify(class_progress), 200
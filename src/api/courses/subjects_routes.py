@@ -3,35 +3,43 @@ from models.subject import Subject
 from models.user import Role
 from config import Base
 from api.utils.auth_helpers import token_required, admin_required, teacher_required
+from api.utils.pagination import keyset_page
+from api.utils.response_cache import cached_response
+from api.utils.resources import SUBJECT
+from api.utils.conditional import collection_etag, etag_header, not_modified
+from api.utils import cascade
 
 def subjects_routes(bp):
     # Get all subjects
     @bp.route('', methods=['GET'])
     @token_required
+    @cached_response('subject')
     def get_all_subjects(current_user):
-        subjects = Subject.query.all()
-        subjects_list = []
+        etag = collection_etag('subject')
+        if not_modified(etag):
+            return '', 304, etag_header(etag)
 
-        for subject in subjects:
-            subjects_list.append({
-                "id": subject.id,
-                "name": subject.name
-            })
+        try:
+            fields, includes = SUBJECT.parse()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        subjects, next_cursor = keyset_page(
+            SUBJECT.query(fields, includes), Subject.id)
+        subjects_list = SUBJECT.serialize(subjects, fields, includes)
 
-        return jsonify({"subjects": subjects_list}), 200
+        return jsonify({"subjects": subjects_list, "next_cursor": next_cursor}), 200, etag_header(etag)
     
     # Get subject by ID
     @bp.route('/<int:subject_id>', methods=['GET'])
     @token_required
+    @cached_response('subject')
     def get_subject(current_user, subject_id):
-        subject = Subject.query.get(subject_id)
+        subject = SUBJECT.query().filter(Subject.id == subject_id).first()
         if not subject:
             return jsonify({"error": "Subject not found"}), 404
 
-        return jsonify({
-            "id": subject.id,
-            "name": subject.name
-        }), 200
+        return jsonify(SUBJECT.serializer()(subject)), 200
     
     # Create a new subject (admin or teacher only)
     @bp.route('', methods=['POST'])
@@ -107,13 +115,21 @@ def subjects_routes(bp):
         subject = Subject.query.get(subject_id)
         if not subject:
             return jsonify({"error": "Subject not found"}), 404
-            
+
+        # Pass ?dry_run=true to get the row counts without deleting
+        if request.args.get('dry_run', 'false').lower() == 'true':
+            return jsonify({
+                "dry_run": True,
+                "counts": cascade.delete_subject(subject_id, dry_run=True)
+            }), 200
+
         try:
-            Base.session.delete(subject)
+            counts = cascade.delete_subject(subject_id)
             Base.session.commit()
             return jsonify({
                 "success": True,
-                "message": "Subject deleted successfully"
+                "message": "Subject deleted successfully",
+                "counts": counts
             }), 200
         except Exception as e:
             Base.session.rollback()
@@ -0,0 +1 @@
+from .dashboard_routes import dashboard_routes
@@ -0,0 +1,219 @@
+from flask import jsonify
+from sqlalchemy import select, func
+from sqlalchemy.orm import load_only
+from models.user import User, Role
+from models.student import Student
+from models.class_group import ClassGroup
+from models.class_subject import ClassSubject
+from models.subject import Subject
+from models.lab import Lab, LabStatus
+from models.teacher_assignment import TeacherAssignment
+from models.student_lab_progress import StudentLabProgress, ProgressStatus
+from models.progress_rollup import ClassLabProgressRollup
+from config import Base
+from api.utils.auth_helpers import token_required
+from api.utils.resources import LAB
+from api.courses.labs_routes import pending_labs_query
+
+# Pending labs listed on the admin dashboard, oldest first
+PENDING_LABS_SHOWN = 10
+
+
+def _profile(current_user):
+    return {
+        "id": current_user.id,
+        "email": current_user.email,
+        "first_name": current_user.first_name,
+        "name": current_user.name,
+        "role": current_user.role.name
+    }
+
+
+# Lab entries are LAB rows, shaped like GET /api/labs
+_lab_entry = LAB.serializer()
+
+
+def _summary(counts):
+    # counts: {status value: rows} plus the total score of completed labs
+    completed = counts.get(ProgressStatus.completed.value, 0)
+    score_total = counts.get('score_total') or 0.0
+    return {
+        "completed": completed,
+        "in_progress": counts.get(ProgressStatus.in_progress.value, 0),
+        "not_started": counts.get(ProgressStatus.not_started.value, 0),
+        "average_score": round(score_total / completed, 2) if completed else None
+    }
+
+
+def _student_dashboard(current_user):
+    # 1: class
+    class_group = Base.session.execute(
+        select(ClassGroup).join(Student, Student.class_id == ClassGroup.id)
+        .where(Student.user_id == current_user.id)
+    ).scalar()
+    if not class_group:
+        return {"user": _profile(current_user), "class": None,
+                "subjects": [], "labs": [], "progress": _summary({})}
+
+    # 2: subjects of the class
+    subjects = Base.session.execute(
+        select(Subject).join(ClassSubject, ClassSubject.subject_id == Subject.id)
+        .where(ClassSubject.class_id == class_group.id).order_by(Subject.id)
+    ).scalars().all()
+
+    # 3: approved labs of those subjects
+    labs = LAB.query().filter(
+        Lab.subject_id.in_([subject.id for subject in subjects]),
+        Lab.status == LabStatus.approved
+    ).order_by(Lab.id).all()
+
+    # 4: the student's progress rows, without the work data
+    progress_rows = Base.session.execute(
+        select(StudentLabProgress)
+        .options(load_only(StudentLabProgress.lab_id, StudentLabProgress.status,
+                           StudentLabProgress.score, StudentLabProgress.version))
+        .where(StudentLabProgress.student_id == current_user.id)
+    ).scalars().all()
+    progress = {row.lab_id: row for row in progress_rows}
+
+    counts = {}
+    labs_list = []
+    for lab in labs:
+        row = progress.get(lab.id)
+        status = row.status if row else ProgressStatus.not_started
+        counts[status.value] = counts.get(status.value, 0) + 1
+        if status == ProgressStatus.completed and row.score is not None:
+            counts['score_total'] = counts.get('score_total', 0.0) + row.score
+        labs_list.append({
+            **_lab_entry(lab),
+            "progress": {
+                "status": status.value,
+                "score": row.score if row else None,
+                "version": row.version if row else None
+            }
+        })
+
+    return {
+        "user": {**_profile(current_user), "class_id": class_group.id},
+        "class": {"id": class_group.id, "name": class_group.name},
+        "subjects": [{"id": subject.id, "name": subject.name}
+                     for subject in subjects],
+        "labs": labs_list,
+        "progress": _summary(counts)
+    }
+
+
+def _teacher_dashboard(current_user):
+    # 1: assignments with their class and subject
+    assignments = Base.session.execute(
+        select(TeacherAssignment.class_id, ClassGroup.name,
+               TeacherAssignment.subject_id, Subject.name)
+        .join(ClassGroup, ClassGroup.id == TeacherAssignment.class_id)
+        .join(Subject, Subject.id == TeacherAssignment.subject_id)
+        .where(TeacherAssignment.teacher_id == current_user.id)
+        .order_by(TeacherAssignment.class_id, TeacherAssignment.subject_id)
+    ).all()
+    class_ids = sorted({class_id for class_id, _, _, _ in assignments})
+    subject_ids = sorted({subject_id for _, _, subject_id, _ in assignments})
+
+    # 2: labs of the taught subjects and labs the teacher created
+    labs = LAB.query().filter(
+        Lab.subject_id.in_(subject_ids) | (Lab.created_by == current_user.id)
+    ).order_by(Lab.id).all()
+
+    # 3: student counts per class
+    student_counts = dict(Base.session.execute(
+        select(Student.class_id, func.count())
+        .where(Student.class_id.in_(class_ids)).group_by(Student.class_id)
+    ).all())
+
+    # 4: progress totals per class over the labs of the subjects this
+    # teacher teaches there, from the rollups
+    taught = select(TeacherAssignment.teacher_id).where(
+        TeacherAssignment.teacher_id == current_user.id,
+        TeacherAssignment.class_id == ClassLabProgressRollup.class_id,
+        TeacherAssignment.subject_id == Lab.subject_id)
+    progress = {
+        class_id: {
+            ProgressStatus.completed.value: completed,
+            ProgressStatus.in_progress.value: in_progress,
+            ProgressStatus.not_started.value: not_started,
+            'score_total': score_total
+        }
+        for class_id, completed, in_progress, not_started, score_total
+        in Base.session.execute(
+            select(ClassLabProgressRollup.class_id,
+                   func.sum(ClassLabProgressRollup.completed),
+                   func.sum(ClassLabProgressRollup.in_progress),
+                   func.sum(ClassLabProgressRollup.not_started),
+                   func.sum(ClassLabProgressRollup.score_total))
+            .join(Lab, Lab.id == ClassLabProgressRollup.lab_id)
+            .where(ClassLabProgressRollup.class_id.in_(class_ids),
+                   taught.exists())
+            .group_by(ClassLabProgressRollup.class_id)
+        ).all()
+    }
+
+    classes = {}
+    for class_id, class_name, subject_id, subject_name in assignments:
+        entry = classes.setdefault(class_id, {
+            "id": class_id,
+            "name": class_name,
+            "student_count": student_counts.get(class_id, 0),
+            "subjects": [],
+            "progress": _summary(progress.get(class_id, {}))
+        })
+        entry["subjects"].append({"id": subject_id, "name": subject_name})
+
+    return {
+        "user": _profile(current_user),
+        "classes": list(classes.values()),
+        "labs": [_lab_entry(lab) for lab in labs]
+    }
+
+
+def _admin_dashboard(current_user):
+    # 1: users per role
+    users = dict(Base.session.execute(
+        select(User.role, func.count()).group_by(User.role)
+    ).all())
+
+    # 2: labs per status
+    labs = dict(Base.session.execute(
+        select(Lab.status, func.count()).group_by(Lab.status)
+    ).all())
+
+    # 3: class and subject totals
+    class_count, subject_count = Base.session.execute(
+        select(select(func.count()).select_from(ClassGroup).scalar_subquery(),
+               select(func.count()).select_from(Subject).scalar_subquery())
+    ).one()
+
+    # 4: oldest labs awaiting approval
+    pending = pending_labs_query().order_by(
+        Lab.creation_date, Lab.id).limit(PENDING_LABS_SHOWN).all()
+
+    return {
+        "user": _profile(current_user),
+        "counts": {
+            "users": {role.name: users.get(role, 0) for role in Role},
+            "labs": {status.value: labs.get(status, 0) for status in LabStatus},
+            "classes": class_count,
+            "subjects": subject_count
+        },
+        "pending_labs": [_lab_entry(lab) for lab in pending]
+    }
+
+
+def dashboard_routes(bp):
+    # Everything the current user's home page needs, in one response
+    @bp.route('/dashboard', methods=['GET'])
+    @token_required
+    def get_dashboard(current_user):
+        if current_user.role == Role.student:
+            dashboard = _student_dashboard(current_user)
+        elif current_user.role == Role.teacher:
+            dashboard = _teacher_dashboard(current_user)
+        else:
+            dashboard = _admin_dashboard(current_user)
+        return jsonify(dashboard), 200
@@ -0,0 +1,44 @@
+from flask import jsonify
+from config import Base
+from db_metrics import pool_status
+from compression import compression_stats
+from api.utils.auth_helpers import token_required, admin_required, token_cache
+from api.utils.autosave import autosave_buffer
+from api.utils.response_cache import response_cache
+
+
+def metrics_routes(bp):
+    # Token cache counters, for sizing TOKEN_CACHE_SIZE (admin only)
+    @bp.route('/token-cache', methods=['GET'])
+    @token_required
+    @admin_required
+    def get_token_cache_stats(current_user):
+        return jsonify({"token_cache": token_cache.stats()}), 200
+
+    # Connection pool usage and checkout wait times (admin only)
+    @bp.route('/db-pool', methods=['GET'])
+    @token_required
+    @admin_required
+    def get_db_pool_stats(current_user):
+        return jsonify({"db_pool": pool_status(Base.engine)}), 200
+
+    # Autosave buffer size and coalescing counters (admin only)
+    @bp.route('/autosave', methods=['GET'])
+    @token_required
+    @admin_required
+    def get_autosave_stats(current_user):
+        return jsonify({"autosave": autosave_buffer.stats()}), 200
+
+    # Response cache hit ratio and memory use (admin only)
+    @bp.route('/response-cache', methods=['GET'])
+    @token_required
+    @admin_required
+    def get_response_cache_stats(current_user):
+        return jsonify({"response_cache": response_cache.stats()}), 200
+
+    # Compressed responses, bytes saved and CPU cost (admin only)
+    @bp.route('/compression', methods=['GET'])
+    @token_required
+    @admin_required
+    def get_compression_stats(current_user):
+        return jsonify({"compression": compression_stats.snapshot()}), 200
@@ -2,7 +2,7 @@ from flask import request, jsonify
 from models.user import User
 from models.student import Student
 from config import Base
-from werkzeug.security import check_password_hash, generate_password_hash
+from api.utils.passwords import hash_password, verify_password
 from api.utils.auth_helpers import token_required
 
 
@@ -42,14 +42,13 @@ def profile_routes(bp):
 
         # Change password
         if 'current_password' in data and 'new_password' in data:
-            if not check_password_hash(current_user.password, data['current_password']):
+            if not verify_password(current_user.password, data['current_password']):
                 return jsonify({'error': 'Current password is incorrect'}), 400
 
             if len(data['new_password']) < 8:
                 return jsonify({'error': 'Password must be at least 8 characters'}), 400
 
-            current_user.password = generate_password_hash(
-                data['new_password'])
+            current_user.password = hash_password(data['new_password'])
 
         # Save changes
         try:
@@ -0,0 +1,165 @@
+"""Streaming bulk user import.
+
+Rows are read from a CSV or NDJSON request body and processed in chunks
+of IMPORT_CHUNK_SIZE: one query to find emails already registered, one
+parallel hashing batch, one multi-row INSERT for the users and one for
+their Student rows. Each chunk is committed on its own; a chunk the
+database rejects is rolled back and reported row by row, and the import
+carries on with the next one. Emails are compared in lower case, like
+the database collation.
+"""
+import csv
+import io
+import json
+import re
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from models.user import User, Role
+from models.student import Student
+from models.class_group import ClassGroup
+from config import Base
+from api.utils.passwords import hash_passwords
+
+IMPORT_CHUNK_SIZE = 1000
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
+REQUIRED_FIELDS = ('email', 'password', 'first_name', 'last_name')
+
+
+def read_rows(stream, fmt):
+    """Yield one dict per CSV line or NDJSON line of a binary stream."""
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if fmt == 'csv':
+        yield from csv.DictReader(text)
+        return
+    for line in text:
+        if line.strip():
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield row if isinstance(row, dict) else {'_invalid': line.strip()}
+
+
+def _class_id(value):
+    # NDJSON may carry any JSON type: only integers and digit strings
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(value)
+    return int(value)
+
+
+def _validate(row, seen_emails, known_classes):
+    if '_invalid' in row:
+        return 'Invalid JSON line'
+    for field in REQUIRED_FIELDS:
+        if not row.get(field):
+            return f'Missing required field: {field}'
+        if not isinstance(row[field], str):
+            return f'Field must be a string: {field}'
+    if not EMAIL_PATTERN.match(row['email']):
+        return 'Invalid email format'
+    if row['email'] in seen_emails:
+        return 'Duplicate email in import'
+    role = row.get('role') or 'student'
+    if not isinstance(role, str) or role not in Role.__members__:
+        return 'Invalid role'
+    class_id = row.get('class_id')
+    if class_id not in (None, ''):
+        if Role[role] != Role.student:
+            return 'Only students can be attached to a class'
+        try:
+            if _class_id(class_id) not in known_classes:
+                return 'Class not found'
+        except ValueError:
+            return 'Invalid class_id'
+    return None
+
+
+def _insert_users(new_rows):
+    # Insert and commit the users (and students) of a chunk; returns their ids
+    hashes = hash_passwords([row['password'] for _, row in new_rows])
+    Base.session.execute(insert(User), [
+        {
+            'email': row['email'],
+            'password': pwhash,
+            'first_name': row['first_name'],
+            'name': row['last_name'],
+            'role': Role[row.get('role') or 'student']
+        }
+        for (_, row), pwhash in zip(new_rows, hashes)
+    ])
+    ids = dict(Base.session.execute(
+        select(User.email, User.id).where(User.email.in_(
+            [row['email'] for _, row in new_rows]))
+    ).all())
+
+    students = [
+        {'user_id': ids[row['email']], 'class_id': _class_id(row['class_id'])}
+        for _, row in new_rows if row.get('class_id') not in (None, '')
+    ]
+    if students:
+        Base.session.execute(insert(Student), students)
+
+    Base.session.commit()
+    return ids
+
+
+def _import_chunk(chunk, seen_emails, known_classes):
+    results = []
+    accepted = []
+    for number, row in chunk:
+        if isinstance(row.get('email'), str):
+            row['email'] = row['email'].strip().lower()
+        error = _validate(row, seen_emails, known_classes)
+        if error:
+            results.append({'row': number, 'email': row.get('email'),
+                            'status': 'error', 'error': error})
+        else:
+            seen_emails.add(row['email'])
+            accepted.append((number, row))
+
+    # One query for all emails of the chunk already in the table
+    existing = {email.lower() for email in Base.session.execute(
+        select(User.email).where(User.email.in_(
+            [row['email'] for _, row in accepted]))
+    ).scalars()} if accepted else set()
+
+    new_rows = []
+    for number, row in accepted:
+        if row['email'] in existing:
+            results.append({'row': number, 'email': row['email'],
+                            'status': 'skipped', 'error': 'Email already registered'})
+        else:
+            new_rows.append((number, row))
+
+    if new_rows:
+        try:
+            ids = _insert_users(new_rows)
+        except SQLAlchemyError as e:
+            Base.session.rollback()
+            for number, row in new_rows:
+                results.append({'row': number, 'email': row['email'],
+                                'status': 'error', 'error': f'Database error: {str(e)}'})
+        else:
+            for number, row in new_rows:
+                results.append({'row': number, 'email': row['email'],
+                                'status': 'created', 'id': ids[row['email']]})
+
+    return sorted(results, key=lambda result: result['row'])
+
+
+def import_users(rows):
+    """Import an iterable of row dicts and return the per-row report."""
+    known_classes = set(Base.session.execute(select(ClassGroup.id)).scalars())
+    seen_emails = set()
+    results = []
+
+    chunk = []
+    for number, row in enumerate(rows, start=1):
+        chunk.append((number, row))
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            results.extend(_import_chunk(chunk, seen_emails, known_classes))
+            chunk = []
+    if chunk:
+        results.extend(_import_chunk(chunk, seen_emails, known_classes))
+
+    return results
@@ -1,12 +1,18 @@
 from flask import request, jsonify
+from sqlalchemy import or_
 from models.user import User, Role
 from models.student import Student
 from models.teacher_assignment import TeacherAssignment # Added import
 from models.class_group import ClassGroup # Added import
 from models.subject import Subject # Added import
 from config import Base
-from werkzeug.security import generate_password_hash, check_password_hash
-from api.utils.auth_helpers import token_required, admin_required
+from api.utils.passwords import hash_password, verify_password
+from api.utils.auth_helpers import token_required, admin_required, revoke_user
+from api.utils.pagination import keyset_page
+from api.utils.resources import USER
+from api.utils.export import export_format, stream_export
+from api.users.user_import import read_rows, import_users
+from api.utils import cascade
 
 
 def users_routes(bp):
@@ -15,19 +21,52 @@ def users_routes(bp):
 	@token_required
 	@admin_required
 	def get_all_users(current_user):
-		users = User.query.all()
-		users_list = []
+		try:
+			fields, includes = USER.parse()
+		except ValueError as e:
+			return jsonify({'error': str(e)}), 400
+		query = USER.query(fields, includes)
+
+		# Filter by role if provided
+		role = request.args.get('role')
+		if role:
+			if role not in Role.__members__:
+				return jsonify({'error': 'Invalid role'}), 400
+			query = query.filter(User.role == Role[role])
+
+		# Every word must appear in the email, first name or name
+		search = request.args.get('search', '')
+		for word in search.split():
+			query = query.filter(or_(
+				User.email.icontains(word, autoescape=True),
+				User.first_name.icontains(word, autoescape=True),
+				User.name.icontains(word, autoescape=True)
+			))
+
+		users, next_cursor = keyset_page(query, User.id)
+		users_list = USER.serialize(users, fields, includes)
+
+		return jsonify({'users': users_list, 'next_cursor': next_cursor}), 200
+
+	# Stream all users as NDJSON or CSV (admin only)
+	@bp.route('/export', methods=['GET'])
+	@token_required
+	@admin_required
+	def export_users(current_user):
+		try:
+			fmt = export_format()
+			fields, includes = USER.parse()
+		except ValueError as e:
+			return jsonify({'error': str(e)}), 400
 
-		for user in users:
-			users_list.append({
-				'id': user.id,
-				'email': user.email,
-				'first_name': user.first_name,
-				'name': user.name,
-				'role': user.role.name
-			})
+		query = USER.query(fields, includes).order_by(User.id)
+		role = request.args.get('role')
+		if role:
+			if role not in Role.__members__:
+				return jsonify({'error': 'Invalid role'}), 400
+			query = query.filter(User.role == Role[role])
 
-		return jsonify({'users': users_list}), 200
+		return stream_export(query, USER, fmt, 'users', fields, includes)
 
 	# Get current user profile
 	@bp.route('/profile', methods=['GET'])
@@ -104,13 +143,13 @@ def users_routes(bp):
 
 		# Change password
 		if 'current_password' in data and 'new_password' in data:
-			if not check_password_hash(current_user.password, data['current_password']):
+			if not verify_password(current_user.password, data['current_password']):
 				return jsonify({'error': 'Current password is incorrect'}), 400
 
 			if len(data['new_password']) < 8:
 				return jsonify({'error': 'Password must be at least 8 characters'}), 400
 
-			current_user.password = generate_password_hash(data['new_password'])
+			current_user.password = hash_password(data['new_password'])
 
 		# Save changes
 		try:
@@ -175,7 +214,7 @@ def users_routes(bp):
 		# Create new user
 		new_user = User(
 			email=data['email'],
-			password=generate_password_hash(data['password']),
+			password=hash_password(data['password']),
 			first_name=data['first_name'],
 			name=data['last_name'],
 			role=role
@@ -190,6 +229,28 @@ def users_routes(bp):
 			Base.session.rollback()
 			return jsonify({'error': f'Database error: {str(e)}'}), 500
 
+	# Bulk import users from a CSV or NDJSON body (admin only)
+	@bp.route('/import', methods=['POST'])
+	@token_required
+	@admin_required
+	def bulk_import_users(current_user):
+		mimetype = request.mimetype or ''
+		if 'csv' in mimetype:
+			fmt = 'csv'
+		elif 'ndjson' in mimetype or 'jsonl' in mimetype:
+			fmt = 'ndjson'
+		else:
+			return jsonify({'error': 'Content-Type must be text/csv or application/x-ndjson'}), 415
+
+		# Chunks the database rejects are reported row by row
+		results = import_users(read_rows(request.stream, fmt))
+
+		summary = {'created': 0, 'skipped': 0, 'error': 0}
+		for result in results:
+			summary[result['status']] += 1
+
+		return jsonify({'summary': summary, 'results': results}), 200
+
 	# Delete user (admin only)
 	@bp.route('/<int:user_id>', methods=['DELETE'])
 	@token_required
@@ -199,10 +260,15 @@ def users_routes(bp):
 		if not user:
 			return jsonify({'error': 'User not found'}), 404
 
+		# Pass ?dry_run=true to get the row counts without deleting
+		if request.args.get('dry_run', 'false').lower() == 'true':
+			return jsonify({'dry_run': True, 'counts': cascade.delete_user(user_id, dry_run=True)}), 200
+
 		try:
-			Base.session.delete(user)
+			counts = cascade.delete_user(user_id)
 			Base.session.commit()
-			return jsonify({'success': True, 'message': 'User deleted successfully'}), 200
+			revoke_user(user_id)
+			return jsonify({'success': True, 'message': 'User deleted successfully', 'counts': counts}), 200
 		except Exception as e:
 			Base.session.rollback()
 			return jsonify({'error': f'Database error: {str(e)}'}), 500
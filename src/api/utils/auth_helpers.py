@@ -1,37 +1,193 @@
-from flask import request, jsonify
-from models.user import User
+from flask import request, jsonify, current_app
+from models.user import User, Role
+from models.events import subscribe
+from config import JWT_TOKEN_LIFETIME_HOURS, TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL
+from api.utils.token_cache import TokenCache
 import jwt
 import os
+import threading
+import time
 from functools import wraps
 
 
+# In-process denylist: user id -> (revoked_at, expires_at). Entries only
+# need to outlive the tokens issued before the revocation.
+_revoked_users = {}
+# Same shape, for students whose class changed after their token was issued
+_moved_students = {}
+_revoked_lock = threading.Lock()
+
+# Verified claims and profile snapshots, keyed by raw token
+token_cache = TokenCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+
+# User columns served from the cached snapshot without loading the row
+PROFILE_FIELDS = ('email', 'name', 'first_name')
+
+# WSGI environ key holding the verified (claims, role, profile) of a
+# request; /api/batch copies it into its sub-requests
+IDENTITY_ENVIRON_KEY = 'labapp.identity'
+
+
+def _invalidate_user_tokens(change):
+    if change.operation == 'insert':
+        return  # a new user has no cached tokens yet
+    if change.key is None:
+        # A bulk statement that did not name its rows
+        token_cache.clear()
+    else:
+        token_cache.invalidate_user(change.key)
+
+
+subscribe(User, _invalidate_user_tokens)
+
+
+def revoke_user(user_id):
+    """Reject every token issued to this user before now."""
+    now = time.time()
+    with _revoked_lock:
+        _revoked_users[user_id] = (now, now + JWT_TOKEN_LIFETIME_HOURS * 3600)
+
+
+def class_changed(user_ids):
+    """Stop trusting the class_id claim of tokens issued to these students before now."""
+    now = time.time()
+    with _revoked_lock:
+        for user_id in user_ids:
+            _moved_students[user_id] = (now, now + JWT_TOKEN_LIFETIME_HOURS * 3600)
+
+
+def _issued_before(entries, user_id, issued_at):
+    with _revoked_lock:
+        entry = entries.get(user_id)
+        if entry is None:
+            return False
+        changed_at, expires_at = entry
+        if expires_at <= time.time():
+            del entries[user_id]
+            return False
+    return issued_at is None or issued_at <= changed_at
+
+
+def is_revoked(user_id, issued_at):
+    return _issued_before(_revoked_users, user_id, issued_at)
+
+
+class UserNotFound(Exception):
+    """The token is valid but its user row is gone; answered with 401."""
+
+
+# Principal.class_id placeholder: read it from the student row
+_LOAD_CLASS = object()
+
+
+class Principal:
+    """Current user built from signed token claims.
+
+    ``id``, ``role`` and ``class_id`` come from the token and ``profile``
+    holds any cached profile fields; any other attribute loads the User
+    row on first access and is read from (or written to) it. A class_id
+    claim made stale by ``class_changed`` is read from the student row.
+    """
+
+    def __init__(self, user_id, role, class_id=None, profile=None, user=None):
+        object.__setattr__(self, 'id', user_id)
+        object.__setattr__(self, 'role', role)
+        object.__setattr__(self, '_class_id', class_id)
+        object.__setattr__(self, '_profile', dict(profile or {}))
+        object.__setattr__(self, '_user', user)
+
+    @property
+    def user(self):
+        if self._user is None:
+            user = User.query.get(self.id)
+            if user is None:
+                # Deleted by another process since the token was issued
+                revoke_user(self.id)
+                raise UserNotFound(self.id)
+            object.__setattr__(self, '_user', user)
+        return self._user
+
+    @property
+    def class_id(self):
+        if self._class_id is _LOAD_CLASS:
+            student = self.user.student
+            object.__setattr__(self, '_class_id',
+                               student.class_id if student else None)
+        return self._class_id
+
+    def __getattr__(self, name):
+        if name in self._profile:
+            return self._profile[name]
+        return getattr(self.user, name)
+
+    def __setattr__(self, name, value):
+        self._profile.pop(name, None)
+        setattr(self.user, name, value)
+
+
+def _load_identity(data):
+    # Returns (role name, profile snapshot, user row) for verified claims
+    if current_app.config.get('JWT_STATELESS_AUTH'):
+        if data.get('role') not in Role.__members__:
+            return None
+        return data['role'], {}, None
+
+    user = User.query.filter_by(id=data['user_id']).first()
+    if not user:
+        return None
+    profile = {field: getattr(user, field) for field in PROFILE_FIELDS}
+    return user.role.name, profile, user
+
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-
-        # Check for token in headers
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-
-        if not token:
-            return jsonify({'error': 'Authentication token is missing'}), 401
-
-        try:
-            # Decode the token
-            data = jwt.decode(token, os.getenv(
-                'JWT_SECRET_KEY', 'default_secret'), algorithms=["HS256"])
-            current_user = User.query.filter_by(id=data['user_id']).first()
-
-            if not current_user:
-                return jsonify({'error': 'Invalid user token'}), 401
-
-        except jwt.ExpiredSignatureError:
-            return jsonify({'error': 'Token has expired'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'error': 'Invalid token'}), 401
+        user = None
+        identity = request.environ.get(IDENTITY_ENVIRON_KEY)
+        if identity:
+            # Already verified by the enclosing batch request
+            data, role, profile = identity
+        else:
+            token = None
+
+            # Check for token in headers
+            if 'Authorization' in request.headers:
+                auth_header = request.headers['Authorization']
+                if auth_header.startswith('Bearer '):
+                    token = auth_header.split(' ')[1]
+
+            if not token:
+                return jsonify({'error': 'Authentication token is missing'}), 401
+
+            cached = token_cache.get(token)
+            if cached:
+                data, role, profile = cached
+            else:
+                try:
+                    # Decode the token
+                    data = jwt.decode(token, os.getenv(
+                        'JWT_SECRET_KEY', 'default_secret'), algorithms=["HS256"])
+                except jwt.ExpiredSignatureError:
+                    return jsonify({'error': 'Token has expired'}), 401
+                except jwt.InvalidTokenError:
+                    return jsonify({'error': 'Invalid token'}), 401
+
+                identity = _load_identity(data)
+                if not identity:
+                    return jsonify({'error': 'Invalid user token'}), 401
+                role, profile, user = identity
+                token_cache.put(token, data['user_id'],
+                                (data, role, profile), data.get('exp'))
+
+        if is_revoked(data['user_id'], data.get('iat')):
+            return jsonify({'error': 'Invalid user token'}), 401
+        request.environ[IDENTITY_ENVIRON_KEY] = (data, role, profile)
+
+        class_id = data.get('class_id')
+        if _issued_before(_moved_students, data['user_id'], data.get('iat')):
+            class_id = _LOAD_CLASS
+        current_user = Principal(data['user_id'], Role[role],
+                                 class_id, profile, user)
 
         # Pass the current user to the route function
         return f(current_user, *args, **kwargs)
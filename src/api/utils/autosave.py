@@ -0,0 +1,243 @@
+"""Coalescing buffer for lab work autosaves.
+
+Autosave requests patch the in-memory copy of a (student, lab) work
+document and are acknowledged immediately; dirty documents are written
+to the database, compressed, every AUTOSAVE_FLUSH_INTERVAL seconds, on
+explicit submit, and at interpreter exit. Each flush also records a
+snapshot in the work data history (see ``work_snapshots``). The buffer is per process, so
+deployments with several workers need sticky routing by student for the
+version checks to hold.
+"""
+import atexit
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy import select, update, bindparam
+from models.student_lab_progress import StudentLabProgress
+from api.utils.work_snapshots import take_snapshots
+from config import Base
+
+logger = logging.getLogger(__name__)
+
+
+class VersionConflict(Exception):
+    def __init__(self, current_version):
+        super().__init__('Work data version conflict')
+        self.current_version = current_version
+
+
+class InvalidPatch(Exception):
+    pass
+
+
+def apply_patch(text, operations):
+    """Apply ``[{"pos", "delete", "insert"}, ...]`` edits in order."""
+    if not isinstance(operations, list):
+        raise InvalidPatch('patch must be a list of operations')
+    for operation in operations:
+        if not isinstance(operation, dict):
+            raise InvalidPatch('patch operations must be objects')
+        pos = operation.get('pos', 0)
+        delete = operation.get('delete', 0)
+        insert = operation.get('insert', '')
+        if (not isinstance(pos, int) or not isinstance(delete, int)
+                or not isinstance(insert, str)):
+            raise InvalidPatch('pos and delete must be integers, insert a string')
+        if pos < 0 or delete < 0 or pos + delete > len(text):
+            raise InvalidPatch('patch operation out of range')
+        text = text[:pos] + insert + text[pos + delete:]
+    return text
+
+
+def _stored_document(progress_id):
+    # Locking read: it sees the latest committed row even inside a
+    # transaction that read the row before (InnoDB repeatable read)
+    table = StudentLabProgress.__table__
+    blob, text, version = Base.session.execute(
+        select(table.c.work_data_blob, table.c.work_data, table.c.work_data_version)
+        .where(table.c.id == progress_id)
+        .with_for_update(read=True)
+    ).one()
+    return StudentLabProgress.decode_work_data(blob, text), version
+
+
+class _Document:
+    __slots__ = ('progress_id', 'text', 'version', 'dirty')
+
+    def __init__(self, progress_id, text, version):
+        self.progress_id = progress_id
+        self.text = text
+        self.version = version
+        self.dirty = False
+
+
+class AutosaveBuffer:
+    def __init__(self):
+        self._documents = {}
+        self._lock = threading.Lock()
+        self._app = None
+        self._stop = threading.Event()
+        self.interval = 0
+        self.saves = 0
+        self.flushed_rows = 0
+        self.conflicts = 0
+
+    def start(self, app, interval):
+        """Begin periodic flushing for ``app``; interval 0 writes through."""
+        self._app = app
+        self.interval = interval
+        if interval > 0:
+            thread = threading.Thread(target=self._run, daemon=True,
+                                      name='autosave-flush')
+            thread.start()
+        atexit.register(self.shutdown)
+
+    def read(self, progress):
+        """Current (text, version) of a progress row, buffered or stored."""
+        key = (progress.student_id, progress.lab_id)
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                return document.text, document.version
+        return progress.get_work_data(), progress.work_data_version
+
+    def save(self, progress, base_version, patch=None, text=None):
+        """Apply a patch (or full text) on top of ``base_version``.
+
+        Returns the new version; raises VersionConflict when the client
+        edited a stale version and InvalidPatch on a malformed patch.
+        """
+        key = (progress.student_id, progress.lab_id)
+        with self._lock:
+            document = self._documents.get(key)
+            if document is None:
+                # Not ``progress``: a flush may have written and dropped
+                # the document since the request loaded it
+                document = _Document(progress.id, *_stored_document(progress.id))
+
+            if base_version != document.version:
+                raise VersionConflict(document.version)
+            document.text = text if patch is None else \
+                apply_patch(document.text, patch)
+            document.version += 1
+            document.dirty = True
+            self._documents[key] = document
+            self.saves += 1
+            version = document.version
+
+        if not self.interval:
+            self.flush([key])
+        return version
+
+    def flush(self, keys=None, snapshot=False):
+        """Write dirty documents (all, or only ``keys``) in one batch.
+
+        ``snapshot`` forces a history snapshot of every written document
+        instead of leaving it to the snapshot interval. A document whose
+        stored version is already as new (written by another process) is
+        dropped from the buffer and reported with VersionConflict once
+        the rest of the batch is committed.
+        """
+        with self._lock:
+            selected = self._documents.items() if keys is None else \
+                [(key, self._documents[key]) for key in keys
+                 if key in self._documents]
+            batch = [(key, document.progress_id, document.text, document.version)
+                     for key, document in selected if document.dirty]
+            for key, _, _, _ in batch:
+                self._documents[key].dirty = False
+        if not batch:
+            return 0
+
+        now = datetime.utcnow()
+        table = StudentLabProgress.__table__
+        try:
+            # Core UPDATE so the parameter list runs as one executemany; the
+            # version guard keeps a slower concurrent flush from writing an
+            # older document over a newer one
+            written = Base.session.execute(
+                update(table)
+                .where(table.c.student_id == bindparam('b_student'),
+                       table.c.lab_id == bindparam('b_lab'),
+                       table.c.work_data_version < bindparam('b_version'))
+                .values(work_data_blob=bindparam('b_blob'),
+                        work_data_version=bindparam('b_version'),
+                        last_saved=now),
+                [{'b_student': key[0], 'b_lab': key[1],
+                  'b_blob': StudentLabProgress.compress_work_data(text),
+                  'b_version': version}
+                 for key, _, text, version in batch]
+            ).rowcount
+            stale = self._stale(batch) if written != len(batch) else {}
+            take_snapshots([(progress_id, version, text)
+                            for key, progress_id, text, version in batch
+                            if key not in stale],
+                           force=snapshot)
+            Base.session.commit()
+        except Exception:
+            Base.session.rollback()
+            self._mark_dirty(batch)
+            raise
+
+        with self._lock:
+            self.flushed_rows += len(batch) - len(stale)
+            self.conflicts += len(stale)
+            for key, _, _, version in batch:
+                document = self._documents.get(key)
+                if document is None:
+                    continue
+                # Drop documents nobody edited since this flush, and the
+                # superseded ones so the next save reads the stored row
+                if key in stale or (not document.dirty
+                                    and document.version == version):
+                    del self._documents[key]
+        if stale:
+            logger.warning('Autosave lost %d edit(s) to newer stored versions',
+                           len(stale))
+            raise VersionConflict(max(stale.values()))
+        return len(batch)
+
+    def _stale(self, batch):
+        # {key: stored version} for the rows the version guard skipped
+        table = StudentLabProgress.__table__
+        stored = dict(Base.session.execute(
+            select(table.c.id, table.c.work_data_version)
+            .where(table.c.id.in_([progress_id for _, progress_id, _, _ in batch]))
+        ).all())
+        return {key: stored[progress_id]
+                for key, progress_id, _, version in batch
+                if progress_id in stored and stored[progress_id] != version}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'buffered': len(self._documents),
+                'dirty': sum(1 for d in self._documents.values() if d.dirty),
+                'saves': self.saves,
+                'flushed_rows': self.flushed_rows,
+                'conflicts': self.conflicts
+            }
+
+    def shutdown(self):
+        self._stop.set()
+        if self._app is not None:
+            with self._app.app_context():
+                self.flush()
+
+    def _mark_dirty(self, batch):
+        with self._lock:
+            for key, _, _, _ in batch:
+                document = self._documents.get(key)
+                if document is not None:
+                    document.dirty = True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with self._app.app_context():
+                    self.flush()
+            except Exception:
+                logger.exception('Autosave flush failed; will retry')
+
+
+autosave_buffer = AutosaveBuffer()
@@ -0,0 +1,129 @@
+"""Set-based cascading deletes.
+
+Each ``delete_*`` function removes a row and everything that depends on
+it with one DELETE ... WHERE per table, children first, inside the
+caller's transaction. With ``dry_run`` the same conditions are counted
+instead. Both return ``{table: rows}``. Every DELETE reaches the change
+subscribers through ``models.events``.
+"""
+from sqlalchemy import select, delete, func, or_
+from models.class_group import ClassGroup
+from models.class_subject import ClassSubject
+from models.teacher_assignment import TeacherAssignment
+from models.student import Student
+from models.subject import Subject
+from models.lab import Lab
+from models.user import User
+from models.student_lab_progress import StudentLabProgress
+from models.progress_rollup import ClassLabProgressRollup, StudentProgressRollup
+from models.work_data_snapshot import WorkDataSnapshot
+from config import Base
+from api.utils.progress_rollups import refresh_student_rollups, refresh_class_rollups
+
+
+def _run(steps, dry_run):
+    counts = {}
+    for model, condition in steps:
+        if dry_run:
+            rows = Base.session.execute(
+                select(func.count()).select_from(model).where(condition)
+            ).scalar()
+        else:
+            rows = Base.session.execute(
+                delete(model).where(condition),
+                execution_options={'synchronize_session': False}
+            ).rowcount
+        table = model.__tablename__
+        counts[table] = counts.get(table, 0) + rows
+    return counts
+
+
+def _snapshots_of(condition):
+    # Snapshot chunks are shared and left for prune_chunks
+    return (WorkDataSnapshot, WorkDataSnapshot.progress_id.in_(
+        select(StudentLabProgress.id).where(condition)))
+
+
+def _students_with_progress_on(lab_ids):
+    return Base.session.execute(
+        select(StudentLabProgress.student_id.distinct())
+        .where(StudentLabProgress.lab_id.in_(lab_ids))
+    ).scalars().all()
+
+
+def delete_class(class_id, dry_run=False):
+    # Student progress belongs to the users and is kept
+    return _run([
+        (ClassLabProgressRollup, ClassLabProgressRollup.class_id == class_id),
+        (TeacherAssignment, TeacherAssignment.class_id == class_id),
+        (ClassSubject, ClassSubject.class_id == class_id),
+        (Student, Student.class_id == class_id),
+        (ClassGroup, ClassGroup.id == class_id),
+    ], dry_run)
+
+
+def delete_lab(lab_id, dry_run=False):
+    students = [] if dry_run else _students_with_progress_on([lab_id])
+    counts = _run([
+        (ClassLabProgressRollup, ClassLabProgressRollup.lab_id == lab_id),
+        _snapshots_of(StudentLabProgress.lab_id == lab_id),
+        (StudentLabProgress, StudentLabProgress.lab_id == lab_id),
+        (Lab, Lab.id == lab_id),
+    ], dry_run)
+    if not dry_run:
+        refresh_student_rollups(students)
+    return counts
+
+
+def delete_subject(subject_id, dry_run=False):
+    labs = select(Lab.id).where(Lab.subject_id == subject_id)
+    students = [] if dry_run else _students_with_progress_on(labs)
+    counts = _run([
+        (ClassLabProgressRollup, ClassLabProgressRollup.lab_id.in_(labs)),
+        _snapshots_of(StudentLabProgress.lab_id.in_(labs)),
+        (StudentLabProgress, StudentLabProgress.lab_id.in_(labs)),
+        (Lab, Lab.subject_id == subject_id),
+        (TeacherAssignment, TeacherAssignment.subject_id == subject_id),
+        (ClassSubject, ClassSubject.subject_id == subject_id),
+        (Subject, Subject.id == subject_id),
+    ], dry_run)
+    if not dry_run:
+        refresh_student_rollups(students)
+    return counts
+
+
+def delete_user(user_id, dry_run=False):
+    # Labs the user created go too, along with every student's progress on them
+    labs = select(Lab.id).where(Lab.created_by == user_id)
+    students, classes = [], []
+    if not dry_run:
+        students = [student for student in _students_with_progress_on(labs)
+                    if student != user_id]
+        classes = Base.session.execute(
+            select(Student.class_id).where(Student.user_id == user_id)
+        ).scalars().all()
+
+    on_labs = StudentLabProgress.lab_id.in_(labs)
+    of_user = StudentLabProgress.student_id == user_id
+    if dry_run:
+        # The user's own progress on their labs matches both conditions;
+        # the real deletes only find it once
+        progress_steps = [_snapshots_of(or_(on_labs, of_user)),
+                          (StudentLabProgress, or_(on_labs, of_user))]
+    else:
+        progress_steps = [_snapshots_of(on_labs), (StudentLabProgress, on_labs),
+                          _snapshots_of(of_user), (StudentLabProgress, of_user)]
+
+    counts = _run([
+        (ClassLabProgressRollup, ClassLabProgressRollup.lab_id.in_(labs)),
+        *progress_steps,
+        (Lab, Lab.created_by == user_id),
+        (StudentProgressRollup, StudentProgressRollup.student_id == user_id),
+        (TeacherAssignment, TeacherAssignment.teacher_id == user_id),
+        (Student, Student.user_id == user_id),
+        (User, User.id == user_id),
+    ], dry_run)
+    if not dry_run:
+        refresh_student_rollups(students)
+        refresh_class_rollups(classes)
+    return counts
@@ -0,0 +1,54 @@
+"""ETag helpers for conditional GETs and optimistic concurrency."""
+import hashlib
+from werkzeug.http import quote_etag
+from flask import request
+from models.change_stamp import current_stamps
+from compression import etag_variants
+
+
+def make_etag(*parts):
+    """Strong ETag value (unquoted) identifying ``parts``."""
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return digest[:32]
+
+
+def progress_etag(progress):
+    return f"progress-{progress.id}-{progress.version}"
+
+
+def collection_etag(*tables):
+    """ETag for a response built only from ``tables`` and the query string.
+
+    Costs one primary-key read of the change stamps, so a matching
+    If-None-Match can be answered before running the real queries.
+    """
+    stamps = current_stamps(*tables)
+    return make_etag(request.path, sorted(request.args.items(multi=True)),
+                     sorted(stamps.items()))
+
+
+def etag_header(etag):
+    # Clients may keep the response but must revalidate before reuse
+    return {"ETag": quote_etag(etag), "Cache-Control": "private, no-cache"}
+
+
+def not_modified(etag):
+    """True when the request's If-None-Match already names ``etag``.
+
+    Also true for the ETag of a compressed representation of it.
+    """
+    return any(request.if_none_match.contains_weak(candidate)
+               for candidate in etag_variants(etag))
+
+
+def precondition_failed(etag):
+    """True when the request sent If-Match and ``etag`` is not in it.
+
+    ``etag`` is None when the resource does not exist, which fails any
+    If-Match, including ``*``.
+    """
+    if not request.if_match:
+        return False
+    # A compressed representation of the current version also matches
+    return etag is None or not any(request.if_match.contains(candidate)
+                                   for candidate in etag_variants(etag))
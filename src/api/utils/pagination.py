@@ -0,0 +1,81 @@
+from datetime import datetime
+from flask import request
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def _page_limit():
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_page(query, key):
+    """Return one page of ``query`` ordered by the unique column ``key``.
+
+    Reads ``limit`` and ``after`` from the query string and returns
+    ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    limit = _page_limit()
+    after = request.args.get('after', type=int)
+
+    if after is not None:
+        query = query.filter(key > after)
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(key).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = getattr(rows[-1], key.key)
+
+    return rows, next_cursor
+
+
+def ordered_keyset_query(query, order_key, key, after, limit):
+    """``query`` ordered by ``(order_key, key)``, seeking past ``after``.
+
+    ``order_key`` is a nullable datetime column; NULLs sort first, as
+    both MySQL and SQLite order them, so an index on ``order_key`` still
+    serves the ORDER BY. ``after`` is a cursor from
+    ``ordered_keyset_page`` (None for the first page); raises ValueError
+    when it is malformed.
+    """
+    if after:
+        value, _, last_key = after.rpartition('|')
+        last_key = int(last_key)
+        if value:
+            value = datetime.fromisoformat(value)
+            query = query.filter(or_(
+                order_key > value,
+                and_(order_key == value, key > last_key)
+            ))
+        else:
+            # Still among the NULLs
+            query = query.filter(or_(
+                and_(order_key.is_(None), key > last_key),
+                order_key.isnot(None)
+            ))
+    return query.order_by(order_key, key).limit(limit)
+
+
+def ordered_keyset_page(query, order_key, key):
+    """Like ``keyset_page`` but ordered by ``(order_key, key)``.
+
+    The cursor is ``<isoformat>|<key>``, with an empty date for rows
+    whose ``order_key`` is NULL. Returns ``(rows, next_cursor)``, or
+    raises ValueError on a malformed cursor.
+    """
+    limit = _page_limit()
+    rows = ordered_keyset_query(query, order_key, key,
+                                request.args.get('after'), limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        value = getattr(last, order_key.key)
+        next_cursor = (f"{value.isoformat() if value is not None else ''}"
+                       f"|{getattr(last, key.key)}")
+
+    return rows, next_cursor
@@ -0,0 +1,102 @@
+"""Password hashing on a bounded process pool.
+
+PBKDF2 is CPU bound, so hashing on the request thread lets a login burst
+pin every worker. Hashes run on PASSWORD_HASH_WORKERS processes instead,
+with at most PASSWORD_HASH_QUEUE calls in flight; past that the call
+raises ``HashPoolBusy`` and the app answers 429 with Retry-After.
+Batches (bulk imports) take one slot per hash and keep at most one hash
+per worker in flight, waiting for slots instead of failing, so a login
+never queues behind more than one batch hash per worker.
+Setting PASSWORD_HASH_WORKERS=0 hashes inline.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash
+from config import (PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH,
+                    PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE,
+                    PASSWORD_HASH_RETRY_AFTER)
+
+
+class HashPoolBusy(Exception):
+    def __init__(self, retry_after=PASSWORD_HASH_RETRY_AFTER):
+        super().__init__('Password hashing queue is full')
+        self.retry_after = retry_after
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(PASSWORD_HASH_QUEUE, 1))
+# Share of the pool batch hashing may hold, across all batches
+_batch_slots = threading.BoundedSemaphore(max(PASSWORD_HASH_WORKERS, 1))
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned workers don't inherit the app's DB connections or threads
+            _executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+def _run(func, *args):
+    if PASSWORD_HASH_WORKERS <= 0:
+        return func(*args)
+
+    if not _slots.acquire(blocking=False):
+        raise HashPoolBusy()
+    try:
+        return _get_executor().submit(func, *args).result()
+    except BrokenProcessPool:
+        # A worker died; start a fresh pool and retry once
+        shutdown()
+        return _get_executor().submit(func, *args).result()
+    finally:
+        _slots.release()
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password,
+                PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH)
+
+
+def verify_password(pwhash, password):
+    return _run(check_password_hash, pwhash, password)
+
+
+def _release_batch_slot(future):
+    _slots.release()
+    _batch_slots.release()
+
+
+def hash_passwords(passwords):
+    """Hash a batch of passwords at low priority; waits rather than raising."""
+    if PASSWORD_HASH_WORKERS <= 0:
+        return [hash_password(password) for password in passwords]
+
+    futures = []
+    for password in passwords:
+        _batch_slots.acquire()
+        _slots.acquire()
+        try:
+            future = _get_executor().submit(
+                generate_password_hash, password,
+                PASSWORD_HASH_METHOD, PASSWORD_SALT_LENGTH)
+        except BaseException:
+            _release_batch_slot(None)
+            raise
+        future.add_done_callback(_release_batch_slot)
+        futures.append(future)
+    return [future.result() for future in futures]
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
@@ -0,0 +1,132 @@
+from sqlalchemy import func, case, insert, delete
+from models.student_lab_progress import StudentLabProgress, ProgressStatus
+from models.progress_rollup import ClassLabProgressRollup, StudentProgressRollup
+from models.student import Student
+from config import Base
+
+COUNTERS = ('completed', 'in_progress', 'not_started')
+ROLLUP_COLUMNS = ['completed', 'in_progress', 'not_started', 'score_total']
+
+
+def status_aggregates():
+    # Per-status counters and the completed score total, for use in GROUP BY queries
+    status = StudentLabProgress.status
+    completed = status == ProgressStatus.completed
+    return [
+        func.sum(case((completed, 1), else_=0)).label("completed"),
+        func.sum(case((status == ProgressStatus.in_progress, 1),
+                      else_=0)).label("in_progress"),
+        func.sum(case((completed, 0),
+                      (status == ProgressStatus.in_progress, 0),
+                      else_=1)).label("not_started"),
+        func.sum(case((completed, func.coalesce(StudentLabProgress.score, 0)),
+                      else_=0)).label("score_total"),
+    ]
+
+
+def _bucket(status):
+    if status == ProgressStatus.completed:
+        return 'completed'
+    if status == ProgressStatus.in_progress:
+        return 'in_progress'
+    return 'not_started'
+
+
+def _completed_score(status, score):
+    if status == ProgressStatus.completed:
+        return score or 0
+    return 0
+
+
+def _apply(model, key, deltas, rebuild):
+    # Increment in SQL so concurrent writers don't overwrite each other
+    updated = Base.session.query(model).filter_by(**key).update(
+        {getattr(model, name): getattr(model, name) + delta
+         for name, delta in deltas.items() if delta},
+        synchronize_session=False
+    )
+    if not updated:
+        # No rollup row yet: deltas alone would miss the rows written before
+        # it existed, so build it from the progress rows (already flushed,
+        # this change included)
+        rebuild()
+
+
+def record_progress_change(class_id, student_id, lab_id, old, new):
+    """Apply a progress row transition to the rollups.
+
+    ``old`` and ``new`` are ``(status, score)`` pairs, ``old`` being None
+    for a newly created progress row. Runs in the caller's transaction.
+    """
+    deltas = dict.fromkeys(COUNTERS, 0)
+    deltas['score_total'] = 0.0
+
+    if old is not None:
+        deltas[_bucket(old[0])] -= 1
+        deltas['score_total'] -= _completed_score(*old)
+    deltas[_bucket(new[0])] += 1
+    deltas['score_total'] += _completed_score(*new)
+
+    if not any(deltas.values()):
+        return
+
+    _apply(StudentProgressRollup, {'student_id': student_id}, deltas,
+           lambda: refresh_student_rollups([student_id]))
+    if class_id is not None:
+        _apply(ClassLabProgressRollup,
+               {'class_id': class_id, 'lab_id': lab_id}, deltas,
+               lambda: refresh_class_rollups([class_id], lab_id))
+
+
+def refresh_student_rollups(student_ids=None):
+    """Recompute the per-student rollups, for all students when ids is None."""
+    if student_ids is not None and not student_ids:
+        return
+    stale = delete(StudentProgressRollup)
+    source = Base.session.query(StudentLabProgress.student_id,
+                                *status_aggregates())
+    if student_ids is not None:
+        stale = stale.where(StudentProgressRollup.student_id.in_(student_ids))
+        source = source.filter(StudentLabProgress.student_id.in_(student_ids))
+
+    Base.session.execute(stale)
+    Base.session.execute(
+        insert(StudentProgressRollup).from_select(
+            ['student_id'] + ROLLUP_COLUMNS,
+            source.group_by(StudentLabProgress.student_id)
+        )
+    )
+
+
+def refresh_class_rollups(class_ids=None, lab_id=None):
+    """Recompute the class x lab rollups, for all classes when ids is None.
+
+    ``lab_id`` limits the refresh to that lab's rows.
+    """
+    if class_ids is not None and not class_ids:
+        return
+    stale = delete(ClassLabProgressRollup)
+    source = Base.session.query(Student.class_id, StudentLabProgress.lab_id,
+                                *status_aggregates()) \
+        .join(Student, Student.user_id == StudentLabProgress.student_id)
+    if class_ids is not None:
+        stale = stale.where(ClassLabProgressRollup.class_id.in_(class_ids))
+        source = source.filter(Student.class_id.in_(class_ids))
+    if lab_id is not None:
+        stale = stale.where(ClassLabProgressRollup.lab_id == lab_id)
+        source = source.filter(StudentLabProgress.lab_id == lab_id)
+
+    Base.session.execute(stale)
+    Base.session.execute(
+        insert(ClassLabProgressRollup).from_select(
+            ['class_id', 'lab_id'] + ROLLUP_COLUMNS,
+            source.group_by(Student.class_id, StudentLabProgress.lab_id)
+        )
+    )
+
+
+def rebuild_rollups():
+    """Recompute every rollup row from student_lab_progress."""
+    refresh_student_rollups()
+    refresh_class_rollups()
+    Base.session.commit()
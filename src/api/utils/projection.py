@@ -0,0 +1,169 @@
+"""Row serializers with sparse fieldsets and joined includes.
+
+A ``Resource`` lists the fields a model exposes as ``{name: (column,
+convert)}``. ``query`` selects only the requested columns, and those of
+any include reached through an outer join, as plain row tuples, so no
+ORM objects are built. ``serializer`` turns those rows into dicts with
+a function compiled once per (fields, includes) combination.
+
+Requests pick what they need with ``?fields=name,status`` (the key is
+always kept for paging) and ``?include=subject,creator``.
+"""
+from flask import request
+from sqlalchemy.orm import aliased
+from config import Base
+
+
+def isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def enum_value(value):
+    return value.value if value is not None else None
+
+
+def enum_name(value):
+    return value.name if value is not None else None
+
+
+class Include:
+    """A related row reached through ``path`` (relationship attributes)."""
+
+    def __init__(self, path, resource):
+        self.path = path
+        self.resource = resource
+
+
+def _compile(names, converters):
+    if not any(converters):
+        return lambda values: dict(zip(names, values))
+    pairs = tuple(zip(names, converters))
+    return lambda values: {name: convert(value) if convert else value
+                           for (name, convert), value in zip(pairs, values)}
+
+
+class Resource:
+    def __init__(self, model, key, fields, includes=None, joins=()):
+        self.model = model
+        self.key = key
+        self.fields = fields
+        self.includes = includes or {}
+        # (target, onclause) inner joins for fields taken from other tables
+        self.joins = joins
+        self._serializers = {}
+
+    def parse(self):
+        """Requested (fields, includes); raises ValueError on unknown names."""
+        fields = tuple(self.fields)
+        if request.args.get('fields'):
+            names = {name.strip() for name in request.args['fields'].split(',')
+                     if name.strip()}
+            unknown = names - set(self.fields)
+            if unknown:
+                raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+            fields = tuple(name for name in self.fields
+                           if name in names or name == self.key)
+
+        includes = ()
+        if request.args.get('include'):
+            names = {name.strip() for name in request.args['include'].split(',')
+                     if name.strip()}
+            unknown = names - set(self.includes)
+            if unknown:
+                raise ValueError(f"Unknown include(s): {', '.join(sorted(unknown))}")
+            includes = tuple(name for name in self.includes if name in names)
+        return fields, includes
+
+    def query(self, fields=None, includes=()):
+        """Query of row tuples; root fields are labelled by name.
+
+        Filter it with ``filter()``: with includes joined, ``filter_by``
+        would resolve against the last joined table.
+        """
+        fields = tuple(self.fields) if fields is None else fields
+        columns = [self.fields[name][0].label(name) for name in fields]
+        joins = []
+        for include_name in includes:
+            include = self.includes[include_name]
+            parent = self.model
+            for attribute in include.path:
+                target = aliased(attribute.property.mapper.class_)
+                joins.append(getattr(parent, attribute.key).of_type(target))
+                parent = target
+            columns.extend(
+                getattr(parent, column.key).label(f'{include_name}__{name}')
+                for name, (column, _) in include.resource.fields.items())
+
+        query = Base.session.query(*columns).select_from(self.model)
+        for target, onclause in self.joins:
+            query = query.join(target, onclause)
+        for join in joins:
+            query = query.outerjoin(join)
+        return query
+
+    def tables(self, includes=()):
+        """Names of the tables rows of ``query(fields, includes)`` read."""
+        tables = {self.model.__tablename__}
+        tables.update(target.__tablename__ for target, _ in self.joins)
+        for include_name in includes:
+            tables.update(attribute.property.mapper.class_.__tablename__
+                          for attribute in self.includes[include_name].path)
+        return tuple(sorted(tables))
+
+    def serializer(self, fields=None, includes=()):
+        """Compiled ``row -> dict`` for rows of ``query(fields, includes)``."""
+        fields = tuple(self.fields) if fields is None else fields
+        cache_key = (fields, includes)
+        serializer = self._serializers.get(cache_key)
+        if serializer is not None:
+            return serializer
+
+        count = len(fields)
+        root = _compile(fields, [self.fields[name][1] for name in fields])
+        nested = []
+        start = count
+        for include_name in includes:
+            resource = self.includes[include_name].resource
+            names = tuple(resource.fields)
+            nested.append((include_name, start, start + len(names),
+                           start + names.index(resource.key),
+                           _compile(names, [resource.fields[name][1]
+                                            for name in names])))
+            start += len(names)
+
+        if not nested:
+            def serializer(row):
+                return root(row)
+        else:
+            def serializer(row):
+                data = root(row[:count])
+                for name, begin, end, key_index, convert in nested:
+                    # Outer join: no related row when its key is NULL
+                    data[name] = convert(row[begin:end]) \
+                        if row[key_index] is not None else None
+                return data
+
+        self._serializers[cache_key] = serializer
+        return serializer
+
+    def flat(self, fields=None, includes=()):
+        """Column names and a ``row -> list`` converter for tabular output.
+
+        Include columns are named ``<include>.<field>``.
+        """
+        fields = tuple(self.fields) if fields is None else fields
+        names = list(fields)
+        converters = [self.fields[name][1] for name in fields]
+        for include_name in includes:
+            resource = self.includes[include_name].resource
+            names.extend(f'{include_name}.{name}' for name in resource.fields)
+            converters.extend(convert for _, convert in resource.fields.values())
+
+        def convert_row(row):
+            return [convert(value) if convert and value is not None else value
+                    for convert, value in zip(converters, row)]
+        return names, convert_row
+
+    def serialize(self, rows, fields=None, includes=()):
+        serializer = self.serializer(fields, includes)
+        return [serializer(row) for row in rows]
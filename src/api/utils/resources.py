@@ -0,0 +1,80 @@
+"""Serializer registry: the fields each model exposes (see ``projection``)."""
+from models.class_group import ClassGroup
+from models.lab import Lab
+from models.student import Student
+from models.student_lab_progress import StudentLabProgress
+from models.subject import Subject
+from models.user import User
+from api.utils.projection import Resource, Include, isoformat, enum_value, enum_name
+
+SUBJECT = Resource(Subject, 'id', {
+    "id": (Subject.id, None),
+    "name": (Subject.name, None),
+})
+
+CLASS = Resource(ClassGroup, 'id', {
+    "id": (ClassGroup.id, None),
+    "name": (ClassGroup.name, None),
+})
+
+# Public part of a user, embedded in other resources
+CREATOR = Resource(User, 'id', {
+    "id": (User.id, None),
+    "first_name": (User.first_name, None),
+    "name": (User.name, None),
+})
+
+USER = Resource(User, 'id', {
+    "id": (User.id, None),
+    "email": (User.email, None),
+    "first_name": (User.first_name, None),
+    "name": (User.name, None),
+    "role": (User.role, enum_name),
+}, includes={
+    "class": Include((User.student, Student.class_group), CLASS),
+})
+
+LAB = Resource(Lab, 'id', {
+    "id": (Lab.id, None),
+    "name": (Lab.name, None),
+    "subject_id": (Lab.subject_id, None),
+    "created_by": (Lab.created_by, None),
+    "status": (Lab.status, enum_value),
+    "creation_date": (Lab.creation_date, isoformat),
+    "approval_date": (Lab.approval_date, isoformat),
+}, includes={
+    "subject": Include((Lab.subject,), SUBJECT),
+    "creator": Include((Lab.creator,), CREATOR),
+})
+
+# Progress entries carry their lab's name; the work data is never listed
+PROGRESS = Resource(StudentLabProgress, 'id', {
+    "id": (StudentLabProgress.id, None),
+    "lab_id": (StudentLabProgress.lab_id, None),
+    "lab_name": (Lab.name, None),
+    "status": (StudentLabProgress.status, enum_value),
+    "start_date": (StudentLabProgress.start_date, isoformat),
+    "completion_date": (StudentLabProgress.completion_date, isoformat),
+    "score": (StudentLabProgress.score, None),
+    "comments": (StudentLabProgress.comments, None),
+    "version": (StudentLabProgress.version, None),
+}, joins=[(Lab, Lab.id == StudentLabProgress.lab_id)])
+
+# Class grade export: one row per progress entry with student and lab names
+CLASS_PROGRESS = Resource(StudentLabProgress, 'id', {
+    "id": (StudentLabProgress.id, None),
+    "student_id": (StudentLabProgress.student_id, None),
+    "first_name": (User.first_name, None),
+    "name": (User.name, None),
+    "email": (User.email, None),
+    "lab_id": (StudentLabProgress.lab_id, None),
+    "lab_name": (Lab.name, None),
+    "status": (StudentLabProgress.status, enum_value),
+    "score": (StudentLabProgress.score, None),
+    "start_date": (StudentLabProgress.start_date, isoformat),
+    "completion_date": (StudentLabProgress.completion_date, isoformat),
+}, joins=[
+    (User, User.id == StudentLabProgress.student_id),
+    (Student, Student.user_id == StudentLabProgress.student_id),
+    (Lab, Lab.id == StudentLabProgress.lab_id),
+])
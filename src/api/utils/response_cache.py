@@ -0,0 +1,248 @@
+"""Response cache for read-mostly catalog endpoints.
+
+Handlers wrapped in ``cached_response(*tables)`` keep their finished
+200 responses, keyed by role, path, query string and the change stamps
+of ``tables``. Keying on the stamps means an entry written before a
+commit in any worker is never served after it; in addition, commits
+made by this process evict the affected entries straight away through
+``on_tables_committed``.
+
+The default backend is a byte-bounded in-process LRU. Setting
+RESPONSE_CACHE_URL stores entries in Redis instead (``redis`` package
+required), shared by every worker; ``RedisBackend`` accepts any client
+with the same methods, such as fakeredis.
+"""
+import json
+import logging
+import threading
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import request, current_app, Response
+from werkzeug.http import unquote_etag
+from models.change_stamp import current_stamps, on_tables_committed
+from api.utils.conditional import not_modified
+from config import RESPONSE_CACHE_MAX_BYTES, RESPONSE_CACHE_URL, RESPONSE_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Cache-Control')
+
+
+class LocalBackend:
+    """LRU bounded by the total size of keys and values, in bytes."""
+
+    name = 'local'
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._keys_by_table = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, tables):
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, tables)
+            self.bytes += size
+            for table in tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tables):
+        with self._lock:
+            for table in tables:
+                for key in list(self._keys_by_table.get(table, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.bytes,
+                    'max_bytes': self.max_bytes}
+
+    def _remove(self, key):
+        value, tables = self._entries.pop(key)
+        self.bytes -= len(key) + len(value)
+        for table in tables:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
+
+
+class RedisBackend:
+    """Shared backend on a Redis-compatible client; entries expire after ``ttl``."""
+
+    name = 'redis'
+
+    def __init__(self, client, ttl, prefix='response-cache:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, tables):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+        for table in tables:
+            tag = f'{self.prefix}table:{table}'
+            self.client.sadd(tag, self.prefix + key)
+            self.client.expire(tag, self.ttl)
+
+    def invalidate(self, tables):
+        for table in tables:
+            tag = f'{self.prefix}table:{table}'
+            keys = self.client.smembers(tag)
+            self.client.delete(tag, *keys)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self):
+        entries = sum(1 for key in self.client.scan_iter(match=self.prefix + '*')
+                      if b':table:' not in key)
+        return {'entries': entries, 'ttl': self.ttl}
+
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Cached ``(status, headers, body)`` for ``key``, or None."""
+        try:
+            value = self.backend.get(key)
+        except Exception:
+            logger.exception('Response cache read failed')
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        meta, _, body = value.partition(b'\n')
+        meta = json.loads(meta)
+        return meta['status'], meta['headers'], body
+
+    def put(self, key, tables, status, headers, body):
+        meta = json.dumps({'status': status, 'headers': headers}).encode('utf-8')
+        try:
+            self.backend.set(key, meta + b'\n' + body, tables)
+        except Exception:
+            logger.exception('Response cache write failed')
+
+    def invalidate(self, tables):
+        try:
+            self.backend.invalidate(tables)
+        except Exception:
+            logger.exception('Response cache invalidation failed')
+        with self._lock:
+            self.invalidations += 1
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            counters = {
+                'backend': self.backend.name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+        return {**counters, **self.backend.stats()}
+
+
+def make_backend():
+    if RESPONSE_CACHE_URL:
+        import redis
+        return RedisBackend(redis.Redis.from_url(RESPONSE_CACHE_URL),
+                            RESPONSE_CACHE_TTL)
+    return LocalBackend(RESPONSE_CACHE_MAX_BYTES)
+
+
+response_cache = ResponseCache(make_backend())
+on_tables_committed(response_cache.invalidate)
+
+
+def _cache_key(current_user, stamps):
+    args = urlencode(sorted(request.args.items(multi=True)))
+    versions = ','.join(f'{table}={version}'
+                        for table, version in sorted(stamps.items()))
+    return f'{current_user.role.value}|{request.path}?{args}|{versions}'
+
+
+def _read_tables(tables, resource):
+    # ``tables`` plus those behind this request's ?include=; an invalid
+    # include is answered with a 400, which is never cached
+    if resource is None:
+        return tables
+    try:
+        _, includes = resource.parse()
+    except ValueError:
+        return tables
+    return tuple(sorted(set(tables) | set(resource.tables(includes))))
+
+
+def cached_response(*tables, resource=None):
+    """Cache a handler's 200 responses until one of ``tables`` changes.
+
+    With ``resource``, the tables of the includes a request asks for are
+    added to ``tables`` for that request. Goes below ``token_required``;
+    the cache is scoped by the caller's role, so handlers may vary their
+    output by role but not by user.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user, *args, **kwargs):
+            read_tables = _read_tables(tables, resource)
+            key = _cache_key(current_user, current_stamps(*read_tables))
+            cached = response_cache.get(key)
+            if cached is not None:
+                status, headers, body = cached
+                etag = headers.get('ETag')
+                if etag and not_modified(unquote_etag(etag)[0]):
+                    return '', 304, headers
+                return Response(body, status=status, headers=headers)
+
+            response = current_app.make_response(f(current_user, *args, **kwargs))
+            if response.status_code == 200:
+                response_cache.put(
+                    key, read_tables, response.status_code,
+                    {name: response.headers[name] for name in CACHED_HEADERS
+                     if name in response.headers},
+                    response.get_data())
+            return response
+
+        return decorated
+    return decorator
@@ -0,0 +1,175 @@
+"""Snapshot history of lab work data with content-addressed chunks.
+
+A snapshot splits the document into content-defined chunks: a chunk
+ends after a line whose CRC hits ``BOUNDARY_MASK`` (within the size
+bounds), so an edit only changes the chunks around it and every other
+chunk hashes the same as before. Chunks are stored once, compressed,
+under their SHA-256, which also shares them between students working
+from the same lab template. A snapshot row only holds the digest list.
+"""
+import hashlib
+import zlib
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, update, func, insert, or_
+from sqlalchemy.dialects import mysql, sqlite
+from models.student_lab_progress import StudentLabProgress
+from models.work_data_snapshot import WorkDataChunk, WorkDataSnapshot
+from config import Base, WORK_SNAPSHOT_INTERVAL, WORK_CHUNK_PRUNE_GRACE
+
+MIN_CHUNK_SIZE = 512
+MAX_CHUNK_SIZE = 8192
+# About one line in eight may end a chunk
+BOUNDARY_MASK = 0x7
+
+
+def split_chunks(text):
+    chunks, current, size = [], [], 0
+    for line in text.splitlines(keepends=True):
+        if current and size + len(line) > MAX_CHUNK_SIZE:
+            chunks.append(''.join(current))
+            current, size = [], 0
+        # Very long lines (minified code, data) are cut at fixed offsets
+        while len(line) > MAX_CHUNK_SIZE:
+            chunks.append(line[:MAX_CHUNK_SIZE])
+            line = line[MAX_CHUNK_SIZE:]
+        current.append(line)
+        size += len(line)
+        if size >= MIN_CHUNK_SIZE and \
+                zlib.crc32(line.encode('utf-8')) & BOUNDARY_MASK == 0:
+            chunks.append(''.join(current))
+            current, size = [], 0
+    if current:
+        chunks.append(''.join(current))
+    return chunks
+
+
+def _digest(chunk):
+    return hashlib.sha256(chunk.encode('utf-8')).hexdigest()
+
+
+def _insert_missing_chunks(chunks, now):
+    existing = set(Base.session.execute(
+        select(WorkDataChunk.digest).where(WorkDataChunk.digest.in_(list(chunks)))
+    ).scalars())
+    if existing:
+        # Reused chunks start a new prune grace period; on MySQL the row
+        # locks also make a concurrent prune wait for this transaction
+        Base.session.execute(
+            update(WorkDataChunk)
+            .where(WorkDataChunk.digest.in_(existing))
+            .values(last_used_at=now))
+    rows = [{"digest": digest, "data": zlib.compress(chunk.encode('utf-8')),
+             "size": len(chunk), "last_used_at": now}
+            for digest, chunk in chunks.items() if digest not in existing]
+    if not rows:
+        return 0
+
+    # Another process may store the same chunk concurrently
+    dialect = Base.session.get_bind().dialect.name
+    if dialect == 'mysql':
+        statement = mysql.insert(WorkDataChunk).prefix_with('IGNORE')
+    elif dialect == 'sqlite':
+        statement = sqlite.insert(WorkDataChunk).on_conflict_do_nothing()
+    else:
+        statement = insert(WorkDataChunk)
+    Base.session.execute(statement, rows)
+    return len(rows)
+
+
+def take_snapshots(documents, force=False):
+    """Snapshot ``[(progress_id, version, text)]`` in the current transaction.
+
+    Unless ``force`` is set, a document is only snapshotted when its last
+    snapshot is older than WORK_SNAPSHOT_INTERVAL seconds. Documents whose
+    latest snapshot already has the same or a newer version are always
+    skipped.
+    Documents whose progress row has been deleted are dropped. Returns the
+    number of snapshots written; the caller commits.
+    """
+    progress_ids = set(Base.session.execute(
+        select(StudentLabProgress.id).where(StudentLabProgress.id.in_(
+            [progress_id for progress_id, _, _ in documents]))
+    ).scalars()) if documents else set()
+    documents = [document for document in documents
+                 if document[0] in progress_ids]
+    if not documents:
+        return 0
+
+    latest = {
+        progress_id: (version, created_at)
+        for progress_id, version, created_at in Base.session.execute(
+            select(WorkDataSnapshot.progress_id, WorkDataSnapshot.version,
+                   WorkDataSnapshot.created_at)
+            .where(WorkDataSnapshot.id.in_(
+                select(func.max(WorkDataSnapshot.id))
+                .where(WorkDataSnapshot.progress_id.in_(
+                    [progress_id for progress_id, _, _ in documents]))
+                .group_by(WorkDataSnapshot.progress_id)))
+        )
+    }
+
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=WORK_SNAPSHOT_INTERVAL)
+    chunks, snapshots = {}, []
+    for progress_id, version, text in documents:
+        previous = latest.get(progress_id)
+        if previous is not None and (previous[0] >= version or
+                                     (not force and previous[1] > cutoff)):
+            continue
+        digests = []
+        for chunk in split_chunks(text):
+            digest = _digest(chunk)
+            chunks[digest] = chunk
+            digests.append(digest)
+        snapshots.append({"progress_id": progress_id, "version": version,
+                          "created_at": now, "size": len(text),
+                          "manifest": ' '.join(digests)})
+    if not snapshots:
+        return 0
+
+    if chunks:
+        _insert_missing_chunks(chunks, now)
+    Base.session.execute(insert(WorkDataSnapshot), snapshots)
+    return len(snapshots)
+
+
+def snapshot_text(snapshot):
+    """Reassemble the work data stored by ``snapshot``."""
+    digests = snapshot.manifest.split()
+    if not digests:
+        return ''
+    data = dict(Base.session.execute(
+        select(WorkDataChunk.digest, WorkDataChunk.data)
+        .where(WorkDataChunk.digest.in_(set(digests)))
+    ).all())
+    return ''.join(zlib.decompress(data[digest]).decode('utf-8')
+                   for digest in digests)
+
+
+def prune_chunks(batch_size=1000):
+    """Delete chunks no snapshot references any more; returns the count.
+
+    Chunks used within WORK_CHUNK_PRUNE_GRACE seconds are kept: a
+    concurrent snapshot may have counted them as stored without having
+    committed its manifest yet.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=WORK_CHUNK_PRUNE_GRACE)
+    referenced = set()
+    manifests = Base.session.execute(
+        select(WorkDataSnapshot.manifest).execution_options(yield_per=batch_size)
+    ).scalars()
+    for manifest in manifests:
+        referenced.update(manifest.split())
+
+    orphans = [digest for digest in Base.session.execute(
+        select(WorkDataChunk.digest)).scalars() if digest not in referenced]
+    pruned = 0
+    for start in range(0, len(orphans), batch_size):
+        # The age is checked again at delete time, after any reuse
+        pruned += Base.session.execute(
+            delete(WorkDataChunk)
+            .where(WorkDataChunk.digest.in_(orphans[start:start + batch_size]),
+                   or_(WorkDataChunk.last_used_at.is_(None),
+                       WorkDataChunk.last_used_at < cutoff))).rowcount
+    Base.session.commit()
+    return pruned
@@ -1,21 +1,37 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
-from config import Base, SQLALCHEMY_DATABASE_URI, SQLALCHEMY_TRACK_MODIFICATIONS
-from api import register_bp, login_bp, courses_bp, labs_bp, users_bp, profile_bp, subjects_bp, class_bp
+from config import Base, SQLALCHEMY_DATABASE_URI, SQLALCHEMY_TRACK_MODIFICATIONS, SQLALCHEMY_ENGINE_OPTIONS, JWT_STATELESS_AUTH
+from db_metrics import init_db_metrics
+from json_provider import FastJSONProvider
+from compression import init_compression
+from api import register_bp, login_bp, courses_bp, labs_bp, users_bp, profile_bp, subjects_bp, class_bp, progress_bp, metrics_bp, me_bp, batch_bp
 import os
 from swagger import swagger_ui_blueprint, get_swagger_json
+from api.utils.progress_rollups import rebuild_rollups
+from api.utils.passwords import HashPoolBusy
+from api.utils.auth_helpers import UserNotFound
+from api.utils.autosave import autosave_buffer
+from api.utils.work_snapshots import prune_chunks
+from config import AUTOSAVE_FLUSH_INTERVAL
+import migrations
 
 def create_app():
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     CORS(app)
     
     # Configure the app
     app.config['SQLALCHEMY_DATABASE_URI'] = SQLALCHEMY_DATABASE_URI
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = SQLALCHEMY_TRACK_MODIFICATIONS
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = SQLALCHEMY_ENGINE_OPTIONS
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev_key_for_development')
+    app.config['JWT_STATELESS_AUTH'] = JWT_STATELESS_AUTH
     
     # Initialize SQLAlchemy
     Base.init_app(app)
+    init_db_metrics(app)
+    init_compression(app)
+    autosave_buffer.start(app, AUTOSAVE_FLUSH_INTERVAL)
     
     # Register API blueprints
     app.register_blueprint(register_bp)
@@ -26,14 +42,50 @@ def create_app():
     app.register_blueprint(profile_bp)
     app.register_blueprint(subjects_bp)
     app.register_blueprint(class_bp)
+    app.register_blueprint(progress_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(me_bp)
+    app.register_blueprint(batch_bp)
     
     # Register Swagger UI blueprint
     app.register_blueprint(swagger_ui_blueprint, url_prefix='/api/docs')
     
+    # Back-pressure when the password hashing pool is saturated
+    @app.errorhandler(HashPoolBusy)
+    def hash_pool_busy(error):
+        response = jsonify({'error': 'Server busy, please retry shortly'})
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response, 429
+
+    # Stateless tokens of users deleted since they were issued
+    @app.errorhandler(UserNotFound)
+    def user_not_found(error):
+        return jsonify({'error': 'Invalid user token'}), 401
+
     # Define route for Swagger JSON
     @app.route('/api/swagger.json')
     def swagger():
         return get_swagger_json()
+
+    # Apply pending schema migrations (run from src/):
+    #   PYTHONPATH=. flask --app app db-upgrade
+    @app.cli.command('db-upgrade')
+    def db_upgrade_command():
+        applied = migrations.upgrade(Base.engine)
+        print(f"Applied migrations: {', '.join(applied) or 'none'}")
+
+    # Recompute the progress rollup tables (run from src/):
+    #   PYTHONPATH=. flask --app app rebuild-rollups
+    @app.cli.command('rebuild-rollups')
+    def rebuild_rollups_command():
+        rebuild_rollups()
+        print('Progress rollups rebuilt')
+
+    # Delete work data chunks no snapshot references (run from src/):
+    #   PYTHONPATH=. flask --app app prune-work-chunks
+    @app.cli.command('prune-work-chunks')
+    def prune_work_chunks_command():
+        print(f'Pruned {prune_chunks()} work data chunks')
     
     return app
 
@@ -42,4 +94,5 @@ if __name__ == '__main__':
     app = create_app()
     with app.app_context():
         Base.create_all()
+        migrations.upgrade(Base.engine)
     app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Flush/commit cost with Flask-SQLAlchemy modification tracking on and off.
+
+Usage (from src/):
+    python -m benchmarks.bench_change_tracking
+
+Each mode runs in its own process against an in-memory SQLite database:
+it inserts ROWS labs in batches, then updates every one of them. The
+commit time comes from an untraced pass and the peak memory from a
+second pass under tracemalloc.
+"""
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROWS = 20000
+BATCH = 500
+
+
+def run(track, traced):
+    os.environ['DATABASE_URL'] = 'sqlite://'
+    import config
+    config.SQLALCHEMY_TRACK_MODIFICATIONS = track
+
+    from app import create_app
+    from config import Base
+    from models.user import User, Role
+    from models.subject import Subject
+    from models.lab import Lab, LabStatus
+
+    app = create_app()
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = track
+    with app.app_context():
+        Base.create_all()
+        teacher = User(email='t@example.com', password='x', role=Role.teacher,
+                       name='T', first_name='T')
+        subject = Subject(name='S')
+        Base.session.add_all([teacher, subject])
+        Base.session.commit()
+
+        commit_time = 0.0
+        if traced:
+            tracemalloc.start()
+        for start in range(0, ROWS, BATCH):
+            Base.session.add_all([
+                Lab(name=f'Lab {n}', subject_id=subject.id,
+                    created_by=teacher.id) for n in range(start, start + BATCH)])
+            began = time.perf_counter()
+            Base.session.commit()
+            commit_time += time.perf_counter() - began
+
+        for start in range(0, ROWS, BATCH):
+            labs = Lab.query.filter(Lab.id > start, Lab.id <= start + BATCH).all()
+            for lab in labs:
+                lab.status = LabStatus.approved
+            began = time.perf_counter()
+            Base.session.commit()
+            commit_time += time.perf_counter() - began
+        peak = 0
+        if traced:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    print(f'{commit_time:.3f} {peak / 1024 / 1024:.2f}')
+
+
+def main():
+    def measure(mode, traced):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_change_tracking', mode,
+             'traced' if traced else 'timed'],
+            capture_output=True, text=True, check=True).stdout.split()
+        return float(output[-2]), float(output[-1])
+
+    results = {}
+    for mode in ('track', 'no-track'):
+        results[mode] = (measure(mode, False)[0], measure(mode, True)[1])
+
+    print(f'{ROWS} inserts + {ROWS} updates, commits of {BATCH} rows')
+    print(f"{'mode':10} {'commit s':>10} {'peak MiB':>10}")
+    for mode, (seconds, peak) in results.items():
+        print(f'{mode:10} {seconds:10.3f} {peak:10.2f}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run(sys.argv[1] == 'track', sys.argv[2] == 'traced')
+    else:
+        main()
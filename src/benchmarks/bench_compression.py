@@ -0,0 +1,79 @@
+"""Response compression: CPU cost per MB against bandwidth saved.
+
+Usage (from src/):
+    python -m benchmarks.bench_compression
+
+Compresses three typical bodies with each codec and level and prints,
+as the median of REPEATS runs:
+
+- ratio: compressed size / original size;
+- cpu ms/MB: compression CPU time per MiB of input;
+- saved ms: transfer time saved on a LINK_MBPS link (weak campus
+  Wi-Fi) minus the CPU time spent, per response.
+
+The bodies are a page of ROWS labs as the list endpoint returns it,
+the same rows as an NDJSON export and the Swagger spec. Brotli rows
+only appear when the ``brotli`` package is installed.
+"""
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+ROWS = 5000
+REPEATS = 5
+LINK_MBPS = 2
+
+
+def _payloads():
+    from swagger import swagger_spec
+    start = datetime(2024, 9, 2, 8, 0)
+    labs = [{
+        "id": n,
+        "name": f"Lab {n}: {'SQL joins' if n % 2 else 'Linked lists'}",
+        "subject_id": n % 12 + 1,
+        "created_by": n % 40 + 1,
+        "status": "approved" if n % 7 else "pending",
+        "creation_date": (start + timedelta(minutes=n * 17)).isoformat(),
+        "approval_date": None if n % 7 == 0 else
+        (start + timedelta(minutes=n * 17 + 600)).isoformat(),
+    } for n in range(ROWS)]
+    return [
+        ('labs list (json)', json.dumps({"labs": labs}, sort_keys=True,
+                                        separators=(",", ":")).encode('utf-8')),
+        ('labs export (ndjson)', b''.join(
+            json.dumps(lab, sort_keys=True, separators=(",", ":")).encode('utf-8') + b'\n'
+            for lab in labs)),
+        ('swagger spec', json.dumps(swagger_spec, ensure_ascii=False,
+                                    separators=(",", ":")).encode('utf-8')),
+    ]
+
+
+def main():
+    import compression
+
+    codecs = [('gzip', level) for level in (1, 6, 9)]
+    if compression.brotli is not None:
+        codecs += [('br', quality) for quality in (1, 4, 11)]
+
+    bytes_per_ms = LINK_MBPS * 1000 * 1000 / 8 / 1000
+    print(f'median of {REPEATS} runs, link {LINK_MBPS} Mbit/s')
+    print(f"{'payload':22} {'codec':8} {'KiB':>8} {'ratio':>6} "
+          f"{'cpu ms/MB':>10} {'saved ms':>9}")
+    for name, data in _payloads():
+        print(f"{name:22} {'none':8} {len(data) / 1024:8.0f}")
+        for encoding, level in codecs:
+            timings = []
+            for _ in range(REPEATS):
+                began = time.process_time()
+                body = compression.compress(data, encoding, level)
+                timings.append(time.process_time() - began)
+            cpu_ms = statistics.median(timings) * 1000
+            saved_ms = (len(data) - len(body)) / bytes_per_ms - cpu_ms
+            print(f"{'':22} {f'{encoding}-{level}':8} {len(body) / 1024:8.0f} "
+                  f"{len(body) / len(data):6.3f} "
+                  f"{cpu_ms * 1024 * 1024 / len(data):10.1f} {saved_ms:9.0f}")
+
+
+if __name__ == '__main__':
+    main()
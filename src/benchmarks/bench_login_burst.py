@@ -0,0 +1,97 @@
+"""Login latency under a burst of concurrent logins.
+
+Usage (from src/):
+    python -m benchmarks.bench_login_burst
+
+Runs BURST simultaneous POST /api/login calls from threads against a
+temporary SQLite database, once hashing inline (PASSWORD_HASH_WORKERS=0)
+and once on the process pool. For the accepted logins it prints how many
+there were and their p50/p99 latency; the 429 rejections are counted
+separately, with how fast they came back, since they never hash. The
+hash cost defaults to pbkdf2:sha256:50000 to keep the run short; set
+PASSWORD_HASH_METHOD to benchmark production cost.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BURST = 500
+
+
+def run():
+    from app import create_app
+    from config import Base
+    from models.user import User, Role
+    from api.utils.passwords import hash_password, shutdown
+
+    app = create_app()
+    with app.app_context():
+        Base.create_all()
+        password = hash_password('password123')
+        Base.session.add_all([
+            User(email=f'student{n}@example.com', password=password,
+                 role=Role.student, name='Student', first_name=str(n))
+            for n in range(BURST)])
+        Base.session.commit()
+
+    client = app.test_client()
+    barrier = threading.Barrier(BURST)
+    results = [None] * BURST
+
+    def login(n):
+        barrier.wait()
+        began = time.perf_counter()
+        response = client.post('/api/login', json={
+            'email': f'student{n}@example.com', 'password': 'password123'})
+        results[n] = (time.perf_counter() - began, response.status_code)
+
+    threads = [threading.Thread(target=login, args=(n,)) for n in range(BURST)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    shutdown()
+
+    accepted = sorted(latency for latency, status in results if status == 200)
+    rejected = sorted(latency for latency, status in results if status == 429)
+    print(len(accepted), _percentile(accepted, 50), _percentile(accepted, 99),
+          len(rejected), _percentile(rejected, 99))
+
+
+def _percentile(latencies, percent):
+    """Nearest-rank percentile of sorted latencies, in ms ('-' if none)."""
+    if not latencies:
+        return '-'
+    rank = max(1, -(-len(latencies) * percent // 100))
+    return f'{latencies[rank - 1] * 1000:.0f}'
+
+
+def main():
+    print(f'{BURST} concurrent logins, '
+          f"{os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:50000')}")
+    print(f"{'hashing':12} {'accepted':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'429s':>6} {'429 p99 ms':>10}")
+    workers = os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1))
+    for label, count in (('inline', '0'), (f'pool x{workers}', workers)):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ,
+                       DATABASE_URL=f'sqlite:///{tmp}/bench.db',
+                       PASSWORD_HASH_WORKERS=count)
+            env.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:50000')
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_login_burst', 'run'],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout.split()
+        accepted, p50, p99, rejected, rejected_p99 = output[-5:]
+        print(f'{label:12} {accepted:>8} {p50:>8} {p99:>8} '
+              f'{rejected:>6} {rejected_p99:>10}')
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['run']:
+        run()
+    else:
+        main()
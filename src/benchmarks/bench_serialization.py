@@ -0,0 +1,98 @@
+"""List serialization: ORM objects + dicts + stdlib json vs row serializers.
+
+Usage (from src/):
+    python -m benchmarks.bench_serialization
+
+Loads ROWS labs from an in-memory SQLite database and times, as the
+median of REPEATS runs, the query plus serialization of the full list:
+
+- orm+json: ``Lab.query`` objects, hand-built dicts, stdlib encoder
+  (the code path before the serializer registry);
+- rows+json: ``LAB.query()`` tuples, compiled serializer, stdlib;
+- rows+fast: the same with the fast backend (orjson, when installed);
+- rows+fast fields=id,name: a two-field projection.
+"""
+import os
+import statistics
+import time
+
+ROWS = 50000
+REPEATS = 5
+
+
+def main():
+    os.environ['DATABASE_URL'] = 'sqlite://'
+    from app import create_app
+    from config import Base
+    from models.user import User, Role
+    from models.subject import Subject
+    from models.lab import Lab, LabStatus
+    from api.utils.resources import LAB
+    import json_provider
+
+    app = create_app()
+    with app.app_context():
+        Base.create_all()
+        teacher = User(email='t@example.com', password='x', role=Role.teacher,
+                       name='T', first_name='T')
+        subject = Subject(name='S')
+        Base.session.add_all([teacher, subject])
+        Base.session.flush()
+        Base.session.execute(Lab.__table__.insert(), [
+            {"name": f"Lab {n}", "subject_id": subject.id,
+             "created_by": teacher.id, "status": LabStatus.approved.name}
+            for n in range(ROWS)])
+        Base.session.commit()
+
+        def orm_stdlib():
+            labs = Lab.query.order_by(Lab.id).all()
+            labs_list = []
+            for lab in labs:
+                labs_list.append({
+                    "id": lab.id,
+                    "name": lab.name,
+                    "subject_id": lab.subject_id,
+                    "created_by": lab.created_by,
+                    "status": lab.status.value,
+                    "creation_date": lab.creation_date.isoformat(),
+                    "approval_date": lab.approval_date.isoformat() if lab.approval_date else None
+                })
+            return app.json.dumps({"labs": labs_list},
+                                  separators=(",", ":")).encode('utf-8')
+
+        def rows(fields=None):
+            labs = LAB.query(fields).order_by(Lab.id).all()
+            return app.json.dumps_bytes({"labs": LAB.serialize(labs, fields)})
+
+        def without_fast_backend(function):
+            def run():
+                fast, json_provider.orjson = json_provider.orjson, None
+                try:
+                    return function()
+                finally:
+                    json_provider.orjson = fast
+            return run
+
+        modes = [
+            ('orm+json', orm_stdlib),
+            ('rows+json', without_fast_backend(rows)),
+            (f'rows+{json_provider.backend_name()}', rows),
+            (f'rows+{json_provider.backend_name()} fields=id,name',
+             lambda: rows(('id', 'name'))),
+        ]
+
+        print(f'{ROWS} labs, median of {REPEATS} runs')
+        print(f"{'mode':28} {'ms':>8} {'KiB':>8}")
+        for name, function in modes:
+            timings = []
+            for _ in range(REPEATS):
+                Base.session.expunge_all()
+                began = time.perf_counter()
+                body = function()
+                timings.append(time.perf_counter() - began)
+            print(f'{name:28} {statistics.median(timings) * 1000:8.1f} '
+                  f'{len(body) / 1024:8.0f}')
+
+
+if __name__ == '__main__':
+    main()
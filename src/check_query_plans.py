@@ -0,0 +1,158 @@
+"""Run EXPLAIN on the queries behind the hot API routes and fail on full
+scans and on sorts the indexes should have spared.
+
+Usage (from src/):
+    python check_query_plans.py
+
+The schema is built with create_all plus the migrations and seeded with
+sample rows. DATABASE_URL defaults to an in-memory SQLite database; when
+pointing it at MySQL use a scratch database, since the script inserts
+data.
+"""
+import os
+import sys
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from datetime import datetime
+from sqlalchemy import insert, text
+from app import create_app
+from config import Base
+import migrations
+from models.user import User, Role
+from models.student import Student
+from models.class_group import ClassGroup
+from models.class_subject import ClassSubject
+from models.teacher_assignment import TeacherAssignment
+from models.subject import Subject
+from models.lab import Lab, LabStatus
+from models.student_lab_progress import StudentLabProgress, ProgressStatus
+from models.progress_rollup import ClassLabProgressRollup, StudentProgressRollup
+from api.utils.pagination import ordered_keyset_query
+from api.courses.labs_routes import pending_labs_query
+
+CLASSES = 20
+STUDENTS_PER_CLASS = 40
+TEACHERS = 30
+SUBJECTS = 12
+LABS_PER_SUBJECT = 10
+
+
+def seed():
+    now = datetime.utcnow()
+    teachers = [dict(id=i + 1, email=f'teacher{i}@example.com', password='x',
+                     role=Role.teacher, name='Teacher', first_name=str(i))
+                for i in range(TEACHERS)]
+    students = [dict(id=TEACHERS + i + 1, email=f'student{i}@example.com',
+                     password='x', role=Role.student, name='Student',
+                     first_name=str(i))
+                for i in range(CLASSES * STUDENTS_PER_CLASS)]
+    Base.session.execute(insert(User), teachers + students)
+    Base.session.execute(insert(ClassGroup), [
+        dict(id=i + 1, name=f'Class {i}') for i in range(CLASSES)])
+    Base.session.execute(insert(Subject), [
+        dict(id=i + 1, name=f'Subject {i}') for i in range(SUBJECTS)])
+    Base.session.execute(insert(Student), [
+        dict(user_id=s['id'], class_id=n // STUDENTS_PER_CLASS + 1)
+        for n, s in enumerate(students)])
+    Base.session.execute(insert(ClassSubject), [
+        dict(class_id=c + 1, subject_id=s + 1)
+        for c in range(CLASSES) for s in range(SUBJECTS)])
+    Base.session.execute(insert(TeacherAssignment), [
+        dict(teacher_id=(c + s) % TEACHERS + 1, class_id=c + 1, subject_id=s + 1)
+        for c in range(CLASSES) for s in range(SUBJECTS)])
+    labs = [dict(id=n + 1, name=f'Lab {n}', subject_id=n % SUBJECTS + 1,
+                 created_by=n % TEACHERS + 1,
+                 status=list(LabStatus)[n % 3], creation_date=now)
+            for n in range(SUBJECTS * LABS_PER_SUBJECT)]
+    Base.session.execute(insert(Lab), labs)
+    Base.session.execute(insert(StudentLabProgress), [
+        dict(student_id=s['id'], lab_id=lab['id'],
+             status=list(ProgressStatus)[(s['id'] + lab['id']) % 3])
+        for s in students[::4] for lab in labs[::6]])
+    Base.session.commit()
+
+
+def route_queries():
+    session = Base.session
+    yield 'get_class: roster', Student.query.filter(Student.class_id == 3)
+    yield 'get_class: subjects', ClassSubject.query.filter(
+        ClassSubject.class_id == 3)
+    yield 'get_class: teachers', TeacherAssignment.query.filter(
+        TeacherAssignment.class_id == 3)
+    yield 'get_class_progress: roster', session.query(
+        Student.user_id, User.email, StudentProgressRollup.completed
+    ).join(User, User.id == Student.user_id).outerjoin(
+        StudentProgressRollup,
+        StudentProgressRollup.student_id == Student.user_id
+    ).filter(Student.class_id == 3)
+    yield 'get_class_progress: labs', ClassLabProgressRollup.query.filter(
+        ClassLabProgressRollup.class_id == 3)
+    yield 'get_all_users: role page', User.query.filter(
+        User.role == Role.student, User.id > 100).order_by(User.id).limit(100)
+    yield 'get_all_labs: subject page', Lab.query.filter(
+        Lab.subject_id == 2, Lab.id > 10).order_by(Lab.id).limit(100)
+    yield 'get_all_labs: creator page', Lab.query.filter(
+        Lab.created_by == 2).order_by(Lab.id).limit(100)
+    # The route's own query, first page and after a cursor
+    for name, after in (('first page', None),
+                        ('cursor page', f'{datetime(2024, 1, 1).isoformat()}|10'),
+                        ('undated cursor page', '|10')):
+        yield f'get_pending_labs: {name}', ordered_keyset_query(
+            pending_labs_query(), Lab.creation_date, Lab.id, after, 101)
+    yield 'get_student_progress', StudentLabProgress.query.filter(
+        StudentLabProgress.student_id == 50)
+    yield 'update_lab_progress', StudentLabProgress.query.filter(
+        StudentLabProgress.student_id == 50, StudentLabProgress.lab_id == 7)
+    yield 'lab completion', StudentLabProgress.query.filter(
+        StudentLabProgress.lab_id == 7,
+        StudentLabProgress.status == ProgressStatus.completed)
+    yield 'teacher assignments', TeacherAssignment.query.filter(
+        TeacherAssignment.teacher_id == 4)
+    yield 'login', User.query.filter(User.email == 'student7@example.com')
+
+
+def plan_problems(connection, sql):
+    if connection.dialect.name == 'sqlite':
+        plan = connection.execute(text('EXPLAIN QUERY PLAN ' + sql)).all()
+        details = [row[3] for row in plan]
+        return [detail for detail in details
+                if (detail.startswith('SCAN ') and ' USING ' not in detail
+                    and detail != 'SCAN CONSTANT ROW')
+                or detail.startswith('USE TEMP B-TREE FOR ORDER BY')], details
+
+    plan = connection.execute(text('EXPLAIN ' + sql)).mappings().all()
+    details = [f"{row['table']}: type={row['type']} key={row['key']} "
+               f"extra={row['Extra']}" for row in plan]
+    return [f"SCAN {row['table']}" for row in plan if row['type'] == 'ALL'] + \
+        [f"SORT {row['table']}" for row in plan
+         if 'Using filesort' in (row['Extra'] or '')], details
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        Base.create_all()
+        migrations.upgrade(Base.engine)
+        seed()
+        if Base.engine.dialect.name == 'sqlite':
+            Base.session.execute(text('ANALYZE'))
+
+        failed = False
+        connection = Base.session.connection()
+        for name, query in route_queries():
+            sql = str(query.statement.compile(
+                dialect=Base.engine.dialect,
+                compile_kwargs={'literal_binds': True}))
+            problems, details = plan_problems(connection, sql)
+            status = 'BAD PLAN' if problems else 'ok'
+            print(f'{status:9} {name}')
+            for detail in details:
+                print(f'          {detail}')
+            failed = failed or bool(problems)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
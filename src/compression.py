@@ -0,0 +1,240 @@
+"""Response compression: brotli when installed and accepted, else gzip.
+
+``init_compression`` adds an after_request hook that compresses JSON,
+NDJSON, CSV and text bodies of at least COMPRESSION_MIN_SIZE bytes for
+clients that send a matching Accept-Encoding. Streamed responses (the
+exports) are compressed chunk by chunk and flushed after each one, so
+rows still reach the client as they are produced. A compressed body's
+strong ETag gets the encoding appended (``encoded_etag``); the
+conditional helpers accept every such variant of a handler's ETag.
+
+``StaticPayload`` is for bodies that never change while the process
+runs, such as the Swagger spec: every encoding is built once, at the
+highest level, and each request is served from memory.
+"""
+import gzip
+import threading
+import time
+import zlib
+from flask import request, current_app
+from werkzeug.http import quote_etag
+from config import COMPRESSION_MIN_SIZE, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/csv',
+    'text/html',
+    'text/plain',
+    'text/css',
+}
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding):
+    """Best encoding the client accepts (``br`` over ``gzip``), or None."""
+    for encoding in available_encodings():
+        if accept_encoding[encoding] > 0:
+            return encoding
+    return None
+
+
+def encoded_etag(etag, encoding):
+    """Strong ETag of the ``encoding`` representation of ``etag``'s body."""
+    return f'{etag}-{encoding}'
+
+
+def etag_variants(etag):
+    """``etag`` and the ETags of its compressed representations."""
+    return (etag,) + tuple(encoded_etag(etag, encoding)
+                           for encoding in available_encodings())
+
+
+def compress(data, encoding, level=None):
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESSION_BROTLI_QUALITY
+                               if level is None else level)
+    return gzip.compress(data, COMPRESSION_GZIP_LEVEL if level is None else level,
+                         mtime=0)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding):
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+            self._write = self._compressor.process
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+        else:
+            # wbits=31: zlib stream with a gzip header and trailer
+            self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._write = self._compressor.compress
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+
+    def chunk(self, data):
+        return self._write(data) + self._flush()
+
+    def finish(self):
+        return self._finish()
+
+
+class _Stats:
+    def __init__(self):
+        self.responses = 0
+        self.streamed = 0
+        self.skipped_small = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_time = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, bytes_in, bytes_out, cpu_time, streamed=False):
+        with self._lock:
+            self.responses += 1
+            self.streamed += streamed
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.cpu_time += cpu_time
+
+    def skip_small(self):
+        with self._lock:
+            self.skipped_small += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'encodings': list(available_encodings()),
+                'min_size': COMPRESSION_MIN_SIZE,
+                'responses': self.responses,
+                'streamed': self.streamed,
+                'skipped_small': self.skipped_small,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'ratio': round(self.bytes_out / self.bytes_in, 3)
+                if self.bytes_in else None,
+                'cpu_ms_per_mb': round(self.cpu_time * 1000 * 1024 * 1024 / self.bytes_in, 3)
+                if self.bytes_in else None,
+            }
+
+
+compression_stats = _Stats()
+
+
+def _compress_stream(chunks, encoding):
+    compressor = _StreamCompressor(encoding)
+    bytes_in = bytes_out = 0
+    cpu_time = 0.0
+    try:
+        for data in chunks:
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            if not data:
+                continue
+            started = time.process_time()
+            out = compressor.chunk(data)
+            cpu_time += time.process_time() - started
+            bytes_in += len(data)
+            bytes_out += len(out)
+            yield out
+        out = compressor.finish()
+        bytes_out += len(out)
+        yield out
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+        compression_stats.record(bytes_in, bytes_out, cpu_time, streamed=True)
+
+
+def _compressible(response):
+    return (response.mimetype in COMPRESSIBLE_TYPES
+            and 200 <= response.status_code < 300
+            and response.status_code != 204
+            and 'Content-Encoding' not in response.headers
+            and not response.direct_passthrough)
+
+
+def _echo_encoded_etag(response):
+    # A 304 names the representation the client holds, which may be a
+    # compressed one; handlers only know the identity ETag
+    etag, weak = response.get_etag()
+    if etag is None or weak:
+        return
+    for candidate in etag_variants(etag):
+        if request.if_none_match.contains_weak(candidate):
+            response.set_etag(candidate)
+            return
+
+
+def compress_response(response):
+    if response.status_code == 304:
+        _echo_encoded_etag(response)
+        return response
+    if not _compressible(response):
+        return response
+    # Caches must keep one copy per encoding, even for uncompressed replies
+    response.vary.add('Accept-Encoding')
+
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None or request.method == 'HEAD':
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < COMPRESSION_MIN_SIZE:
+            compression_stats.skip_small()
+            return response
+        started = time.process_time()
+        body = compress(data, encoding)
+        compression_stats.record(len(data), len(body), time.process_time() - started)
+        response.set_data(body)
+    # Byte-different representations must not share a strong ETag
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(encoded_etag(etag, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
+
+
+class StaticPayload:
+    """A fixed body kept in memory in every supported encoding."""
+
+    def __init__(self, data, mimetype='application/json'):
+        self.mimetype = mimetype
+        self.checksum = f'{zlib.crc32(data):08x}-{len(data)}'
+        self.bodies = {None: data}
+        for encoding in available_encodings():
+            # Built once, so the slowest, smallest settings are affordable
+            self.bodies[encoding] = compress(
+                data, encoding, 11 if encoding == 'br' else 9)
+
+    def response(self):
+        encoding = negotiate(request.accept_encodings)
+        # Each encoding is a different byte sequence, so it gets its own ETag
+        etag = encoded_etag(self.checksum, encoding or 'identity')
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(
+                self.bodies[encoding], mimetype=self.mimetype)
+            if encoding is not None:
+                response.headers['Content-Encoding'] = encoding
+        response.headers['ETag'] = quote_etag(etag)
+        response.vary.add('Accept-Encoding')
+        return response
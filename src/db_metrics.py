@@ -0,0 +1,74 @@
+import threading
+import time
+from flask import g, has_app_context
+from sqlalchemy.pool import QueuePool
+
+
+class _WaitStats:
+    def __init__(self):
+        self.requests = 0
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, checkouts, wait):
+        with self._lock:
+            self.requests += 1
+            self.checkouts += checkouts
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'checkouts': self.checkouts,
+                'avg_wait_ms': round(self.total_wait * 1000 / self.requests, 3)
+                if self.requests else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3)
+            }
+
+
+wait_stats = _WaitStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if has_app_context():
+                g.db_pool_wait = g.get('db_pool_wait', 0.0) + \
+                    time.perf_counter() - start
+                g.db_pool_checkouts = g.get('db_pool_checkouts', 0) + 1
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': pool.overflow(),
+            'timeout': pool.timeout(),
+        })
+    status['wait'] = wait_stats.snapshot()
+    return status
+
+
+def init_db_metrics(app):
+    # Report the pool wait of each request in a header and the running totals
+    @app.after_request
+    def record_pool_wait(response):
+        wait = g.get('db_pool_wait', 0.0)
+        checkouts = g.get('db_pool_checkouts', 0)
+        if checkouts:
+            wait_stats.record(checkouts, wait)
+            response.headers['X-DB-Pool-Wait-Ms'] = f'{wait * 1000:.3f}'
+        return response
@@ -0,0 +1,41 @@
+"""JSON encoding for responses: orjson when installed, else the stdlib.
+
+``FastJSONProvider`` keeps Flask's output conventions (sorted keys,
+HTTP dates for datetimes, compact unless debugging) and only swaps the
+encoder. Anything orjson refuses, such as integers over 64 bits, goes
+through the stdlib encoder instead.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+                      | orjson.OPT_PASSTHROUGH_DATETIME
+                      | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+
+def backend_name():
+    return 'orjson' if orjson is not None else 'json'
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    def dumps_bytes(self, obj):
+        """Compact UTF-8 JSON for ``obj``."""
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS)
+            except TypeError:
+                pass
+        return self.dumps(obj, separators=(",", ":")).encode('utf-8')
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,55 @@
+"""Versioned schema migrations.
+
+Each module in ``migrations/versions`` is named ``NNNN_description.py``
+and defines ``upgrade(connection)``. Applied versions are recorded in the
+``schema_version`` table; ``upgrade`` runs the pending ones in order,
+each in its own transaction. Migrations must be safe to run against a
+database created by ``Base.create_all()``.
+"""
+import importlib
+import pkgutil
+from datetime import datetime
+from sqlalchemy import Table, Column, Integer, String, DateTime, MetaData, select
+
+from migrations import versions
+
+_metadata = MetaData()
+schema_version = Table(
+    'schema_version', _metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String(100), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+def available_migrations():
+    migrations = []
+    for module in pkgutil.iter_modules(versions.__path__):
+        number, _, name = module.name.partition('_')
+        if number.isdigit():
+            migrations.append((int(number), name, module.name))
+    return sorted(migrations)
+
+
+def current_version(engine):
+    with engine.begin() as connection:
+        schema_version.create(connection, checkfirst=True)
+        versions_applied = connection.execute(
+            select(schema_version.c.version)).scalars().all()
+    return max(versions_applied, default=0)
+
+
+def upgrade(engine):
+    """Apply every pending migration and return the list of applied names."""
+    applied = []
+    current = current_version(engine)
+    for number, name, module_name in available_migrations():
+        if number <= current:
+            continue
+        module = importlib.import_module(f'migrations.versions.{module_name}')
+        with engine.begin() as connection:
+            module.upgrade(connection)
+            connection.execute(schema_version.insert().values(
+                version=number, name=name, applied_at=datetime.utcnow()))
+        applied.append(module_name)
+    return applied
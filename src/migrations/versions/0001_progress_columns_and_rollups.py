@@ -0,0 +1,68 @@
+"""Progress scoring columns and the progress rollup tables."""
+from sqlalchemy import (Table, Column, Integer, Float, ForeignKey, MetaData,
+                        inspect, text)
+
+NEW_COLUMNS = [
+    ('score', 'FLOAT'),
+    ('start_date', 'DATETIME'),
+    ('completion_date', 'DATETIME'),
+    ('comments', 'TEXT'),
+]
+
+# The tables as of this version, independent of later model changes
+_metadata = MetaData()
+Table('class_group', _metadata, Column('id', Integer, primary_key=True))
+Table('lab', _metadata, Column('id', Integer, primary_key=True))
+Table('user', _metadata, Column('id', Integer, primary_key=True))
+class_lab_progress_rollup = Table(
+    'class_lab_progress_rollup', _metadata,
+    Column('class_id', Integer, ForeignKey('class_group.id'), primary_key=True),
+    Column('lab_id', Integer, ForeignKey('lab.id'), primary_key=True),
+    Column('completed', Integer, nullable=False),
+    Column('in_progress', Integer, nullable=False),
+    Column('not_started', Integer, nullable=False),
+    Column('score_total', Float, nullable=False),
+)
+student_progress_rollup = Table(
+    'student_progress_rollup', _metadata,
+    Column('student_id', Integer, ForeignKey('user.id'), primary_key=True),
+    Column('completed', Integer, nullable=False),
+    Column('in_progress', Integer, nullable=False),
+    Column('not_started', Integer, nullable=False),
+    Column('score_total', Float, nullable=False),
+)
+
+# Same buckets as progress_rollups.status_aggregates; NULL is not started
+AGGREGATES = """
+    SUM(CASE WHEN p.status = 'completed' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN p.status = 'in_progress' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN p.status IN ('completed', 'in_progress') THEN 0 ELSE 1 END),
+    SUM(CASE WHEN p.status = 'completed' THEN COALESCE(p.score, 0) ELSE 0 END)
+"""
+
+
+def upgrade(connection):
+    existing = {column['name'] for column in
+                inspect(connection).get_columns('student_lab_progress')}
+    for name, sql_type in NEW_COLUMNS:
+        if name not in existing:
+            connection.execute(text(
+                f'ALTER TABLE student_lab_progress ADD COLUMN {name} {sql_type}'))
+
+    class_lab_progress_rollup.create(connection, checkfirst=True)
+    student_progress_rollup.create(connection, checkfirst=True)
+
+    # Backfill from the existing progress rows
+    connection.execute(class_lab_progress_rollup.delete())
+    connection.execute(student_progress_rollup.delete())
+    connection.execute(text(
+        'INSERT INTO student_progress_rollup '
+        '(student_id, completed, in_progress, not_started, score_total) '
+        f'SELECT p.student_id, {AGGREGATES} '
+        'FROM student_lab_progress p GROUP BY p.student_id'))
+    connection.execute(text(
+        'INSERT INTO class_lab_progress_rollup '
+        '(class_id, lab_id, completed, in_progress, not_started, score_total) '
+        f'SELECT s.class_id, p.lab_id, {AGGREGATES} '
+        'FROM student_lab_progress p JOIN student s ON s.user_id = p.student_id '
+        'GROUP BY s.class_id, p.lab_id'))
@@ -0,0 +1,36 @@
+"""Indexes for the hot lookup and listing columns."""
+from sqlalchemy import Table, Column, Integer, MetaData, Index, inspect
+
+# table -> (index name, columns), as of this version
+INDEXES = {
+    'lab': [('ix_lab_subject_id', ['subject_id']),
+            ('ix_lab_created_by', ['created_by']),
+            ('ix_lab_status_creation_date', ['status', 'creation_date'])],
+    'student': [('ix_student_class_id', ['class_id'])],
+    'student_lab_progress': [('ix_student_lab_progress_lab_id_status',
+                              ['lab_id', 'status'])],
+    'teacher_assignment': [('ix_teacher_assignment_class_id_subject_id',
+                            ['class_id', 'subject_id'])],
+    'user': [('ix_user_role_id', ['role', 'id'])],
+}
+
+
+def _covered(columns, existing):
+    # An index whose leading columns are ``columns`` already serves them,
+    # e.g. the keys MySQL creates for foreign keys
+    return any(index['column_names'][:len(columns)] == columns
+               for index in existing)
+
+
+def upgrade(connection):
+    inspector = inspect(connection)
+    for table_name, indexes in INDEXES.items():
+        existing = inspector.get_indexes(table_name)
+        for name, columns in indexes:
+            if _covered(columns, existing):
+                continue
+            # Only the names matter for CREATE INDEX
+            table = Table(table_name, MetaData(),
+                          *(Column(column, Integer) for column in columns))
+            Index(name, *table.c).create(connection)
+            existing.append({'name': name, 'column_names': columns})
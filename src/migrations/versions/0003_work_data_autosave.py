@@ -0,0 +1,15 @@
+"""Compressed work data and its version counter for autosave."""
+from sqlalchemy import inspect, text
+
+
+def upgrade(connection):
+    existing = {column['name'] for column in
+                inspect(connection).get_columns('student_lab_progress')}
+    blob_type = 'LONGBLOB' if connection.dialect.name == 'mysql' else 'BLOB'
+    if 'work_data_blob' not in existing:
+        connection.execute(text(
+            f'ALTER TABLE student_lab_progress ADD COLUMN work_data_blob {blob_type}'))
+    if 'work_data_version' not in existing:
+        connection.execute(text(
+            'ALTER TABLE student_lab_progress '
+            'ADD COLUMN work_data_version INTEGER NOT NULL DEFAULT 0'))
@@ -0,0 +1,31 @@
+"""Content-addressed work data chunks and the snapshot history."""
+from datetime import datetime
+from sqlalchemy import (Table, Column, Integer, String, DateTime, Text,
+                        LargeBinary, ForeignKey, MetaData, Index)
+
+# The tables as of this version, independent of later model changes
+_metadata = MetaData()
+Table('student_lab_progress', _metadata, Column('id', Integer, primary_key=True))
+work_data_chunk = Table(
+    'work_data_chunk', _metadata,
+    Column('digest', String(64), primary_key=True),
+    Column('data', LargeBinary, nullable=False),
+    Column('size', Integer, nullable=False),
+)
+work_data_snapshot = Table(
+    'work_data_snapshot', _metadata,
+    Column('id', Integer, primary_key=True),
+    Column('progress_id', Integer, ForeignKey('student_lab_progress.id'),
+           nullable=False),
+    Column('version', Integer, nullable=False),
+    Column('created_at', DateTime, default=datetime.utcnow, nullable=False),
+    Column('size', Integer, nullable=False),
+    Column('manifest', Text, nullable=False),
+    Index('ix_work_data_snapshot_progress_id_created_at',
+          'progress_id', 'created_at'),
+)
+
+
+def upgrade(connection):
+    work_data_chunk.create(connection, checkfirst=True)
+    work_data_snapshot.create(connection, checkfirst=True)
@@ -0,0 +1,11 @@
+"""Row version on student_lab_progress for optimistic concurrency."""
+from sqlalchemy import inspect, text
+
+
+def upgrade(connection):
+    existing = {column['name'] for column in
+                inspect(connection).get_columns('student_lab_progress')}
+    if 'version' not in existing:
+        connection.execute(text(
+            'ALTER TABLE student_lab_progress '
+            'ADD COLUMN version INTEGER NOT NULL DEFAULT 1'))
@@ -0,0 +1,20 @@
+"""Per-table change stamps used for conditional GETs."""
+from sqlalchemy import Table, Column, String, Integer, MetaData, select
+
+# The table and stamped tables as of this version
+STAMPED_TABLES = {'class_group', 'class_subject', 'lab', 'student',
+                  'subject', 'teacher_assignment', 'user'}
+change_stamp = Table(
+    'change_stamp', MetaData(),
+    Column('name', String(64), primary_key=True),
+    Column('version', Integer, nullable=False),
+)
+
+
+def upgrade(connection):
+    change_stamp.create(connection, checkfirst=True)
+    existing = set(connection.execute(select(change_stamp.c.name)).scalars())
+    missing = sorted(STAMPED_TABLES - existing)
+    if missing:
+        connection.execute(change_stamp.insert(),
+                           [{"name": name, "version": 0} for name in missing])
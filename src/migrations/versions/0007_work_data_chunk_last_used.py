@@ -0,0 +1,11 @@
+"""Last use time of work data chunks, for the prune grace period."""
+from sqlalchemy import inspect, text
+
+
+def upgrade(connection):
+    existing = {column['name'] for column in
+                inspect(connection).get_columns('work_data_chunk')}
+    if 'last_used_at' not in existing:
+        # NULL (never recorded) counts as long unused
+        connection.execute(text(
+            'ALTER TABLE work_data_chunk ADD COLUMN last_used_at DATETIME'))
@@ -0,0 +1,56 @@
+"""Per-table change stamps for cheap conditional GETs.
+
+Every transaction that writes to a stamped table increments that
+table's row in ``change_stamp`` just before it commits, so the stamp
+moves for all workers at once and a rollback undoes it. The written
+tables come from the change events of ``models.events``, which see
+unit-of-work flushes and bulk statements alike. Callbacks registered
+with ``on_tables_committed`` are told which stamped tables a
+transaction changed once it has committed.
+"""
+from sqlalchemy import Column, String, Integer, select, update, insert
+from config import Base
+from models import events
+
+STAMPED_TABLES = {'class_group', 'class_subject', 'lab', 'student',
+                  'subject', 'teacher_assignment', 'user'}
+
+
+class ChangeStamp(Base.Model):
+    __tablename__ = 'change_stamp'
+    name = Column(String(64), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
+
+def current_stamps(*tables):
+    """``{table: version}`` for ``tables``; never-written tables are 0."""
+    stamps = dict(Base.session.execute(
+        select(ChangeStamp.name, ChangeStamp.version)
+        .where(ChangeStamp.name.in_(tables))
+    ).all())
+    return {table: stamps.get(table, 0) for table in tables}
+
+
+def on_tables_committed(callback):
+    """Call ``callback(tables)`` after each commit that changed stamped tables."""
+    def notify(tables):
+        stamped = tables & STAMPED_TABLES
+        if stamped:
+            callback(stamped)
+    events.on_commit(notify)
+
+
+def _bump_stamps(session, tables):
+    connection = session.connection()
+    for table in sorted(tables & STAMPED_TABLES):
+        bumped = connection.execute(
+            update(ChangeStamp.__table__)
+            .where(ChangeStamp.__table__.c.name == table)
+            .values(version=ChangeStamp.__table__.c.version + 1)
+        ).rowcount
+        if not bumped:
+            connection.execute(insert(ChangeStamp.__table__)
+                               .values(name=table, version=1))
+
+
+events.before_commit(_bump_stamps)
@@ -0,0 +1,138 @@
+"""After-commit change events for every mapped table.
+
+Changes are collected on flush and from bulk INSERT/UPDATE/DELETE
+statements run through ``Session.execute`` (``do_orm_execute``), and are
+published to subscribers only once the transaction commits; a rollback
+discards them. A bulk statement reports the primary keys its WHERE
+clause names (``pk == value`` or ``pk IN (...)``) and otherwise a single
+event whose key is None, meaning "any row of the table". Writes issued
+on a raw connection, outside the session, must be reported with
+``record_changes``.
+
+``before_commit`` hooks see the tables a transaction changed while it
+can still write (the change stamps use this); ``on_commit`` callbacks
+get the same set once it has committed.
+"""
+from collections import defaultdict, namedtuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+
+ChangeEvent = namedtuple('ChangeEvent', ['table', 'operation', 'key'])
+
+_subscribers = defaultdict(list)
+_before_commit_hooks = []
+_commit_callbacks = []
+
+
+def subscribe(model, callback):
+    """Call ``callback(ChangeEvent)`` after each committed change to ``model``."""
+    _subscribers[model.__tablename__].append(callback)
+
+
+def before_commit(hook):
+    """Call ``hook(session, tables)`` before each commit that changed tables."""
+    _before_commit_hooks.append(hook)
+
+
+def on_commit(callback):
+    """Call ``callback(tables)`` after each commit that changed tables."""
+    _commit_callbacks.append(callback)
+
+
+def record_changes(session, model, operation, keys):
+    """Queue events for rows changed outside the session."""
+    pending = session.info.setdefault('change_events', [])
+    for key in keys:
+        pending.append(ChangeEvent(model.__tablename__, operation, key))
+
+
+def publish(events):
+    for change in events:
+        for callback in _subscribers.get(change.table, ()):
+            callback(change)
+
+
+def _identity(obj):
+    key = tuple(inspect(obj).mapper.primary_key_from_instance(obj))
+    return key[0] if len(key) == 1 else key
+
+
+def _statement_keys(statement):
+    # Primary keys named by ``pk == value`` or ``pk IN (...)``, else None
+    primary_key = list(statement.table.primary_key.columns)
+    where = statement.whereclause
+    if len(primary_key) != 1 or not isinstance(where, BinaryExpression) \
+            or not isinstance(where.right, BindParameter) \
+            or getattr(where.left, 'table', None) is None \
+            or where.left.table.name != statement.table.name \
+            or where.left.name != primary_key[0].name:
+        return None
+    value = where.right.effective_value
+    if where.operator is operators.eq:
+        return [value]
+    if where.operator is operators.in_op:
+        return list(value)
+    return None
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault('change_events', [])
+    for operation, objects in (('insert', session.new),
+                               ('update', session.dirty),
+                               ('delete', session.deleted)):
+        for obj in objects:
+            table = getattr(obj, '__tablename__', None)
+            if table is None:
+                continue
+            if operation == 'update' and not session.is_modified(obj):
+                continue
+            pending.append(ChangeEvent(table, operation, _identity(obj)))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk_changes(orm_execute_state):
+    statement = orm_execute_state.statement
+    if orm_execute_state.is_insert:
+        operation = 'insert'
+    elif orm_execute_state.is_update:
+        operation = 'update'
+    elif orm_execute_state.is_delete:
+        operation = 'delete'
+    else:
+        return
+    table = getattr(statement, 'table', None)
+    if table is None:
+        return
+    keys = None if operation == 'insert' else _statement_keys(statement)
+    pending = orm_execute_state.session.info.setdefault('change_events', [])
+    pending.extend(ChangeEvent(table.name, operation, key)
+                   for key in (keys if keys is not None else [None]))
+
+
+@event.listens_for(Session, 'before_commit')
+def _before_commit(session):
+    # Flush now so the commit's own flush cannot add changes afterwards
+    session.flush()
+    events = session.info.get('change_events')
+    if events and _before_commit_hooks:
+        tables = {change.table for change in events}
+        for hook in _before_commit_hooks:
+            hook(session, tables)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_changes(session):
+    events = session.info.pop('change_events', [])
+    publish(events)
+    tables = {change.table for change in events}
+    if tables:
+        for callback in _commit_callbacks:
+            callback(tables)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('change_events', None)
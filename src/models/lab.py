@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum as SqlEnum, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum as SqlEnum, DateTime, Index
 from sqlalchemy.orm import relationship
 from enum import Enum as PyEnum
 from config import Base
@@ -21,6 +21,11 @@ class Lab(Base.Model):
                     default=LabStatus.pending, nullable=False)
     creation_date = Column(DateTime, default=datetime.utcnow)
     approval_date = Column(DateTime, nullable=True)
+    __table_args__ = (
+        Index('ix_lab_subject_id', 'subject_id'),
+        Index('ix_lab_created_by', 'created_by'),
+        Index('ix_lab_status_creation_date', 'status', 'creation_date'),
+    )
     # Relations
     subject = relationship('Subject', back_populates='labs')
     creator = relationship('User', back_populates='created_labs')
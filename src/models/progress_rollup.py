@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from config import Base
+
+
+class ClassLabProgressRollup(Base.Model):
+    __tablename__ = 'class_lab_progress_rollup'
+    class_id = Column(Integer, ForeignKey('class_group.id'), primary_key=True)
+    lab_id = Column(Integer, ForeignKey('lab.id'), primary_key=True)
+    completed = Column(Integer, default=0, nullable=False)
+    in_progress = Column(Integer, default=0, nullable=False)
+    not_started = Column(Integer, default=0, nullable=False)
+    score_total = Column(Float, default=0.0, nullable=False)
+
+
+class StudentProgressRollup(Base.Model):
+    __tablename__ = 'student_progress_rollup'
+    student_id = Column(Integer, ForeignKey('user.id'), primary_key=True)
+    completed = Column(Integer, default=0, nullable=False)
+    in_progress = Column(Integer, default=0, nullable=False)
+    not_started = Column(Integer, default=0, nullable=False)
+    score_total = Column(Float, default=0.0, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from config import Base
 
@@ -7,6 +7,7 @@ class Student(Base.Model):
     __tablename__ = 'student'
     user_id = Column(Integer, ForeignKey('user.id'), primary_key=True)
     class_id = Column(Integer, ForeignKey('class_group.id'), nullable=False)
+    __table_args__ = (Index('ix_student_class_id', 'class_id'),)
     # Relations
     user = relationship('User', back_populates='student')
     class_group = relationship('ClassGroup', back_populates='students')
\ No newline at end of file
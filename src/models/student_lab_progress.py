@@ -1,9 +1,11 @@
 from sqlalchemy import Column, Integer, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from config import Base
-from sqlalchemy import Float, DateTime, Text, UniqueConstraint
+from sqlalchemy import Float, DateTime, Text, LargeBinary, UniqueConstraint, Index
+from sqlalchemy.dialects.mysql import LONGBLOB
 from datetime import datetime
 import enum
+import zlib
 
 
 class ProgressStatus(enum.Enum):
@@ -18,11 +20,38 @@ class StudentLabProgress(Base.Model):
     student_id = Column(Integer, ForeignKey('user.id'), nullable=False)
     lab_id = Column(Integer, ForeignKey('lab.id'), nullable=False)
     progress = Column(Float, default=0.0)
+    score = Column(Float, nullable=True)
     last_saved = Column(DateTime, default=datetime.utcnow)
     work_data = Column(Text)
+    # zlib-compressed work data written by autosave; supersedes work_data
+    work_data_blob = Column(LargeBinary().with_variant(LONGBLOB, 'mysql'),
+                            nullable=True)
+    work_data_version = Column(Integer, default=0, nullable=False)
     status = Column(Enum(ProgressStatus), default=ProgressStatus.not_started)
-    # Contrainte unique
-    __table_args__ = (UniqueConstraint('student_id', 'lab_id'),)
+    start_date = Column(DateTime, nullable=True)
+    completion_date = Column(DateTime, nullable=True)
+    comments = Column(Text, nullable=True)
+    # Bumped on every ORM update; an UPDATE of a stale version raises StaleDataError
+    version = Column(Integer, default=1, nullable=False)
+    # Contrainte unique (also serves lookups by student_id)
+    __table_args__ = (
+        UniqueConstraint('student_id', 'lab_id'),
+        Index('ix_student_lab_progress_lab_id_status', 'lab_id', 'status'),
+    )
+    __mapper_args__ = {'version_id_col': version}
     # Relations
     student = relationship('User', back_populates='student_lab_progress')
     lab = relationship('Lab', back_populates='student_progress')
+
+    def get_work_data(self):
+        return self.decode_work_data(self.work_data_blob, self.work_data)
+
+    @staticmethod
+    def decode_work_data(blob, text):
+        if blob is not None:
+            return zlib.decompress(blob).decode('utf-8')
+        return text or ''
+
+    @staticmethod
+    def compress_work_data(text):
+        return zlib.compress(text.encode('utf-8'))
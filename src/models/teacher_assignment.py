@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from config import Base
 
@@ -7,6 +7,11 @@ class TeacherAssignment(Base.Model):
     teacher_id = Column(Integer, ForeignKey('user.id'), primary_key=True)
     class_id = Column(Integer, ForeignKey('class_group.id'), primary_key=True)
     subject_id = Column(Integer, ForeignKey('subject.id'), primary_key=True)
+    # teacher_id lookups use the primary key prefix
+    __table_args__ = (
+        Index('ix_teacher_assignment_class_id_subject_id',
+              'class_id', 'subject_id'),
+    )
     # Relations
     teacher = relationship('User', back_populates='teacher_assignments')
     class_group = relationship('ClassGroup', back_populates='teacher_assignments')
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum as SqlEnum
+from sqlalchemy import Column, Integer, String, Enum as SqlEnum, Index
 from config import Base
 from sqlalchemy.orm import relationship
 from enum import Enum as PyEnum
@@ -18,6 +18,7 @@ class User(Base.Model):
     role = Column(SqlEnum(Role), nullable=False)
     name = Column(String(50), nullable=False)
     first_name = Column(String(50), nullable=False)
+    __table_args__ = (Index('ix_user_role_id', 'role', 'id'),)
     student = relationship('Student', uselist=False, back_populates='user')
     created_labs = relationship('Lab', back_populates='creator')
     teacher_assignments = relationship(
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, LargeBinary, ForeignKey, Index
+from config import Base
+from datetime import datetime
+
+
+class WorkDataChunk(Base.Model):
+    """zlib-compressed piece of work data, keyed by the SHA-256 of its text."""
+    __tablename__ = 'work_data_chunk'
+    digest = Column(String(64), primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    # Set on insert and whenever a snapshot reuses the chunk; prune_chunks
+    # leaves recently used chunks alone
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+
+class WorkDataSnapshot(Base.Model):
+    __tablename__ = 'work_data_snapshot'
+    id = Column(Integer, primary_key=True)
+    progress_id = Column(Integer, ForeignKey('student_lab_progress.id'), nullable=False)
+    version = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    size = Column(Integer, nullable=False)
+    # Space-separated chunk digests, in document order
+    manifest = Column(Text, nullable=False)
+    __table_args__ = (
+        Index('ix_work_data_snapshot_progress_id_created_at',
+              'progress_id', 'created_at'),
+    )
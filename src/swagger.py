@@ -1,5 +1,6 @@
 from flask_swagger_ui import get_swaggerui_blueprint
-from flask import jsonify
+import json
+from compression import StaticPayload
 
 SWAGGER_URL = '/api/docs'  # URL pour exposer l'interface Swagger
 API_URL = '/api/swagger.json'  # Notre URL d'API (peut être n'importe quelle URL valide)
@@ -122,7 +123,45 @@ swagger_spec = {
             "get": {
                 "tags": ["Utilisateurs"],
                 "summary": "Obtenir tous les utilisateurs",
-                "description": "Renvoie une liste de tous les utilisateurs (admin seulement)",
+                "description": "Renvoie une page d'utilisateurs triés par ID (admin seulement)",
+                "parameters": [
+                    {
+                        "name": "role",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "enum": ["student", "teacher", "administrator"],
+                        "description": "Filtrer les utilisateurs par rôle"
+                    },
+                    {
+                        "name": "limit",
+                        "in": "query",
+                        "required": False,
+                        "type": "integer",
+                        "description": "Taille de la page (100 par défaut, 500 maximum)"
+                    },
+                    {
+                        "name": "after",
+                        "in": "query",
+                        "required": False,
+                        "type": "integer",
+                        "description": "Curseur renvoyé dans next_cursor par la page précédente"
+                    },
+                    {
+                        "name": "fields",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "description": "Champs à renvoyer, séparés par des virgules (id, email, first_name, name, role); l'ID est toujours inclus"
+                    },
+                    {
+                        "name": "include",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "description": "Objets liés à inclure, séparés par des virgules (class)"
+                    }
+                ],
                 "responses": {
                     "200": {
                         "description": "Liste des utilisateurs"
@@ -166,6 +205,57 @@ swagger_spec = {
                     }
                 }
             }
+        },
+        "/users/export": {
+            "get": {
+                "tags": ["Utilisateurs"],
+                "summary": "Exporter les utilisateurs",
+                "description": "Exporte tous les utilisateurs en NDJSON ou CSV, triés par ID (admin seulement)",
+                "produces": ["application/x-ndjson", "text/csv"],
+                "parameters": [
+                    {
+                        "name": "format",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "enum": ["ndjson", "csv"],
+                        "description": "Format du fichier (ndjson par défaut)"
+                    },
+                    {
+                        "name": "role",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "enum": ["student", "teacher", "administrator"],
+                        "description": "Filtrer les utilisateurs par rôle"
+                    },
+                    {
+                        "name": "fields",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "description": "Champs à exporter, comme pour la liste"
+                    },
+                    {
+                        "name": "include",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "description": "Objets liés à inclure, comme pour la liste (colonnes objet.champ en CSV)"
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Fichier transmis en flux, une ligne par enregistrement"
+                    },
+                    "400": {
+                        "description": "Format, champ ou filtre invalide"
+                    },
+                    "403": {
+                        "description": "Accès non autorisé"
+                    }
+                }
+            }
         },
           "/users/profile": {
             "get": {
@@ -465,7 +555,7 @@ swagger_spec = {
             "get": {
                 "tags": ["Laboratoires"],
                 "summary": "Obtenir tous les laboratoires",
-                "description": "Renvoie une liste de tous les laboratoires, peut filtrer par subject_id",
+                "description": "Renvoie une page de laboratoires triés par ID, peut filtrer par subject_id, created_by et status",
                 "parameters": [
                     {
                         "name": "subject_id",
@@ -473,6 +563,49 @@ swagger_spec = {
                         "required": False,
                         "type": "integer",
                         "description": "Filtrer les laboratoires par ID de matière"
+                    },
+                    {
+                        "name": "created_by",
+                        "in": "query",
+                        "required": False,
+                        "type": "integer",
+                        "description": "Filtrer les laboratoires par ID du créateur"
+                    },
+                    {
+                        "name": "status",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "enum": ["pending", "approved", "rejected"],
+                        "description": "Filtrer les laboratoires par statut"
+                    },
+                    {
+                        "name": "limit",
+                        "in": "query",
+                        "required": False,
+                        "type": "integer",
+                        "description": "Taille de la page (100 par défaut, 500 maximum)"
+                    },
+                    {
+                        "name": "after",
+                        "in": "query",
+                        "required": False,
+                        "type": "integer",
+                        "description": "Curseur renvoyé dans next_cursor par la page précédente"
+                    },
+                    {
+                        "name": "fields",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "description": "Champs à renvoyer, séparés par des virgules (id, name, subject_id, created_by, status, creation_date, approval_date); l'ID est toujours inclus"
+                    },
+                    {
+                        "name": "include",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "description": "Objets liés à inclure, séparés par des virgules (subject, creator)"
                     }
                 ],
                 "responses": {
@@ -516,6 +649,56 @@ swagger_spec = {
             }
         },
         
+        "/labs/export": {
+            "get": {
+                "tags": ["Laboratoires"],
+                "summary": "Exporter les labs",
+                "description": "Exporte tous les labs en NDJSON ou CSV, triés par ID (enseignants et admins)",
+                "produces": ["application/x-ndjson", "text/csv"],
+                "parameters": [
+                    {
+                        "name": "format",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "enum": ["ndjson", "csv"],
+                        "description": "Format du fichier (ndjson par défaut)"
+                    },
+                    {
+                        "name": "status",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "description": "Filtrer les labs par statut"
+                    },
+                    {
+                        "name": "fields",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "description": "Champs à exporter, comme pour la liste"
+                    },
+                    {
+                        "name": "include",
+                        "in": "query",
+                        "required": False,
+                        "type": "string",
+                        "description": "Objets liés à inclure, comme pour la liste (colonnes objet.champ en CSV)"
+                    }
+                ],
+                "responses": {
+                    "200": {
+                        "description": "Fichier transmis en flux, une ligne par enregistrement"
+                    },
+                    "400": {
+                        "description": "Format, champ ou filtre invalide"
+                    },
+                    "403": {
+                        "description": "Accès non autorisé"
+                    }
+                }
+            }
+        },
         "/labs/{lab_id}": {
             "get": {
                 "tags": ["Laboratoires"],
@@ -543,5 +726,9 @@ swagger_spec = {
     }
 }
 
+# Encodé et compressé une seule fois, au chargement du module
+swagger_payload = StaticPayload(
+    json.dumps(swagger_spec, ensure_ascii=False, separators=(",", ":")).encode('utf-8'))
+
 def get_swagger_json():
-    return jsonify(swagger_spec)
+    return swagger_payload.response()
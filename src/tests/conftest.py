@@ -0,0 +1,112 @@
+"""Shared fixtures: an app on a fresh in-memory SQLite database per test.
+
+Run from src/:
+    pip install -r requirements-dev.txt
+    python -m pytest -q
+"""
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+# Settings are read when config is first imported
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+os.environ.setdefault('AUTOSAVE_FLUSH_INTERVAL', '0')
+os.environ.setdefault('PASSWORD_HASH_WORKERS', '0')
+os.environ.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from config import Base
+from models.user import User, Role
+from models.student import Student
+from models.class_group import ClassGroup
+from api.utils import auth_helpers
+from api.utils.response_cache import response_cache
+
+# Tests never log in through the hashing pool, so any value will do
+PASSWORD = 'pbkdf2:sha256:1$salt$hash'
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        Base.create_all()
+        yield app
+        Base.session.remove()
+        Base.drop_all()
+    auth_helpers.token_cache.clear()
+    auth_helpers._revoked_users.clear()
+    auth_helpers._moved_students.clear()
+    response_cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def make_user(email, role, **fields):
+    user = User(email=email, password=PASSWORD, role=role,
+                name=fields.pop('name', email.split('@')[0]),
+                first_name=fields.pop('first_name', 'Test'), **fields)
+    Base.session.add(user)
+    Base.session.flush()
+    return user
+
+
+def make_students(class_group, count, start=0):
+    users = []
+    for n in range(start, start + count):
+        user = make_user(f'student{n}@example.com', Role.student)
+        Base.session.add(Student(user_id=user.id, class_id=class_group.id))
+        users.append(user)
+    Base.session.flush()
+    return users
+
+
+def auth_headers(user):
+    now = datetime.utcnow()
+    claims = {'user_id': user.id, 'role': user.role.name,
+              'iat': now, 'exp': now + timedelta(hours=1)}
+    if user.student:
+        claims['class_id'] = user.student.class_id
+    token = jwt.encode(claims, os.getenv('JWT_SECRET_KEY', 'default_secret'),
+                       algorithm='HS256')
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def admin(app):
+    user = make_user('admin@example.com', Role.administrator)
+    Base.session.commit()
+    return user
+
+
+@pytest.fixture
+def class_group(app):
+    class_group = ClassGroup(name='Class A')
+    Base.session.add(class_group)
+    Base.session.commit()
+    return class_group
+
+
+@contextmanager
+def count_queries():
+    """Collects the SQL statements run inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Base.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(Base.engine, 'before_cursor_execute', before_cursor_execute)
@@ -0,0 +1,45 @@
+import pytest
+
+from config import Base
+from models.user import User, Role
+from models.class_group import ClassGroup
+from api.utils.auth_helpers import token_required
+from conftest import make_user, make_students, auth_headers
+
+
+@pytest.fixture
+def stateless(app):
+    app.config['JWT_STATELESS_AUTH'] = True
+    return app
+
+
+def test_token_of_deleted_user_is_rejected(stateless, client, admin):
+    teacher = make_user('teacher@example.com', Role.teacher)
+    Base.session.commit()
+    headers = auth_headers(teacher)
+    # Deleted behind this process's back, so its denylist never heard of it
+    Base.session.query(User).filter(User.id == teacher.id).delete()
+    Base.session.commit()
+
+    response = client.get('/api/users/profile', headers=headers)
+
+    assert response.status_code == 401
+
+
+def test_class_claim_is_reloaded_after_a_transfer(stateless, client, admin, class_group):
+    student = make_students(class_group, 1)[0]
+    target = ClassGroup(name='Class B')
+    Base.session.add(target)
+    Base.session.commit()
+    headers = auth_headers(student)
+
+    seen = []
+    view = token_required(lambda current_user: seen.append(current_user.class_id) or '')
+
+    response = client.post(f'/api/classes/{target.id}/students',
+                           json={'user_id': student.id}, headers=auth_headers(admin))
+    assert response.status_code == 200
+    with stateless.test_request_context(headers=headers):
+        view()
+
+    assert seen == [target.id]
@@ -0,0 +1,68 @@
+import pytest
+
+from config import Base
+from models.user import Role
+from models.subject import Subject
+from models.lab import Lab, LabStatus
+from models.student_lab_progress import StudentLabProgress
+from api.utils.autosave import AutosaveBuffer, VersionConflict
+from conftest import make_user, make_students
+
+
+@pytest.fixture
+def progress(app, class_group):
+    teacher = make_user('teacher@example.com', Role.teacher)
+    subject = Subject(name='Subject')
+    Base.session.add(subject)
+    Base.session.flush()
+    lab = Lab(name='Lab', subject_id=subject.id, created_by=teacher.id,
+              status=LabStatus.approved)
+    Base.session.add(lab)
+    Base.session.flush()
+    student = make_students(class_group, 1)[0]
+    progress = StudentLabProgress(student_id=student.id, lab_id=lab.id)
+    Base.session.add(progress)
+    Base.session.commit()
+    return progress
+
+
+def _stored(progress):
+    Base.session.expire_all()
+    progress = Base.session.get(StudentLabProgress, progress.id)
+    return progress.get_work_data(), progress.work_data_version
+
+
+def test_stale_flush_does_not_overwrite_newer_work(progress):
+    key = (progress.student_id, progress.lab_id)
+
+    # Two workers buffering the same document, the slower one behind
+    slow, fast = AutosaveBuffer(), AutosaveBuffer()
+    slow.interval = fast.interval = 60
+    slow.save(progress, 0, text='old')
+    fast.save(progress, 0, text='old')
+    fast.save(progress, 1, text='new')
+    fast.flush([key])
+    with pytest.raises(VersionConflict) as conflict:
+        slow.flush([key])
+
+    assert conflict.value.current_version == 2
+    assert _stored(progress) == ('new', 2)
+    # The superseded document is gone, so the next read is the stored one
+    assert slow.read(progress) == ('new', 2)
+
+
+def test_save_after_a_flush_builds_on_the_stored_document(progress):
+    key = (progress.student_id, progress.lab_id)
+    buffer = AutosaveBuffer()
+    buffer.interval = 60
+    # A request's copy, loaded before the flush below
+    Base.session.refresh(progress)
+    Base.session.expunge(progress)
+    buffer.save(progress, 0, text='acked v1')
+    buffer.flush([key])
+
+    # ``progress`` still says version 0
+    assert buffer.save(progress, 1, text='acked v2') == 2
+    buffer.flush([key])
+
+    assert _stored(progress) == ('acked v2', 2)
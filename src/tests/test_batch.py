@@ -0,0 +1,49 @@
+from config import Base
+from models.user import Role
+from conftest import make_user, auth_headers
+
+
+def test_each_sub_request_reports_its_own_status(client, admin):
+    response = client.post('/api/batch', json={'requests': [
+        {'path': f'/api/users/{admin.id}'},
+        {'path': '/api/users/9999'},
+        {'method': 'POST', 'path': '/api/users', 'body': {'email': 'x@example.com'}},
+    ]}, headers=auth_headers(admin))
+
+    assert response.status_code == 200
+    responses = response.get_json()['responses']
+    assert [r['status'] for r in responses] == [200, 404, 400]
+    assert responses[0]['body']['email'] == 'admin@example.com'
+    assert responses[2]['body'] == {'error': 'Missing required field: password'}
+
+
+def test_sub_requests_run_as_the_batch_caller(client, admin):
+    teacher = make_user('teacher@example.com', Role.teacher)
+    Base.session.commit()
+
+    # Consecutive GETs run concurrently on the worker pool
+    response = client.post('/api/batch', json=[
+        {'path': '/api/users/profile'},
+        {'path': '/api/users'},
+        {'path': f'/api/users/{admin.id}'},
+    ], headers=auth_headers(teacher))
+
+    responses = response.get_json()['responses']
+    assert [r['status'] for r in responses] == [200, 403, 403]
+    assert responses[0]['body']['user']['email'] == 'teacher@example.com'
+
+
+def test_batch_requires_a_token(client, admin):
+    response = client.post('/api/batch', json=[{'path': '/api/users/profile'}])
+
+    assert response.status_code == 401
+
+
+def test_nested_batches_are_rejected(client, admin):
+    response = client.post('/api/batch', json=[
+        {'path': '/api/users/profile'},
+        {'method': 'POST', 'path': '/api/batch/', 'body': []},
+    ], headers=auth_headers(admin))
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Request 1: Batch requests cannot be nested'}
@@ -0,0 +1,66 @@
+from config import Base
+from models.user import Role
+from models.subject import Subject
+from models.lab import Lab, LabStatus
+from models.student_lab_progress import StudentLabProgress, ProgressStatus
+from conftest import make_user, make_students, auth_headers
+
+
+def _lab(subject, creator, name):
+    lab = Lab(name=name, subject_id=subject.id, created_by=creator.id,
+              status=LabStatus.approved)
+    Base.session.add(lab)
+    Base.session.flush()
+    return lab
+
+
+def _progress(student, lab):
+    Base.session.add(StudentLabProgress(student_id=student.id, lab_id=lab.id,
+                                        status=ProgressStatus.in_progress))
+
+
+def _delete(client, admin, path):
+    response = client.delete(path, headers=auth_headers(admin))
+    assert response.status_code == 200
+    return response.get_json()['counts']
+
+
+def test_dry_run_counts_match_the_delete(client, admin, class_group):
+    teacher = make_user('teacher@example.com', Role.teacher)
+    subject = Subject(name='Physics')
+    Base.session.add(subject)
+    Base.session.flush()
+    author, classmate = make_students(class_group, 2)
+    # A student who wrote a lab and also works on it
+    own_lab = _lab(subject, author, 'Own lab')
+    other_lab = _lab(subject, teacher, 'Other lab')
+    _progress(author, own_lab)
+    _progress(author, other_lab)
+    _progress(classmate, own_lab)
+    Base.session.commit()
+    path = f'/api/users/{author.id}'
+
+    preview = _delete(client, admin, path + '?dry_run=true')
+    assert preview['student_lab_progress'] == 3
+    assert Base.session.query(StudentLabProgress).count() == 3
+
+    assert _delete(client, admin, path) == preview
+    assert Base.session.query(StudentLabProgress).count() == 0
+
+
+def test_subject_dry_run_leaves_rows_in_place(client, admin):
+    teacher = make_user('teacher@example.com', Role.teacher)
+    subject = Subject(name='Physics')
+    Base.session.add(subject)
+    Base.session.flush()
+    _lab(subject, teacher, 'Lab 1')
+    _lab(subject, teacher, 'Lab 2')
+    Base.session.commit()
+    path = f'/api/subjects/{subject.id}'
+
+    preview = _delete(client, admin, path + '?dry_run=true')
+    assert (preview['lab'], preview['subject']) == (2, 1)
+    assert Base.session.query(Lab).count() == 2
+
+    assert _delete(client, admin, path) == preview
+    assert Base.session.query(Lab).count() == 0
@@ -0,0 +1,60 @@
+import pytest
+
+from config import Base
+from models.user import Role
+from models.subject import Subject
+from models.class_subject import ClassSubject
+from models.teacher_assignment import TeacherAssignment
+from conftest import make_user, make_students, auth_headers, count_queries
+
+
+def _add_subjects(class_group, teacher, count, start=0):
+    for n in range(start, start + count):
+        subject = Subject(name=f'Subject {n}')
+        Base.session.add(subject)
+        Base.session.flush()
+        Base.session.add(ClassSubject(class_id=class_group.id, subject_id=subject.id))
+        Base.session.add(TeacherAssignment(teacher_id=teacher.id,
+                                           class_id=class_group.id,
+                                           subject_id=subject.id))
+    Base.session.commit()
+
+
+def _queries_for(client, path, headers):
+    Base.session.expire_all()
+    with count_queries() as statements:
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    return response, len(statements)
+
+
+@pytest.mark.parametrize('suffix', ['', '/students', '/subjects'])
+def test_class_page_query_count_does_not_grow_with_roster(client, admin, class_group, suffix):
+    teacher = make_user('teacher@example.com', Role.teacher)
+    make_students(class_group, 2)
+    _add_subjects(class_group, teacher, 1)
+    path = f'/api/classes/{class_group.id}{suffix}'
+    headers = auth_headers(admin)
+
+    # The first request also verifies the token; later ones hit the token cache
+    client.get(path, headers=headers)
+    small, small_count = _queries_for(client, path, headers)
+
+    make_students(class_group, 38, start=2)
+    _add_subjects(class_group, make_user('teacher2@example.com', Role.teacher), 11, start=1)
+    large, large_count = _queries_for(client, path, headers)
+
+    assert large.get_data() != small.get_data()
+    assert large_count == small_count
+
+
+def test_class_page_lists_students_and_subject_teachers(client, admin, class_group):
+    teacher = make_user('teacher@example.com', Role.teacher, name='Curie')
+    students = make_students(class_group, 3)
+    _add_subjects(class_group, teacher, 2)
+
+    response = client.get(f'/api/classes/{class_group.id}', headers=auth_headers(admin))
+
+    data = response.get_json()
+    assert [student['id'] for student in data['students']] == [s.id for s in students]
+    assert [subject['teacher']['name'] for subject in data['subjects']] == ['Curie', 'Curie']
@@ -0,0 +1,46 @@
+from config import Base
+from models.user import Role
+from models.subject import Subject
+from models.lab import Lab, LabStatus
+from models.student_lab_progress import StudentLabProgress
+from api.utils.conditional import not_modified, precondition_failed
+from conftest import make_user, make_students, auth_headers
+
+
+def test_compressed_variants_match_the_handler_etag(app):
+    with app.test_request_context(headers={'If-None-Match': '"v1-gzip"',
+                                           'If-Match': '"v1-gzip"'}):
+        assert not_modified('v1')
+        assert not precondition_failed('v1')
+        assert not not_modified('v2')
+        assert precondition_failed('v2')
+
+
+def test_progress_update_from_a_stale_copy_is_refused(client, class_group):
+    # First user, so the student's user and Student row share an id
+    student = make_students(class_group, 1)[0]
+    teacher = make_user('teacher@example.com', Role.teacher)
+    subject = Subject(name='Subject')
+    Base.session.add(subject)
+    Base.session.flush()
+    lab = Lab(name='Lab', subject_id=subject.id, created_by=teacher.id,
+              status=LabStatus.approved)
+    Base.session.add(lab)
+    Base.session.flush()
+    Base.session.add(StudentLabProgress(student_id=student.id, lab_id=lab.id))
+    Base.session.commit()
+    url = f'/api/progress/students/{student.id}/labs/{lab.id}/progress'
+    headers = auth_headers(teacher)
+
+    etag = client.get(url, headers=headers).headers['ETag']
+    first = client.post(url, json={'score': 50},
+                        headers={**headers, 'If-Match': etag})
+    second = client.post(url, json={'score': 80},
+                         headers={**headers, 'If-Match': etag})
+
+    assert first.status_code == 200
+    assert first.headers['ETag'] != etag
+    assert second.status_code == 412
+    assert second.get_json()['version'] == first.get_json()['version']
+    Base.session.expire_all()
+    assert StudentLabProgress.query.one().score == 50
@@ -0,0 +1,61 @@
+from config import Base
+from models.user import Role
+from models.subject import Subject
+from models.lab import Lab, LabStatus
+from models.class_subject import ClassSubject
+from models.teacher_assignment import TeacherAssignment
+from models.student_lab_progress import StudentLabProgress, ProgressStatus
+from api.utils.progress_rollups import rebuild_rollups
+from conftest import make_user, make_students, auth_headers
+
+
+def _subject_with_lab(class_group, teacher, name):
+    subject = Subject(name=name)
+    Base.session.add(subject)
+    Base.session.flush()
+    Base.session.add(ClassSubject(class_id=class_group.id, subject_id=subject.id))
+    Base.session.add(TeacherAssignment(teacher_id=teacher.id, class_id=class_group.id,
+                                       subject_id=subject.id))
+    lab = Lab(name=f'{name} lab', subject_id=subject.id, created_by=teacher.id,
+              status=LabStatus.approved)
+    Base.session.add(lab)
+    Base.session.flush()
+    return lab
+
+
+def test_teacher_progress_covers_only_their_subjects(client, class_group):
+    teacher = make_user('teacher@example.com', Role.teacher)
+    colleague = make_user('colleague@example.com', Role.teacher)
+    own_lab = _subject_with_lab(class_group, teacher, 'Physics')
+    other_lab = _subject_with_lab(class_group, colleague, 'History')
+    student = make_students(class_group, 1)[0]
+    Base.session.add(StudentLabProgress(student_id=student.id, lab_id=own_lab.id,
+                                        status=ProgressStatus.in_progress))
+    Base.session.add(StudentLabProgress(student_id=student.id, lab_id=other_lab.id,
+                                        status=ProgressStatus.completed, score=15))
+    Base.session.commit()
+    rebuild_rollups()
+
+    response = client.get('/api/me/dashboard', headers=auth_headers(teacher))
+
+    assert response.status_code == 200
+    [summary] = response.get_json()['classes']
+    assert summary['progress'] == {'completed': 0, 'in_progress': 1,
+                                   'not_started': 0, 'average_score': None}
+
+
+def test_admin_dashboard_lists_undated_pending_labs(client, admin):
+    teacher = make_user('teacher@example.com', Role.teacher)
+    subject = Subject(name='Physics')
+    Base.session.add(subject)
+    Base.session.flush()
+    Base.session.add(Lab(name='Lab', subject_id=subject.id, created_by=teacher.id,
+                         status=LabStatus.pending))
+    Base.session.commit()
+    Base.session.query(Lab).update({Lab.creation_date: None})
+    Base.session.commit()
+
+    response = client.get('/api/me/dashboard', headers=auth_headers(admin))
+
+    assert response.status_code == 200
+    assert response.get_json()['pending_labs'][0]['creation_date'] is None
@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import delete, update
+
+from config import Base
+from models import events
+from models.subject import Subject
+from models.change_stamp import current_stamps
+from conftest import auth_headers
+
+
+@pytest.fixture
+def changes(app, monkeypatch):
+    seen = []
+    monkeypatch.setitem(events._subscribers, 'subject', [seen.append])
+    return seen
+
+
+def test_bulk_statements_are_published_after_commit(changes):
+    physics, chemistry = Subject(name='Physics'), Subject(name='Chemistry')
+    Base.session.add_all([physics, chemistry])
+    Base.session.commit()
+    changes.clear()
+
+    Base.session.execute(update(Subject).where(Subject.id.in_([physics.id]))
+                         .values(name='Mechanics'))
+    Base.session.execute(delete(Subject).where(Subject.name == 'Chemistry'))
+    assert changes == []
+    Base.session.commit()
+
+    assert changes == [events.ChangeEvent('subject', 'update', physics.id),
+                       events.ChangeEvent('subject', 'delete', None)]
+
+
+def test_rolled_back_statements_are_not_published(changes):
+    Base.session.execute(delete(Subject).where(Subject.id == 1))
+    Base.session.rollback()
+    Base.session.commit()
+
+    assert changes == []
+
+
+def test_bulk_statements_move_the_change_stamps(app):
+    before = current_stamps('subject')['subject']
+    Base.session.execute(update(Subject).values(name='Renamed'))
+    Base.session.commit()
+
+    assert current_stamps('subject')['subject'] == before + 1
+
+
+def test_cascade_deletes_reach_subscribers(client, admin, changes):
+    subject = Subject(name='Physics')
+    Base.session.add(subject)
+    Base.session.commit()
+    subject_id = subject.id
+    changes.clear()
+
+    response = client.delete(f'/api/subjects/{subject_id}',
+                             headers=auth_headers(admin))
+
+    assert response.status_code == 200
+    assert events.ChangeEvent('subject', 'delete', subject_id) in changes
@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+
+from config import Base
+from models.user import Role
+from conftest import make_user, auth_headers
+
+
+def test_users_export_streams_ndjson(client, admin):
+    make_user('teacher@example.com', Role.teacher)
+    Base.session.commit()
+
+    response = client.get('/api/users/export', query_string={'fields': 'id,email'},
+                          headers=auth_headers(admin))
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.headers['Content-Disposition'] == 'attachment; filename="users.ndjson"'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row['email'] for row in rows] == ['admin@example.com', 'teacher@example.com']
+
+
+def test_users_export_streams_csv_with_a_header(client, admin):
+    make_user('teacher@example.com', Role.teacher)
+    Base.session.commit()
+
+    response = client.get('/api/users/export',
+                          query_string={'format': 'csv', 'role': 'teacher'},
+                          headers=auth_headers(admin))
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row['email'] for row in rows] == ['teacher@example.com']
+
+
+def test_export_rejects_unknown_formats(client, admin):
+    response = client.get('/api/users/export', query_string={'format': 'xml'},
+                          headers=auth_headers(admin))
+
+    assert response.status_code == 400
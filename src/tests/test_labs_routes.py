@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from config import Base
+from models.user import Role
+from models.subject import Subject
+from models.lab import Lab, LabStatus
+from conftest import make_user, auth_headers
+
+
+def test_pending_labs_page_through_undated_labs(client, admin):
+    teacher = make_user('teacher@example.com', Role.teacher)
+    subject = Subject(name='Subject')
+    Base.session.add(subject)
+    Base.session.flush()
+    for name, created in [('dated', datetime(2024, 1, 1)), ('undated', None),
+                          ('also undated', None)]:
+        Base.session.add(Lab(name=name, subject_id=subject.id, created_by=teacher.id,
+                             status=LabStatus.pending, creation_date=created))
+    Base.session.commit()
+    # The column default fills creation_date on insert
+    Base.session.query(Lab).filter(Lab.name != 'dated') \
+        .update({Lab.creation_date: None})
+    Base.session.commit()
+
+    names, after = [], None
+    while True:
+        query = {'limit': 1} if after is None else {'limit': 1, 'after': after}
+        response = client.get('/api/labs/pending', query_string=query,
+                              headers=auth_headers(admin))
+        assert response.status_code == 200
+        page = response.get_json()
+        names += [(lab['name'], lab['creation_date']) for lab in page['labs']]
+        after = page['next_cursor']
+        if after is None:
+            break
+
+    assert names == [('undated', None), ('also undated', None),
+                     ('dated', '2024-01-01T00:00:00')]
@@ -0,0 +1,33 @@
+from sqlalchemy import create_engine, inspect, text
+
+import migrations
+
+# The tables of the original dump that the migrations touch
+LEGACY_SCHEMA = [
+    "CREATE TABLE user (id INTEGER PRIMARY KEY, email VARCHAR(100), "
+    "password VARCHAR(255), role VARCHAR(20), name VARCHAR(50), first_name VARCHAR(50))",
+    "CREATE TABLE class_group (id INTEGER PRIMARY KEY, name VARCHAR(50))",
+    "CREATE TABLE lab (id INTEGER PRIMARY KEY, name VARCHAR(100), subject_id INT, "
+    "created_by INT, status VARCHAR(20), creation_date DATETIME, approval_date DATETIME)",
+    # MySQL's keys for the lab foreign keys
+    "CREATE INDEX subject_id ON lab (subject_id)",
+    "CREATE INDEX created_by ON lab (created_by)",
+    "CREATE TABLE student (user_id INTEGER PRIMARY KEY, class_id INT)",
+    "CREATE TABLE teacher_assignment (id INTEGER PRIMARY KEY, teacher_id INT, "
+    "class_id INT, subject_id INT)",
+    "CREATE TABLE student_lab_progress (id INTEGER PRIMARY KEY, student_id INT, "
+    "lab_id INT, progress FLOAT, last_saved DATETIME, work_data TEXT, status VARCHAR(20))",
+]
+
+
+def test_upgrade_legacy_database():
+    engine = create_engine('sqlite://')
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+
+    assert len(migrations.upgrade(engine)) == len(migrations.available_migrations())
+    assert migrations.upgrade(engine) == []
+
+    lab_indexes = {index['name'] for index in inspect(engine).get_indexes('lab')}
+    assert lab_indexes == {'subject_id', 'created_by', 'ix_lab_status_creation_date'}
@@ -0,0 +1,21 @@
+from config import PASSWORD_HASH_RETRY_AFTER
+from api.utils import passwords
+
+
+def test_login_is_refused_with_429_when_the_hash_queue_is_full(client, admin, monkeypatch):
+    monkeypatch.setattr(passwords, 'PASSWORD_HASH_WORKERS', 1)
+    held = 0
+    while passwords._slots.acquire(blocking=False):
+        held += 1
+    try:
+        response = client.post('/api/login', json={'email': 'admin@example.com',
+                                                   'password': 'secret'})
+    finally:
+        for _ in range(held):
+            passwords._slots.release()
+
+    assert held > 0
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == str(PASSWORD_HASH_RETRY_AFTER)
+    # Nothing was submitted, so no pool was started
+    assert passwords._executor is None
@@ -0,0 +1,82 @@
+import importlib
+
+from config import Base
+from models.user import Role
+from models.subject import Subject
+from models.class_group import ClassGroup
+from models.lab import Lab, LabStatus
+from models.student_lab_progress import StudentLabProgress, ProgressStatus
+from models.progress_rollup import ClassLabProgressRollup, StudentProgressRollup
+from conftest import make_user, make_students, auth_headers
+
+migration = importlib.import_module(
+    'migrations.versions.0001_progress_columns_and_rollups')
+
+
+def _seed_progress(class_group, statuses):
+    teacher = make_user('teacher@example.com', Role.teacher)
+    subject = Subject(name='Subject')
+    Base.session.add(subject)
+    Base.session.flush()
+    lab = Lab(name='Lab', subject_id=subject.id, created_by=teacher.id,
+              status=LabStatus.approved)
+    Base.session.add(lab)
+    Base.session.flush()
+    students = make_students(class_group, len(statuses))
+    for student, status in zip(students, statuses):
+        Base.session.add(StudentLabProgress(student_id=student.id, lab_id=lab.id,
+                                            status=status, score=10))
+    Base.session.commit()
+    return teacher, lab, students
+
+
+def _counts(model, **key):
+    row = Base.session.query(model).filter_by(**key).one()
+    return row.completed, row.in_progress, row.not_started, row.score_total
+
+
+def test_migration_backfills_rollups(app, class_group):
+    _, lab, students = _seed_progress(class_group, [
+        ProgressStatus.completed, ProgressStatus.completed, ProgressStatus.in_progress])
+
+    with Base.engine.begin() as connection:
+        migration.upgrade(connection)
+
+    assert _counts(ClassLabProgressRollup, class_id=class_group.id, lab_id=lab.id) \
+        == (2, 1, 0, 20)
+    assert _counts(StudentProgressRollup, student_id=students[0].id) == (1, 0, 0, 10)
+
+
+def test_missing_rollup_row_is_rebuilt_not_seeded_with_deltas(client, class_group):
+    teacher, lab, students = _seed_progress(class_group, [
+        ProgressStatus.completed, ProgressStatus.completed])
+
+    response = client.post(
+        f'/api/progress/students/{students[0].id}/labs/{lab.id}/progress',
+        json={'status': 'in_progress'}, headers=auth_headers(teacher))
+
+    assert response.status_code == 200
+    assert _counts(ClassLabProgressRollup, class_id=class_group.id, lab_id=lab.id) \
+        == (1, 1, 0, 10)
+    assert _counts(StudentProgressRollup, student_id=students[0].id) == (0, 1, 0, 0)
+
+
+def test_reenrolled_students_count_in_the_new_class(client, admin, class_group):
+    _, lab, students = _seed_progress(class_group, [
+        ProgressStatus.completed, ProgressStatus.in_progress])
+    target = ClassGroup(name='Class B')
+    Base.session.add(target)
+    Base.session.commit()
+    headers = auth_headers(admin)
+
+    assert client.delete(f'/api/classes/{class_group.id}',
+                         headers=headers).status_code == 200
+    assert client.post(f'/api/classes/{target.id}/students/bulk',
+                       json={'user_ids': [students[0].id]},
+                       headers=headers).status_code == 200
+    assert client.post(f'/api/classes/{target.id}/students',
+                       json={'user_id': students[1].id},
+                       headers=headers).status_code == 200
+
+    assert _counts(ClassLabProgressRollup, class_id=target.id, lab_id=lab.id) \
+        == (1, 1, 0, 10)
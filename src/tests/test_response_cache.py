@@ -0,0 +1,140 @@
+import pytest
+from sqlalchemy import insert, update
+
+from config import Base
+from models.subject import Subject
+from models.lab import Lab, LabStatus
+from models.change_stamp import ChangeStamp
+from api.utils.response_cache import response_cache, LocalBackend
+from conftest import auth_headers
+
+
+@pytest.fixture
+def headers(admin):
+    return auth_headers(admin)
+
+
+def _names(response):
+    assert response.status_code == 200
+    return [subject['name'] for subject in response.get_json()['subjects']]
+
+
+def _add_subject(name):
+    Base.session.add(Subject(name=name))
+    Base.session.commit()
+
+
+def test_repeated_reads_are_served_from_the_cache(client, headers):
+    _add_subject('Physics')
+
+    first = client.get('/api/subjects', headers=headers)
+    hits = response_cache.hits
+    second = client.get('/api/subjects', headers=headers)
+
+    assert response_cache.hits == hits + 1
+    assert second.get_data() == first.get_data()
+    assert second.headers['ETag'] == first.headers['ETag']
+
+
+def test_cache_hit_answers_if_none_match_with_304(client, headers):
+    _add_subject('Physics')
+    etag = client.get('/api/subjects', headers=headers).headers['ETag']
+    hits = response_cache.hits
+
+    response = client.get('/api/subjects',
+                          headers={**headers, 'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.get_data() == b''
+    assert response.headers['ETag'] == etag
+    assert response_cache.hits == hits + 1
+
+
+def test_commit_in_this_process_evicts_entries(client, headers):
+    _add_subject('Physics')
+    assert _names(client.get('/api/subjects', headers=headers)) == ['Physics']
+
+    response = client.post('/api/subjects', json={'name': 'Chemistry'},
+                           headers=headers)
+    assert response.status_code == 201
+
+    assert _names(client.get('/api/subjects', headers=headers)) \
+        == ['Physics', 'Chemistry']
+
+
+def test_stamp_moved_by_another_worker_misses_the_cache(client, headers):
+    _add_subject('Physics')
+    assert _names(client.get('/api/subjects', headers=headers)) == ['Physics']
+
+    # Written by another process: no local eviction, only the stamp moves
+    with Base.engine.begin() as connection:
+        connection.execute(insert(Subject.__table__).values(name='Chemistry'))
+        connection.execute(update(ChangeStamp.__table__)
+                           .where(ChangeStamp.__table__.c.name == 'subject')
+                           .values(version=ChangeStamp.__table__.c.version + 1))
+    Base.session.expire_all()
+    misses = response_cache.misses
+
+    assert _names(client.get('/api/subjects', headers=headers)) \
+        == ['Physics', 'Chemistry']
+    assert response_cache.misses == misses + 1
+
+
+def test_local_backend_evicts_least_recently_used_entries():
+    backend = LocalBackend(max_bytes=15)
+    backend.set('a', b'12345', ['subject'])
+    backend.set('b', b'12345', ['lab'])
+    backend.get('a')
+    backend.set('c', b'12345', ['lab'])
+
+    assert (backend.get('a'), backend.get('b'), backend.get('c')) \
+        == (b'12345', None, b'12345')
+    assert backend.bytes == 12
+
+    backend.invalidate(['lab'])
+    assert backend.stats()['entries'] == 1
+
+
+def test_included_rows_are_part_of_the_key_and_etag(client, headers, admin):
+    _add_subject('Physics')
+    subject = Base.session.query(Subject).one()
+    Base.session.add(Lab(name='Optics', subject_id=subject.id, created_by=admin.id,
+                         status=LabStatus.approved))
+    Base.session.commit()
+    first = client.get('/api/labs?include=subject', headers=headers)
+    assert first.get_json()['labs'][0]['subject']['name'] == 'Physics'
+
+    # Renamed by another process: only the subject stamp moves
+    with Base.engine.begin() as connection:
+        connection.execute(update(Subject.__table__).values(name='Mechanics'))
+        connection.execute(update(ChangeStamp.__table__)
+                           .where(ChangeStamp.__table__.c.name == 'subject')
+                           .values(version=ChangeStamp.__table__.c.version + 1))
+    Base.session.expire_all()
+
+    response = client.get('/api/labs?include=subject',
+                          headers={**headers, 'If-None-Match': first.headers['ETag']})
+
+    assert response.status_code == 200
+    assert response.get_json()['labs'][0]['subject']['name'] == 'Mechanics'
+    assert response.headers['ETag'] != first.headers['ETag']
+
+
+def test_compressed_bodies_get_their_own_etag(client, headers):
+    for n in range(100):
+        Base.session.add(Subject(name=f'Subject {n}'))
+    Base.session.commit()
+    gzip_headers = {**headers, 'Accept-Encoding': 'gzip'}
+
+    plain = client.get('/api/subjects', headers=headers)
+    compressed = client.get('/api/subjects', headers=gzip_headers)
+
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['ETag'] == plain.headers['ETag'][:-1] + '-gzip"'
+    # Revalidated both from the cache and from the handler
+    for _ in range(2):
+        response = client.get('/api/subjects', headers={
+            **gzip_headers, 'If-None-Match': compressed.headers['ETag']})
+        assert response.status_code == 304
+        assert response.headers['ETag'] == compressed.headers['ETag']
+        response_cache.clear()
@@ -0,0 +1,40 @@
+from config import Base
+from models.user import User, Role
+from api.utils.auth_helpers import token_cache
+from conftest import make_user, auth_headers
+
+
+def test_profile_edit_drops_the_cached_snapshot(client, admin):
+    headers = auth_headers(admin)
+    assert client.get('/api/users/profile', headers=headers) \
+        .get_json()['user']['email'] == 'admin@example.com'
+    assert token_cache.stats()['size'] == 1
+
+    response = client.put('/api/users/profile', json={'email': 'boss@example.com'},
+                          headers=headers)
+
+    assert response.status_code == 200
+    assert token_cache.stats()['size'] == 0
+    assert client.get('/api/users/profile', headers=headers) \
+        .get_json()['user']['email'] == 'boss@example.com'
+
+
+def test_bulk_role_change_reaches_cached_tokens(client, admin):
+    other = make_user('other@example.com', Role.administrator)
+    Base.session.commit()
+    headers, other_headers = auth_headers(admin), auth_headers(other)
+    assert client.get('/api/users', headers=headers).status_code == 200
+    assert client.get('/api/users', headers=other_headers).status_code == 200
+
+    # Names its row: only that user's tokens are dropped
+    Base.session.query(User).filter(User.id == admin.id) \
+        .update({User.role: Role.teacher})
+    Base.session.commit()
+    assert token_cache.stats()['size'] == 1
+    assert client.get('/api/users', headers=headers).status_code == 403
+
+    # Names no row: the whole cache goes
+    Base.session.query(User).filter(User.email.like('other@%')) \
+        .update({User.role: Role.teacher})
+    Base.session.commit()
+    assert client.get('/api/users', headers=other_headers).status_code == 403
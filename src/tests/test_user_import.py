@@ -0,0 +1,52 @@
+import json
+
+from config import Base
+from models.user import User, Role
+from conftest import make_user, auth_headers
+
+
+def _import(client, admin, rows):
+    body = '\n'.join(json.dumps(row) for row in rows)
+    return client.post('/api/users/import', data=body,
+                       content_type='application/x-ndjson',
+                       headers=auth_headers(admin))
+
+
+def _row(email):
+    return {'email': email, 'password': 'secret123',
+            'first_name': 'Ada', 'last_name': 'Lovelace'}
+
+
+def test_import_compares_emails_case_insensitively(client, admin):
+    make_user('bob@example.com', Role.student)
+    Base.session.commit()
+
+    response = _import(client, admin, [
+        _row('Alice@Example.com'), _row('alice@example.com'), _row('BOB@example.com')])
+
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result['status'] for result in results] == ['created', 'error', 'skipped']
+    assert results[0]['email'] == 'alice@example.com'
+    assert results[1]['error'] == 'Duplicate email in import'
+    assert Base.session.query(User).filter(User.email == 'alice@example.com').count() == 1
+
+
+def test_rows_with_non_string_values_are_reported(client, admin, class_group):
+    response = _import(client, admin, [
+        {**_row('number@example.com'), 'email': 5},
+        {**_row('password@example.com'), 'password': 12345678},
+        {**_row('class@example.com'), 'class_id': [class_group.id]},
+        {**_row('float@example.com'), 'class_id': 1.5},
+        {**_row('role@example.com'), 'role': ['student']},
+        {**_row('good@example.com'), 'class_id': str(class_group.id)}])
+
+    assert response.status_code == 200
+    assert [(result['status'], result.get('error')) for result in
+            response.get_json()['results']] == [
+        ('error', 'Field must be a string: email'),
+        ('error', 'Field must be a string: password'),
+        ('error', 'Invalid class_id'),
+        ('error', 'Invalid class_id'),
+        ('error', 'Invalid role'),
+        ('created', None)]
@@ -0,0 +1,21 @@
+from config import Base
+from models.user import Role
+from conftest import make_user, auth_headers
+
+
+def test_user_list_search_matches_every_word(client, admin):
+    make_user('jdupont@example.com', Role.teacher, first_name='Jean', name='Dupont')
+    make_user('jmartin@example.com', Role.student, first_name='Jean', name='Martin')
+    make_user('100%@example.com', Role.student, first_name='Paul', name='Durand')
+    Base.session.commit()
+
+    def search(term):
+        response = client.get('/api/users', query_string={'search': term},
+                              headers=auth_headers(admin))
+        assert response.status_code == 200
+        return [user['email'] for user in response.get_json()['users']]
+
+    assert search('jean') == ['jdupont@example.com', 'jmartin@example.com']
+    assert search('Jean dupont') == ['jdupont@example.com']
+    assert search('%') == ['100%@example.com']
+    assert len(search('  ')) == 4
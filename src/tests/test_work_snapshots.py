@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+from config import Base
+from models.work_data_snapshot import WorkDataChunk, WorkDataSnapshot
+from api.utils.work_snapshots import take_snapshots, prune_chunks
+
+
+def _chunk(digest, last_used_at):
+    Base.session.add(WorkDataChunk(digest=digest, data=b'', size=0,
+                                   last_used_at=last_used_at))
+
+
+def test_prune_keeps_recently_used_chunks(app):
+    _chunk('old', datetime.utcnow() - timedelta(days=2))
+    _chunk('unknown', None)
+    # Counted as stored by a snapshot that has not committed yet
+    _chunk('recent', datetime.utcnow())
+    Base.session.commit()
+    # Chunks stored before last_used_at existed
+    Base.session.query(WorkDataChunk).filter(WorkDataChunk.digest == 'unknown') \
+        .update({WorkDataChunk.last_used_at: None})
+    Base.session.commit()
+
+    assert prune_chunks() == 2
+    assert Base.session.query(WorkDataChunk.digest).all() == [('recent',)]
+
+
+def test_snapshots_of_deleted_progress_are_dropped(app):
+    assert take_snapshots([(404, 1, 'work')], force=True) == 0
+    assert Base.session.query(WorkDataSnapshot).count() == 0